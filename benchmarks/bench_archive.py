@@ -0,0 +1,95 @@
+"""
+bench_archive.py
+----------------
+Compares saving and loading the full library state as a binary archive
+(src/archive.py, compressed and raw) against a JSON dump of every record.
+
+Usage:
+    python -m benchmarks.bench_archive [num_books]    (default 1,000,000)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from src.archive import load_library, save_library
+from src.library import LibrarySystem
+from src.models import Book, Hold, Loan, Patron, Title
+from src.serializers import from_wire, to_wire
+
+
+def build_library(n: int) -> LibrarySystem:
+    """Build n books (a title per two copies), n // 10 patrons and n // 2 loans, half returned."""
+    library = LibrarySystem()
+    for i in range(n // 2):
+        book = library.add_book(f"Book {i}", f"Author {i % 1000}", f"isbn-{i}")
+        library.add_copies(book.title_id, 1)
+    for i in range(n // 10):
+        library.add_patron(f"Patron {i}", f"patron{i}@example.com", f"555-{i:07d}")
+    for i in range(1, n + 1, 2):
+        library.borrow_book(i, 1 + (i // 2) % (n // 10))
+    for i in range(1, n + 1, 4):
+        library.return_book(i)
+    return library
+
+
+def save_json(library: LibrarySystem, path: str):
+    state = {
+        "titles": [to_wire(t) for t in library.titles],
+        "books": [to_wire(b) for b in library.books],
+        "patrons": [to_wire(p) for p in library.patrons],
+        "loans": [to_wire(l) for l in library.loans],
+        "holds": [to_wire(h) for h in library._holds.values()],
+        "next_ids": {
+            "title": library._title_id_counter, "book": library._book_id_counter,
+            "patron": library._patron_id_counter, "loan": library._loan_id_counter,
+            "hold": library._hold_id_counter,
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(state, f)
+
+
+def load_json(path: str) -> LibrarySystem:
+    with open(path) as f:
+        state = json.load(f)
+    return LibrarySystem.from_records(
+        [from_wire(Title, t) for t in state["titles"]],
+        [from_wire(Book, b) for b in state["books"]],
+        [from_wire(Patron, p) for p in state["patrons"]],
+        [from_wire(Loan, l) for l in state["loans"]],
+        [from_wire(Hold, h) for h in state["holds"]],
+        state["next_ids"],
+    )
+
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    library = build_library(n)
+    records = len(library.titles) + len(library.books) + len(library.patrons) + len(library.loans)
+    print(f"{records:,} records")
+    with tempfile.TemporaryDirectory() as tmp:
+        formats = [
+            ("archive zlib", lambda p: save_library(library, p), load_library),
+            ("archive raw", lambda p: save_library(library, p, compress=False), load_library),
+            ("json", lambda p: save_json(library, p), load_json),
+        ]
+        for name, save, load in formats:
+            path = os.path.join(tmp, name.replace(" ", "_"))
+            _, save_ms = timed(lambda: save(path))
+            loaded, load_ms = timed(lambda: load(path))
+            assert loaded.get_stats() == library.get_stats()
+            size = os.path.getsize(path) / 2 ** 20
+            print(f"{name:<13} {size:8.1f} MiB   save {save_ms:8.0f} ms   load {load_ms:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+bench_due_dates.py
+------------------
+Times overdue and due-soon checks over the epoch-integer due-date column
+against a scan comparing the datetimes of every Loan object. The library runs
+on a ManualClock, so the loan set and the results are identical on every run.
+
+Usage:
+    python -m benchmarks.bench_due_dates [num_loans]    (default 1,000,000)
+"""
+
+import sys
+import time
+
+from src.clock import ManualClock
+from src.library import LibrarySystem
+
+
+def build_library(n: int, clock: ManualClock) -> LibrarySystem:
+    """Lend n books, one per simulated minute, with loan lengths of 7 to 27 days; return every other one."""
+    library = LibrarySystem(clock=clock)
+    for i in range(n):
+        library.add_book(f"Book {i}", "Author", f"isbn-{i}")
+    for i in range(1000):
+        library.add_patron(f"Patron {i}", f"patron{i}@example.com", f"555-{i:07d}")
+    for i in range(1, n + 1):
+        library.borrow_book(i, 1 + i % 1000, days=7 + i % 21)
+        clock.advance(minutes=1)
+    for i in range(1, n + 1, 2):
+        library.return_book(i)
+    return library
+
+
+def object_scan(library: LibrarySystem):
+    """The previous implementation: compare datetimes on every Loan object."""
+    now = library.clock()
+    return [loan for loan in library.loans if loan.return_date is None and loan.due_date < now]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    clock = ManualClock()
+    library = build_library(n, clock)
+    for name, run in [
+        ("object scan", lambda: object_scan(library)),
+        ("overdue", library.get_overdue_loans),
+        ("due soon", lambda: library.get_due_soon_loans(days=3)),
+    ]:
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            result = run()
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<12} {len(result):8d} loans   best {min(timings):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+bench_find_book.py
+------------------
+Times LibrarySystem.find_books on a synthetic catalog with misspelled queries
+(one character dropped from the last words of a title and its author) and
+reports how often the intended book is among the top 5 candidates.
+
+Usage:
+    python -m benchmarks.bench_find_book [num_titles]    (default 10,000)
+"""
+
+import random
+import sys
+import time
+
+from src.library import LibrarySystem
+
+CONSONANTS = "bcdfghjklmnprstvwz"
+VOWELS = "aeiou"
+COMMON_WORDS = ("the", "of", "a", "and")
+
+
+def make_word(rng: random.Random) -> str:
+    """Pronounceable pseudo-word of one to three syllables."""
+    return "".join(
+        rng.choice(CONSONANTS) + rng.choice(VOWELS) + rng.choice(("", "", "n", "r", "l", "s", "t"))
+        for _ in range(rng.randint(1, 3))
+    )
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rng = random.Random(1)
+    library = LibrarySystem()
+    books = []
+    for i in range(n):
+        words = [rng.choice(COMMON_WORDS) if rng.random() < 0.3 else make_word(rng) for _ in range(rng.randint(1, 5))]
+        author = f"{make_word(rng).title()} {make_word(rng).title()}"
+        books.append(library.add_book(" ".join(words).title(), author, f"isbn-{i}"))
+    queries = []
+    for _ in range(1000):
+        book = rng.choice(books)
+        text = " ".join(f"{book.title} {book.author}".split()[-3:])
+        cut = rng.randrange(len(text))
+        queries.append((text[:cut] + text[cut + 1:], book.id))
+    timings = []
+    hits = 0
+    for query, book_id in queries:
+        start = time.perf_counter()
+        matches = library.find_books(query, 5)
+        timings.append(time.perf_counter() - start)
+        hits += any(book.id == book_id for book, _ in matches)
+    timings.sort()
+    print(f"{n} titles, {len(queries)} misspelled queries")
+    print(f"mean {sum(timings) / len(timings) * 1000:.3f} ms   p50 {timings[len(timings) // 2] * 1000:.3f} ms"
+          f"   p99 {timings[int(len(timings) * 0.99)] * 1000:.3f} ms   recall@5 {hits / len(queries):.2f}")
+
+
+if __name__ == "__main__":
+    main()
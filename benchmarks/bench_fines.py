@@ -0,0 +1,63 @@
+"""
+bench_fines.py
+--------------
+Times the fine engine over a large loan history on a ManualClock: the bulk
+pass over every loan (loan_fines, balances), the cached per-patron balance,
+and the cost it adds to return_book through the listener hook.
+
+Usage:
+    python -m benchmarks.bench_fines [num_loans]    (default 1,000,000)
+"""
+
+import sys
+import time
+
+from src.clock import ManualClock
+from src.fines import FineEngine, FinePolicy
+from src.library import LibrarySystem
+
+
+def build_library(n: int, clock: ManualClock) -> LibrarySystem:
+    """Lend n books, one per simulated minute, with loan lengths of 7 to 27 days; return every other one."""
+    library = LibrarySystem(clock=clock)
+    for i in range(n):
+        library.add_book(f"Book {i}", "Author", f"isbn-{i}")
+    for i in range(1000):
+        library.add_patron(f"Patron {i}", f"patron{i}@example.com", f"555-{i:07d}")
+    for i in range(1, n + 1):
+        library.borrow_book(i, 1 + i % 1000, days=7 + i % 21)
+        clock.advance(minutes=1)
+    for i in range(1, n + 1, 2):
+        library.return_book(i)
+    return library
+
+
+def timed(run, repeat: int = 5) -> float:
+    """Best wall time of run() in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    clock = ManualClock()
+    library = build_library(n, clock)
+    start = time.perf_counter()
+    engine = FineEngine(library, FinePolicy(daily_rate=25, grace_days=1, max_fine=1000))
+    print(f"seed engine         {(time.perf_counter() - start) * 1000:8.1f} ms  ({n} loans)")
+    print(f"loan_fines          {timed(engine.loan_fines):8.1f} ms  ({len(engine.loan_fines())} fined loans)")
+    print(f"balances            {timed(engine.balances):8.1f} ms  ({len(engine.balances())} patrons)")
+    print(f"patron_balance      {timed(lambda: engine.patron_balance(1), 1000) * 1000:8.1f} us")
+    returns = list(range(2, min(n, 20000) + 1, 2))
+    start = time.perf_counter()
+    for book_id in returns:
+        library.return_book(book_id)
+    print(f"return_book         {(time.perf_counter() - start) / len(returns) * 1e6:8.1f} us per return with the engine")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+bench_import_time.py
+--------------------
+Measures cold import time of the application modules with `python -X importtime`
+and lists the heaviest imports, to keep container start-up fast.
+
+Usage:
+    python -m benchmarks.bench_import_time [module ...] [--top N]
+"""
+
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULES = ["src.library", "src.mcp_server", "src.mcp_transport", "src.api_server", "src.interface", "main"]
+
+
+def import_times(module: str) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+    Returns (cumulative microseconds for the module, [(cumulative us, name), ...]).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+        raise RuntimeError(f"import {module} failed: {last}")
+    entries: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries[name.strip()] = int(cumulative)
+    return entries.get(module, 0), sorted(((us, name) for name, us in entries.items()), reverse=True)
+
+
+def main():
+    args = sys.argv[1:]
+    top = 5
+    if "--top" in args:
+        index = args.index("--top")
+        top = int(args[index + 1])
+        del args[index:index + 2]
+    for module in args or DEFAULT_MODULES:
+        try:
+            total, entries = import_times(module)
+        except RuntimeError as e:
+            print(f"{module:<20} {e}")
+            continue
+        print(f"{module:<20} {total / 1000:8.1f} ms")
+        for us, name in entries[:top]:
+            if name != module:
+                print(f"    {name:<40} {us / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
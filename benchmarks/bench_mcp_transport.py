@@ -0,0 +1,85 @@
+"""
+bench_mcp_transport.py
+----------------------
+Measures MCP tool-call throughput (calls per second) over the stdio and
+streamable HTTP transports of src.mcp_transport.
+
+Usage:
+    python -m benchmarks.bench_mcp_transport [num_calls] [concurrency]
+"""
+
+import http.client
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from src.library import LibrarySystem
+from src.mcp_server import LibraryMCPServer
+from src.mcp_transport import MCPProtocolHandler, create_http_server
+
+
+def tool_call(msg_id: int) -> dict:
+    """Build a cheap tools/call request."""
+    return {
+        "jsonrpc": "2.0", "id": msg_id, "method": "tools/call",
+        "params": {"name": "get_book_info", "arguments": {"book_id": 1 + msg_id % 100}},
+    }
+
+
+def bench_stdio(num_calls: int, workers: int) -> float:
+    """Pipeline num_calls requests into a server subprocess and wait for every reply."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.mcp_transport", "--transport", "stdio", "--workers", str(workers)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+    )
+    payload = "".join(json.dumps(tool_call(i)) + "\n" for i in range(num_calls))
+    start = time.perf_counter()
+    writer = threading.Thread(target=lambda: (proc.stdin.write(payload), proc.stdin.close()))
+    writer.start()
+    for _ in range(num_calls):
+        proc.stdout.readline()
+    elapsed = time.perf_counter() - start
+    writer.join()
+    proc.wait()
+    return num_calls / elapsed
+
+
+def bench_http(num_calls: int, concurrency: int) -> float:
+    """Send num_calls requests from concurrency keep-alive client threads."""
+    library = LibrarySystem()
+    for i in range(100):
+        library.add_book(f"Book {i}", "Author", f"isbn-{i}")
+    server = create_http_server(MCPProtocolHandler(LibraryMCPServer(library)), port=0, workers=concurrency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    per_client = num_calls // concurrency
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        for i in range(per_client):
+            conn.request("POST", "/mcp", json.dumps(tool_call(i)), {"Content-Type": "application/json"})
+            conn.getresponse().read()
+        conn.close()
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    return per_client * concurrency / elapsed
+
+
+def main():
+    num_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print(f"stdio: {bench_stdio(num_calls, concurrency):10.0f} calls/s")
+    print(f"http:  {bench_http(num_calls, concurrency):10.0f} calls/s ({concurrency} clients)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+bench_recommend.py
+------------------
+Times "patrons who borrowed this also borrowed" with the co-borrowing index
+(per-borrow update cost and per-read latency) against computing the answer
+from the loan list, on a synthetic history where patrons favor a few genres.
+
+Usage:
+    python -m benchmarks.bench_recommend [num_loans]    (default 1,000,000)
+"""
+
+import random
+import sys
+import time
+from collections import Counter
+
+from src.library import LibrarySystem
+from src.recommend import CoBorrowIndex
+
+TITLES = 20_000
+PATRONS = 20_000
+GENRES = 50
+
+
+def naive_recommend(library: LibrarySystem, book_id: int, limit: int = 5):
+    """Scan every loan: find the title's borrowers, then count their other titles."""
+    title_of = {b.id: b.title_id for b in library.books}
+    title_id = title_of[book_id]
+    borrowers = {l.patron_id for l in library.loans if title_of[l.book_id] == title_id}
+    seen = {(l.patron_id, title_of[l.book_id]) for l in library.loans if l.patron_id in borrowers}
+    counts = Counter(t for _, t in seen if t != title_id)
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(7)
+    library = LibrarySystem()
+    for i in range(TITLES):
+        library.add_book(f"Book {i}", "Author", f"isbn-{i}")
+    for i in range(PATRONS):
+        library.add_patron(f"Patron {i}", f"patron{i}@example.com", f"555-{i:07d}")
+    favorite = [rng.sample(range(GENRES), 2) for _ in range(PATRONS)]
+    per_genre = TITLES // GENRES
+    index = CoBorrowIndex(library)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        patron = rng.randrange(PATRONS)
+        genre = rng.choice(favorite[patron]) if rng.random() < 0.8 else rng.randrange(GENRES)
+        book_id = 1 + genre * per_genre + min(int(rng.expovariate(1 / 40)), per_genre - 1)
+        if library.borrow_book(book_id, patron + 1, days=14):
+            library.return_book(book_id)
+    elapsed = time.perf_counter() - start
+    print(f"{len(library.loans)} loans, borrow+return with the index: {elapsed / n * 1e6:.1f} us")
+    print(f"index size: {index.metrics()}")
+
+    reads = [1 + rng.randrange(TITLES) for _ in range(10_000)]
+    start = time.perf_counter()
+    for book_id in reads:
+        index.recommend(book_id, 5)
+    print(f"recommend (index)  {(time.perf_counter() - start) / len(reads) * 1e6:10.1f} us")
+    start = time.perf_counter()
+    naive_recommend(library, reads[0])
+    print(f"recommend (scan)   {(time.perf_counter() - start) * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
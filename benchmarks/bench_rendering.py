@@ -0,0 +1,49 @@
+"""
+bench_rendering.py
+------------------
+Times the text list outputs with a cold and a warm row cache.
+
+Usage:
+    python -m benchmarks.bench_rendering [num_books]    (default 100,000)
+"""
+
+import sys
+import time
+
+from src.clock import ManualClock
+from src.interface import LibraryInterface
+from src.library import LibrarySystem
+
+
+def build_library(n: int) -> LibrarySystem:
+    """Build n books and n // 10 patrons, with every tenth book overdue."""
+    clock = ManualClock()
+    library = LibrarySystem(clock=clock)
+    for i in range(n):
+        library.add_book(f"Book {i}", f"Author {i % 1000}", f"isbn-{i}")
+    for i in range(n // 10):
+        library.add_patron(f"Patron {i}", f"patron{i}@example.com", f"555-{i:07d}")
+    for i in range(1, n + 1, 10):
+        library.borrow_book(i, 1 + (i // 10) % (n // 10))
+    clock.advance(days=15)
+    return library
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    interface = LibraryInterface(build_library(n))
+    for name, run in [
+        ("list_books", interface.list_books),
+        ("list_patrons", interface.list_patrons),
+        ("list_overdue", interface.list_overdue),
+    ]:
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<14} cold {timings[0]:8.1f} ms   warm {min(timings[1:]):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+bench_reporting.py
+------------------
+Times the circulation report over a synthetic columnar loan history.
+
+Usage:
+    python -m benchmarks.bench_reporting [num_loans]    (default 10,000,000)
+"""
+
+import random
+import sys
+import time
+from datetime import datetime
+
+from src import reporting
+from src.reporting import LoanColumns, NOT_RETURNED, SECONDS_PER_DAY, to_epoch_seconds
+
+
+def synthetic_columns(n: int, titles: int = 50_000, patrons: int = 200_000) -> LoanColumns:
+    """Build n loans spread over two years, about 10% still open."""
+    rng = random.Random(42)
+    start = to_epoch_seconds(datetime(2024, 1, 1))
+    loan_ts = [start + rng.randrange(730 * SECONDS_PER_DAY) for _ in range(n)]
+    due_ts = [ts + 14 * SECONDS_PER_DAY for ts in loan_ts]
+    return_ts = [
+        NOT_RETURNED if rng.random() < 0.1 else ts + rng.randrange(30 * SECONDS_PER_DAY)
+        for ts in loan_ts
+    ]
+    title_id = [1 + int(titles * rng.random() ** 3) for _ in range(n)]
+    return LoanColumns(
+        loan_id=range(1, n + 1),
+        book_id=title_id,
+        title_id=title_id,
+        patron_id=[1 + rng.randrange(patrons) for _ in range(n)],
+        loan_ts=loan_ts,
+        due_ts=due_ts,
+        return_ts=return_ts,
+    )
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    backend = "numpy" if reporting.HAVE_NUMPY else "pure python"
+    start = time.perf_counter()
+    cols = synthetic_columns(n)
+    print(f"built {n:,} loans in {time.perf_counter() - start:.1f}s (backend: {backend})")
+    now = datetime(2026, 1, 1)
+    for name, run in [
+        ("loans_per_day", lambda: reporting.loans_per_day(cols)),
+        ("top_titles", lambda: reporting.top_titles(cols, 10)),
+        ("average_loan_days", lambda: reporting.average_loan_days(cols)),
+        ("overdue_rate_by_patron", lambda: reporting.overdue_rate_by_patron(cols, now)),
+        ("circulation_report", lambda: reporting.circulation_report(cols, now)),
+    ]:
+        start = time.perf_counter()
+        run()
+        print(f"  {name:<24}{(time.perf_counter() - start) * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
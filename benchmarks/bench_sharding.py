@@ -0,0 +1,93 @@
+"""
+bench_sharding.py
+-----------------
+Measures borrow/return throughput when the library runs as one API process
+versus one API process per branch shard, driven by several client processes.
+
+Usage:
+    python -m benchmarks.bench_sharding [num_shards] [clients] [ops_per_client]
+"""
+
+import multiprocessing
+import socket
+import subprocess
+import sys
+import time
+
+from src.api_client import LibraryAPIClient, LibraryAPIError
+from src.sharding import ShardedLibrary
+
+BOOKS_PER_CLIENT = 20
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_shards(count: int):
+    """Start one API service per shard and wait until they answer."""
+    ports = [free_port() for _ in range(count)]
+    procs = [
+        subprocess.Popen([
+            sys.executable, "-m", "src.api_server", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", "4", "--shard-index", str(i), "--shard-count", str(count),
+        ], stderr=subprocess.DEVNULL)
+        for i, port in enumerate(ports)
+    ]
+    urls = [f"http://127.0.0.1:{port}" for port in ports]
+    for url in urls:
+        client = LibraryAPIClient(url, timeout=1)
+        for _ in range(100):
+            try:
+                client.get_stats()
+                break
+            except LibraryAPIError:
+                time.sleep(0.05)
+    return procs, urls
+
+
+def client_worker(args):
+    """Run borrow/return cycles against one branch's books through the router."""
+    urls, branch_index, ops = args
+    branches = [f"branch-{i}" for i in range(len(urls))]
+    library = ShardedLibrary(branches, [LibraryAPIClient(url) for url in urls])
+    branch = branches[branch_index % len(branches)]
+    patron = library.add_patron("Bench Patron", "bench@example.com", "555-0000", branch=branch)
+    books = [library.add_book(f"Bench {i}", "Author", f"bench-{branch_index}-{i}", branch=branch)
+             for i in range(BOOKS_PER_CLIENT)]
+    start = time.perf_counter()
+    for i in range(ops):
+        book = books[i % len(books)]
+        library.borrow_book(book.id, patron.id)
+        library.return_book(book.id)
+    return ops * 2, time.perf_counter() - start
+
+
+def run(num_shards: int, clients: int, ops: int) -> float:
+    """Return requests per second for the given shard count."""
+    procs, urls = start_shards(num_shards)
+    try:
+        with multiprocessing.Pool(clients) as pool:
+            results = pool.map(client_worker, [(urls, i, ops) for i in range(clients)])
+        requests = sum(r for r, _ in results)
+        elapsed = max(t for _, t in results)
+        return requests / elapsed
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+
+def main():
+    num_shards = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    ops = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    print(f"1 shard:  {run(1, clients, ops):10.0f} requests/s ({clients} clients)")
+    print(f"{num_shards} shards: {run(num_shards, clients, ops):10.0f} requests/s ({clients} clients)")
+
+
+if __name__ == "__main__":
+    main()
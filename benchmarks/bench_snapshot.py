@@ -0,0 +1,85 @@
+"""
+bench_snapshot.py
+-----------------
+Measures checkout latency while a reader exports every book and loan, once
+with the reader holding the library lock and once reading a snapshot.
+
+Usage:
+    python -m benchmarks.bench_snapshot [num_books]    (default 200,000)
+"""
+
+import sys
+import threading
+import time
+
+from src.library import LibrarySystem
+from src.serializers import to_wire
+
+
+def build_library(n: int) -> LibrarySystem:
+    """Build n books and n // 10 patrons, with every other book on loan."""
+    library = LibrarySystem()
+    for i in range(n):
+        library.add_book(f"Book {i}", f"Author {i % 1000}", f"isbn-{i}")
+    for i in range(n // 10):
+        library.add_patron(f"Patron {i}", f"patron{i}@example.com", f"555-{i:07d}")
+    for i in range(1, n + 1, 2):
+        library.borrow_book(i, 1 + (i // 2) % (n // 10))
+    return library
+
+
+def export(view):
+    """The long read: serialize every book and loan."""
+    return [to_wire(b) for b in view.books], [to_wire(l) for l in view.loans]
+
+
+def locked_export(library):
+    with library._lock:
+        export(library)
+
+
+def snapshot_export(library):
+    with library.snapshot() as snap:
+        export(snap)
+
+
+def run(library, reader, n: int):
+    """Run the reader once while a writer borrows and returns books; returns latencies in ms."""
+    done = threading.Event()
+    latencies = []
+
+    def writer():
+        i = 0
+        while not done.is_set():
+            book_id = 2 + 2 * (i % (n // 2 - 1))
+            start = time.perf_counter()
+            library.borrow_book(book_id, 1)
+            library.return_book(book_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+            i += 1
+            time.sleep(0.0005)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    reader(library)
+    read_ms = (time.perf_counter() - start) * 1000
+    done.set()
+    thread.join()
+    return read_ms, sorted(latencies)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    library = build_library(n)
+    for name, reader in [("locked", locked_export), ("snapshot", snapshot_export)]:
+        read_ms, lat = run(library, reader, n)
+        p50 = lat[len(lat) // 2]
+        p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+        print(f"{name:<9} export {read_ms:8.1f} ms   writes {len(lat):6d}   "
+              f"p50 {p50:7.3f} ms   p99 {p99:7.3f} ms   max {lat[-1]:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
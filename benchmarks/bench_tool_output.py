@@ -0,0 +1,67 @@
+"""
+bench_tool_output.py
+--------------------
+Compares the size of LibraryMCPServer tool responses in the human-formatted
+text mode and the compact JSON mode, in bytes and approximate LLM tokens.
+
+Usage:
+    python -m benchmarks.bench_tool_output [num_books]
+"""
+
+import re
+import sys
+import time
+
+from src.library import LibrarySystem
+from src.mcp_server import LibraryMCPServer
+
+# Rough BPE stand-in: words, 1-3 digit groups and short punctuation runs
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]{1,2}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of a response."""
+    return len(_TOKEN_RE.findall(text))
+
+
+def build_library(num_books: int) -> LibrarySystem:
+    """Create a library with num_books books, a few patrons and some loans."""
+    library = LibrarySystem()
+    for i in range(num_books):
+        library.add_book(f"Book Title {i}", f"Author {i % 97}", f"978-{i:010d}")
+    for i in range(max(1, num_books // 10)):
+        library.add_patron(f"Patron {i}", f"patron{i}@example.com", f"555-{i:07d}")
+    for book in library.books[::3]:
+        library.borrow_book(book.id, 1 + book.id % len(library.patrons))
+    return library
+
+
+def main():
+    num_books = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    server = LibraryMCPServer(build_library(num_books))
+    calls = [
+        ("list_books", {}),
+        ("list_books", {"fields": ["id", "title", "available"]}),
+        ("list_patrons", {}),
+        ("get_book_info", {"book_id": 1}),
+        ("get_patron_info", {"patron_id": 1}),
+    ]
+    print(f"{num_books} books")
+    print(f"{'tool':<32}{'text B':>10}{'json B':>10}{'text tok':>10}{'json tok':>10}{'text ms':>9}{'json ms':>9}")
+    for name, args in calls:
+        start = time.perf_counter()
+        text = server.execute_tool(name, dict(args), output_format="text")
+        text_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        data = server.execute_tool(name, dict(args), output_format="json")
+        json_ms = (time.perf_counter() - start) * 1000
+        label = name + ("[fields]" if "fields" in args else "")
+        print(
+            f"{label:<32}{len(text.encode()):>10}{len(data.encode()):>10}"
+            f"{estimate_tokens(text):>10}{estimate_tokens(data):>10}"
+            f"{text_ms:>9.2f}{json_ms:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,11 @@ This can be used for testing or integration with other systems.
 
 from src.library import LibrarySystem
 from src.mcp_server import LibraryMCPServer
+from src.tool_calls import as_openai_tool_calls, parse_tool_calls
 import json
 import requests
 import os
 from dotenv import load_dotenv
-import re
 
 
 def _try_execute_tools_from_text(content, mcp_server, messages, payload, llm_api_url, headers):
@@ -22,69 +22,44 @@ def _try_execute_tools_from_text(content, mcp_server, messages, payload, llm_api
     
     Returns True if tools were executed, False otherwise.
     """
-    try:
-        # Look for JSON array patterns in the response that might contain tool calls
-        json_pattern = r'\[.*?\]'
-        json_matches = re.findall(json_pattern, content, re.DOTALL)
-        
-        # Tool aliases for LLM response names
-        tool_aliases = {
-            "get_all_books": "list_books",
-            "get_all_patrons": "list_patrons",
-            "get_books": "list_books",
-            "get_patrons": "list_patrons",
-        }
-        
-        # Get list of valid tool names from MCP server (including aliases)
-        valid_tools = set([t["name"] for t in mcp_server.get_tools()])
-        valid_tools.update(tool_aliases.keys())
-        
-        for json_str in json_matches:
-            try:
-                parsed = json.loads(json_str)
-                if isinstance(parsed, list) and len(parsed) > 0:
-                    # Check if this looks like tool calls
-                    if all(isinstance(item, dict) and "name" in item for item in parsed):
-                        print("\n  LLM is invoking tools (detected from text)...")
-                        
-                        # Convert text format to tool_calls format
-                        for tool_call_data in parsed:
-                            tool_name = tool_call_data.get("name")
-                            tool_args = tool_call_data.get("arguments", {})
-                            
-                            if tool_name and tool_name in valid_tools:
-                                print(f"    - Calling {tool_name} with args: {tool_args}")
-                                result = mcp_server.execute_tool(tool_name, tool_args)
-                                print(f"      Result: {result}")
-                                
-                                messages.append({
-                                    "role": "tool",
-                                    "tool_call_id": f"call_{tool_name}",
-                                    "name": tool_name,
-                                    "content": json.dumps(result) if not isinstance(result, str) else result
-                                })
-                        
-                        # Get final response from LLM with tool results
-                        payload["messages"] = messages
-                        try:
-                            response = requests.post(llm_api_url, json=payload, headers=headers, timeout=30)
-                            response.raise_for_status()
-                            data = response.json()
-                            if "choices" in data and len(data["choices"]) > 0:
-                                final_message = data["choices"][0]["message"]
-                                final_response = final_message.get('content', 'No response')
-                                print(f"\n  LLM Final Response:\n    {final_response}\n")
-                        except Exception:
-                            pass
-                        
-                        return True
-            except (json.JSONDecodeError, TypeError):
-                continue
-        
-        return False
-    except Exception as e:
-        print(f"  Warning: Could not parse tool calls from text: {e}")
+    # Valid tool names from the MCP server, plus the aliases it resolves
+    valid_tools = {t["name"] for t in mcp_server.get_tools()}
+    valid_tools.update(["get_all_books", "get_all_patrons", "get_books", "get_patrons"])
+    
+    tool_calls = parse_tool_calls(content, valid_tools)
+    if not tool_calls:
         return False
+    
+    print("\n  LLM is invoking tools (detected from text)...")
+    messages.append({"role": "assistant", "content": content, "tool_calls": as_openai_tool_calls(tool_calls)})
+    for tool_call in messages[-1]["tool_calls"]:
+        tool_name = tool_call["function"]["name"]
+        tool_args = json.loads(tool_call["function"]["arguments"])
+        print(f"    - Calling {tool_name} with args: {tool_args}")
+        result = mcp_server.execute_tool(tool_name, tool_args)
+        print(f"      Result: {result}")
+        
+        messages.append({
+            "role": "tool",
+            "tool_call_id": tool_call["id"],
+            "name": tool_name,
+            "content": json.dumps(result) if not isinstance(result, str) else result
+        })
+    
+    # Get final response from LLM with tool results
+    payload["messages"] = messages
+    try:
+        response = requests.post(llm_api_url, json=payload, headers=headers, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        if "choices" in data and len(data["choices"]) > 0:
+            final_message = data["choices"][0]["message"]
+            final_response = final_message.get('content', 'No response')
+            print(f"\n  LLM Final Response:\n    {final_response}\n")
+    except Exception:
+        pass
+    
+    return True
 
 
 def call_llm_with_mcp_tools(mcp_server, user_query, llm_api_url=None, llm_api_key=None, llm_model_name=None):
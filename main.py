@@ -24,12 +24,16 @@ def main():
         LLM_MODEL_NAME: Model name to use with the LLM service (Optional)
                         If not set, auto-detected based on API URL
                         Examples: meta/llama-3.1-70b-instruct, gpt-3.5-turbo, local-model
+        LIBRARY_API_URL: URL of a headless library API service (Optional)
+                         When set, the UI is a client of that service (start it with
+                         `python -m src.api_server`) instead of owning the library.
     """
     load_dotenv()
     
     llm_url = os.getenv("LLM_API_URL")
     llm_key = os.getenv("LLM_API_KEY", None)
     llm_model = os.getenv("LLM_MODEL_NAME", None)
+    library_api_url = os.getenv("LIBRARY_API_URL", None)
     
     if not llm_url:
         raise ValueError("LLM_API_URL environment variable must be set. Check your .env file.")
@@ -45,8 +49,15 @@ def main():
     print(f"Connecting to LLM API: {llm_url}")
     if llm_model:
         print(f"Using model: {llm_model}")
+    if library_api_url:
+        print(f"Using library API service: {library_api_url}")
     
-    demo = create_interface(llm_api_url=llm_url, llm_api_key=llm_key, llm_model_name=llm_model)
+    demo = create_interface(
+        llm_api_url=llm_url,
+        llm_api_key=llm_key,
+        llm_model_name=llm_model,
+        library_api_url=library_api_url,
+    )
     demo.launch(server_name="0.0.0.0", server_port=7860)
 
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+"""
+admission.py
+------------
+Admission control for expensive UI actions such as LLM chat.
+A concurrency limiter with a bounded wait queue caps how many requests run at
+once; per-session token buckets cap how often each session may ask. Requests
+that cannot be served soon are rejected immediately instead of piling up.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Union
+
+
+class AdmissionRejected(RuntimeError):
+    """
+    A request was turned away.
+    reason is "rate_limited", "saturated" or "timeout".
+    """
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at rate tokens per second up to capacity.
+    """
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self._updated = clock()
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available. Returns False (taking nothing) otherwise."""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def refund(self, tokens: float = 1.0):
+        """Give back tokens taken by a request that was not served."""
+        self.tokens = min(self.capacity, self.tokens + tokens)
+
+
+class AdmissionController:
+    """
+    Limits concurrent requests, queues a bounded number of waiters and rate
+    limits each session. Use admit(session_id) around the protected work.
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_queue: int = 16, queue_timeout: float = 10.0,
+                 session_rate: float = 0.2, session_burst: float = 3.0, max_sessions: int = 10_000,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrent: Requests allowed to run at the same time.
+            max_queue: Requests allowed to wait for a slot; beyond that they are rejected.
+            queue_timeout: Longest wait in seconds for a slot before rejection.
+            session_rate: Requests per second each session earns.
+            session_burst: Requests a session may make back to back.
+            max_sessions: Session buckets kept; the least recently used are dropped.
+            clock: Injectable for tests.
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._in_flight = 0
+        self._waiting = 0
+        self._admitted = 0
+        self._rejected = {"rate_limited": 0, "saturated": 0, "timeout": 0}
+        self._waited = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @classmethod
+    def from_env(cls, prefix: str = "CHAT") -> "AdmissionController":
+        """
+        Build a controller from <prefix>_MAX_CONCURRENT, <prefix>_MAX_QUEUE,
+        <prefix>_QUEUE_TIMEOUT, <prefix>_SESSION_RATE (requests per minute) and
+        <prefix>_SESSION_BURST, falling back to the defaults.
+        """
+        return cls(
+            max_concurrent=int(os.getenv(f"{prefix}_MAX_CONCURRENT", "4")),
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", "16")),
+            queue_timeout=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT", "10")),
+            session_rate=float(os.getenv(f"{prefix}_SESSION_RATE", "12")) / 60,
+            session_burst=float(os.getenv(f"{prefix}_SESSION_BURST", "3")),
+        )
+
+    def _bucket(self, session_id: str) -> TokenBucket:
+        """Get a session's token bucket, creating it and evicting old sessions as needed."""
+        bucket = self._buckets.get(session_id)
+        if bucket is None:
+            bucket = TokenBucket(self.session_rate, self.session_burst, self.clock)
+            self._buckets[session_id] = bucket
+            if len(self._buckets) > self.max_sessions:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(session_id)
+        return bucket
+
+    def _reject(self, reason: str, message: str) -> AdmissionRejected:
+        """Count a rejection and build its exception (called with the lock held)."""
+        self._rejected[reason] += 1
+        return AdmissionRejected(reason, message)
+
+    @contextmanager
+    def admit(self, session_id: str) -> Iterator[None]:
+        """
+        Run the body of the with-block once a slot is free.
+        The session's rate token is only spent on admission: a request turned
+        away for saturation or timeout gets it back.
+
+        Raises:
+            AdmissionRejected: The session is over its rate, the wait queue is
+                               full, or no slot freed up within queue_timeout.
+        """
+        with self._cond:
+            bucket = self._bucket(session_id)
+            if not bucket.try_acquire():
+                raise self._reject("rate_limited", "You are sending messages too quickly; please wait a moment.")
+            if self._in_flight >= self.max_concurrent:
+                if self._waiting >= self.max_queue:
+                    bucket.refund()
+                    raise self._reject("saturated", "The assistant is busy right now; please try again shortly.")
+                self._waiting += 1
+                start = self.clock()
+                try:
+                    ok = self._cond.wait_for(lambda: self._in_flight < self.max_concurrent, self.queue_timeout)
+                finally:
+                    self._waiting -= 1
+                waited = self.clock() - start
+                self._waited += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+                if not ok:
+                    bucket.refund()
+                    raise self._reject("timeout", "The assistant is busy right now; please try again shortly.")
+            self._in_flight += 1
+            self._admitted += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify()
+
+    def metrics(self) -> Dict[str, Union[int, float]]:
+        """
+        Get the current load and counters: in_flight, queue_depth, admitted,
+        rejected counts per reason, and average/maximum queue wait in milliseconds.
+        """
+        with self._cond:
+            return {
+                "in_flight": self._in_flight,
+                "queue_depth": self._waiting,
+                "admitted": self._admitted,
+                **{f"rejected_{reason}": count for reason, count in self._rejected.items()},
+                "avg_wait_ms": round(1000 * self._total_wait / self._waited, 1) if self._waited else 0.0,
+                "max_wait_ms": round(1000 * self._max_wait, 1),
+            }
@@ -0,0 +1,258 @@
+"""
+api_client.py
+-------------
+HTTP client for the headless library API service (see api_server.py).
+LibraryAPIClient mirrors the LibrarySystem methods used by the Gradio interface
+and the tool surface of LibraryMCPServer, so the UI can run as a thin client of
+a shared API process.
+"""
+
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+from .changefeed import CursorExpired
+from .models import Book, Hold, Loan, Patron, Title
+from .serializers import from_wire
+
+
+class LibraryAPIError(RuntimeError):
+    """Raised when the API service cannot be reached or answers with a server error."""
+
+
+class LibraryAPIClient:
+    """
+    Remote stand-in for LibrarySystem backed by the JSON/HTTP API service.
+    Returns the same model objects as LibrarySystem; failures that LibrarySystem
+    reports as None/False are reported the same way here.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Root URL of the API service, e.g. http://127.0.0.1:8000
+            timeout: Per-request timeout in seconds.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+        """
+        Send a request and decode the JSON response.
+        Returns (status, data); raises LibraryAPIError on connection or 5xx errors.
+        """
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read() or b"null")
+        except urllib.error.HTTPError as e:
+            if e.code >= 500:
+                raise LibraryAPIError(f"API error {e.code} for {method} {path}") from e
+            return e.code, json.loads(e.read() or b"null")
+        except (urllib.error.URLError, OSError) as e:
+            raise LibraryAPIError(f"Cannot reach library API at {self.base_url}: {e}") from e
+
+    @property
+    def books(self) -> List[Book]:
+        """All books, fetched from the service."""
+        _, data = self._request("GET", "/books")
+        return [from_wire(Book, b) for b in data]
+
+    @property
+    def patrons(self) -> List[Patron]:
+        """All patrons, fetched from the service."""
+        _, data = self._request("GET", "/patrons")
+        return [from_wire(Patron, p) for p in data]
+
+    @property
+    def loans(self) -> List[Loan]:
+        """All loans, fetched from the service."""
+        _, data = self._request("GET", "/loans")
+        return [from_wire(Loan, l) for l in data]
+
+    def add_book(self, title: str, author: str, isbn: str) -> Book:
+        """Add a new book. Returns the created Book object."""
+        status, data = self._request("POST", "/books", {"title": title, "author": author, "isbn": isbn})
+        if status != 201:
+            raise LibraryAPIError(data.get("error", f"Unexpected status {status}"))
+        return from_wire(Book, data)
+
+    def add_patron(self, name: str, email: str, phone: str) -> Patron:
+        """Add a new patron. Returns the created Patron object."""
+        status, data = self._request("POST", "/patrons", {"name": name, "email": email, "phone": phone})
+        if status != 201:
+            raise LibraryAPIError(data.get("error", f"Unexpected status {status}"))
+        return from_wire(Patron, data)
+
+    def borrow_book(self, book_id: int, patron_id: int, days: int = 14) -> Optional[Loan]:
+        """Borrow a book. Returns the created Loan object, or None if borrowing fails."""
+        status, data = self._request(
+            "POST", "/loans", {"book_id": book_id, "patron_id": patron_id, "days": days}
+        )
+        return from_wire(Loan, data) if status == 201 else None
+
+    def return_book(self, book_id: int) -> bool:
+        """Return a borrowed book. Returns True if successful, False otherwise."""
+        status, _ = self._request("POST", "/returns", {"book_id": book_id})
+        return status == 200
+
+    def add_copies(self, title_id: int, count: int) -> List[Book]:
+        """Add copies of a title. Returns the created Book objects (empty if the title does not exist)."""
+        status, data = self._request("POST", f"/titles/{title_id}/copies", {"count": count})
+        return [from_wire(Book, b) for b in data] if status == 201 else []
+
+    def place_hold(self, book_id: int, patron_id: int, days: int = 14) -> Optional[Hold]:
+        """Join the waiting list for a book's title. Returns the Hold, or None on failure."""
+        status, data = self._request(
+            "POST", "/holds", {"book_id": book_id, "patron_id": patron_id, "days": days}
+        )
+        return from_wire(Hold, data) if status == 201 else None
+
+    def cancel_hold(self, hold_id: int) -> bool:
+        """Cancel a waiting hold. Returns True if successful, False otherwise."""
+        status, _ = self._request("POST", f"/holds/{hold_id}/cancel", {})
+        return status == 200
+
+    def get_title(self, title_id: int) -> Optional[Title]:
+        """Get a title by ID, or None if not found."""
+        status, data = self._request("GET", f"/titles/{title_id}")
+        return from_wire(Title, data) if status == 200 else None
+
+    def get_book(self, book_id: int) -> Optional[Book]:
+        """Get a book by ID, or None if not found."""
+        status, data = self._request("GET", f"/books/{book_id}")
+        return from_wire(Book, data) if status == 200 else None
+
+    def get_patron(self, patron_id: int) -> Optional[Patron]:
+        """Get a patron by ID, or None if not found."""
+        status, data = self._request("GET", f"/patrons/{patron_id}")
+        return from_wire(Patron, data) if status == 200 else None
+
+    def find_patron_by_email(self, email: str) -> Optional[Patron]:
+        """Find a patron by email address, or None if not found."""
+        patrons = self._search_patrons(email=email)
+        return patrons[0] if patrons else None
+
+    def find_patron_by_phone(self, phone: str) -> Optional[Patron]:
+        """Find a patron by phone number, or None if not found."""
+        patrons = self._search_patrons(phone=phone)
+        return patrons[0] if patrons else None
+
+    def find_books(self, query: str, limit: int = 5) -> List[Tuple[Book, float]]:
+        """Find books by approximate title or author; (Book, score) pairs, best first."""
+        params = urllib.parse.urlencode({"q": query, "limit": limit})
+        _, data = self._request("GET", "/books/search?" + params)
+        return [(from_wire(Book, m["book"]), m["score"]) for m in data]
+
+    def find_patrons_by_name(self, prefix: str, limit: int = 10) -> List[Patron]:
+        """Find patrons by name prefix."""
+        return self._search_patrons(name=prefix, limit=limit)
+
+    def _search_patrons(self, **query: Any) -> List[Patron]:
+        """Run a patron search on the service."""
+        _, data = self._request("GET", "/patrons/search?" + urllib.parse.urlencode(query))
+        return [from_wire(Patron, p) for p in data]
+
+    def get_patron_loans(self, patron_id: int) -> List[Loan]:
+        """Get all loans for a specific patron."""
+        _, data = self._request("GET", f"/patrons/{patron_id}/loans")
+        return [from_wire(Loan, l) for l in data or []]
+
+    def get_overdue_loans(self) -> List[Loan]:
+        """Get all overdue loans."""
+        _, data = self._request("GET", "/loans/overdue")
+        return [from_wire(Loan, l) for l in data]
+
+    def get_overdue_details(self) -> List[Tuple[Loan, Book, Patron]]:
+        """Get all overdue loans, each with its book and patron, in one request."""
+        _, data = self._request("GET", "/loans/overdue?expand=1")
+        return [
+            (from_wire(Loan, d["loan"]), from_wire(Book, d["book"]), from_wire(Patron, d["patron"]))
+            for d in data
+        ]
+
+    def get_due_soon_loans(self, days: float = 3) -> List[Loan]:
+        """Get open loans due within the given number of days."""
+        _, data = self._request("GET", f"/loans/due-soon?days={days}")
+        return [from_wire(Loan, l) for l in data]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the library dashboard totals."""
+        _, data = self._request("GET", "/stats")
+        stats: Dict[str, int] = data
+        return stats
+
+    def status_page(self, view: str, query: str = "", sort_by: str = "", descending: bool = False,
+                    page: int = 1, page_size: int = 25) -> Dict[str, Any]:
+        """
+        Get one page of a status table, filtered and sorted by the service.
+        Returns {"headers", "data", "page", "pages", "total"} (see status_views.status_page).
+        """
+        params = urllib.parse.urlencode({
+            "q": query or "", "sort": sort_by or "", "desc": int(bool(descending)),
+            "page": int(page or 1), "page_size": int(page_size),
+        })
+        status, data = self._request("GET", f"/status/{urllib.parse.quote(view)}?{params}")
+        if status != 200:
+            raise ValueError(data.get("error", f"Unexpected status {status}"))
+        page_data: Dict[str, Any] = data
+        return page_data
+
+    def submit_job(self, kind: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Start a background job on the service; returns its status dict."""
+        _, data = self._request("POST", "/jobs", {"kind": kind, "params": params or {}})
+        job: Dict[str, Any] = data
+        return job
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a job's status dict (with its result once done), or None if not found."""
+        status, data = self._request("GET", f"/jobs/{job_id}")
+        job: Optional[Dict[str, Any]] = data if status == 200 else None
+        return job
+
+    def get_changes(self, after: int = 0, limit: int = 1000, wait: float = 0,
+                    stream_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Read the change feed after a cursor, waiting up to wait seconds for news.
+        Returns {"stream_id", "latest_seq", "changes"}; each change is a dict
+        with seq, event, kind, record_id, record and at.
+        Raises CursorExpired when the cursor must be resynchronized, and
+        LibraryAPIError when the service has too many waiting reads (retry later).
+        Keep wait below the client timeout.
+        """
+        query: Dict[str, Any] = {"after": after, "limit": limit, "wait": wait}
+        if stream_id:
+            query["stream"] = stream_id
+        status, data = self._request("GET", "/changes?" + urllib.parse.urlencode(query))
+        if status == 410:
+            raise CursorExpired(after, data["oldest_seq"], data["error"])
+        changes: Dict[str, Any] = data
+        return changes
+
+    def get_tools(self) -> List[Dict[str, Any]]:
+        """Get the MCP tool definitions offered by the service."""
+        _, data = self._request("GET", "/tools")
+        tools: List[Dict[str, Any]] = data
+        return tools
+
+    def execute_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> str:
+        """
+        Execute an MCP tool on the service.
+        Returns the tool result as a string, like LibraryMCPServer.execute_tool.
+        """
+        try:
+            status, data = self._request("POST", f"/tools/{tool_name}", tool_input)
+        except LibraryAPIError as e:
+            return f"Error executing {tool_name}: {e}"
+        if status != 200:
+            return f"Error executing {tool_name}: {data.get('error', status)}"
+        result: str = data["result"]
+        return result
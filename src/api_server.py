@@ -0,0 +1,438 @@
+"""
+api_server.py
+-------------
+Headless JSON/HTTP API service around a single LibrarySystem.
+Lets the business core run in its own process with its own worker pool, so
+several Gradio UI replicas (or other clients) can share one library:
+
+    python -m src.api_server --port 8000 --workers 16 --sample-data
+
+Branch shards of a ShardedLibrary run one service each, e.g. the second of
+three branches with --shard-index 1 --shard-count 3.
+
+Endpoints:
+    GET  /health
+    GET  /books              POST /books    {"title", "author", "isbn"}
+    GET  /books/<id>
+    GET  /books/search?q=...&limit=...   typo-tolerant title/author search
+    GET  /titles/<id>        POST /titles/<id>/copies  {"count"}
+    GET  /patrons            POST /patrons  {"name", "email", "phone"}
+    GET  /patrons/<id>
+    GET  /patrons/search?email=...|phone=...|name=...&limit=...
+    GET  /patrons/<id>/loans
+    GET  /loans
+    GET  /loans/overdue?expand=1         expand: each loan with its book and patron
+    GET  /loans/due-soon?days=3
+    GET  /stats
+    GET  /status/<view>?q=...&sort=...&desc=1&page=...&page_size=...
+                             one page of a Books/Patrons/Overdue status table
+    POST /loans              {"book_id", "patron_id", "days"}
+    POST /returns            {"book_id"}
+    POST /holds              {"book_id", "patron_id", "days"}
+    POST /holds/<id>/cancel
+    GET  /jobs               POST /jobs     {"kind", "params"}
+    GET  /jobs/<id>
+    GET  /tools              POST /tools/<name>  (MCP tool execution)
+    GET  /changes?after=<seq>&limit=...&wait=<seconds>&stream=<stream_id>
+                             change feed: mutations after a cursor, 410 once expired;
+                             503 with Retry-After when too many reads are already waiting
+
+Admin endpoints (only when LIBRARY_ADMIN_TOKEN is set; send it as X-Admin-Token):
+    GET  /admin/profile                  running profilers and top methods
+    POST /admin/profile/start  {"modes": ["stats", "sampling"], "interval"}
+    POST /admin/profile/stop   {"dump_dir"}  writes pstats/collapsed dumps under LIBRARY_PROFILE_DIR
+    POST /admin/archive        {"path", "compress"}  saves the library state (see archive.py)
+                                         under LIBRARY_ARCHIVE_DIR
+Paths sent to admin endpoints are relative to those directories; paths
+leading outside them are rejected with 400.
+"""
+
+import argparse
+import hmac
+import os
+import sys
+import threading
+from urllib.parse import parse_qs, urlsplit
+from typing import Any, Dict, Optional, Tuple
+
+from .archive import load_library, save_library
+from .changefeed import ChangeFeed, CursorExpired
+from .fines import FineEngine, FinePolicy
+from .http_pool import JSONRequestHandler, PooledHTTPServer
+from .jobs import JobManager
+from .library import LibrarySystem
+from .mcp_server import LibraryMCPServer
+from .overdue import LogSink, OverdueScanner
+from .profiling import PROFILER, configure_from_env
+from .recommend import CoBorrowIndex
+from .sample_data import add_sample_data
+from .serializers import JOB_FIELDS, to_dict, to_plain, to_wire
+from .snapshot import read_view
+from .status_views import STATUS_COLUMNS, overdue_details, status_page
+
+# Limits of one change feed read; long polls hold a worker thread while they wait
+MAX_CHANGES_PER_READ = 5000
+MAX_CHANGES_WAIT = 25.0
+# Share of the worker pool that waiting change feed reads may hold at once
+LONG_POLL_SHARE = 0.25
+# Largest page of a status table
+MAX_STATUS_PAGE_SIZE = 500
+
+
+def _confined_path(root: str, path: str) -> Optional[str]:
+    """
+    Resolve a path sent by a client inside a configured directory.
+    Returns the absolute path, or None when it leads outside the directory
+    (an absolute path, "..", or a symlink pointing elsewhere).
+    """
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    return resolved if os.path.commonpath((root, resolved)) == root else None
+
+
+class LibraryAPIRequestHandler(JSONRequestHandler):
+    """
+    Routes JSON/HTTP requests to the server's LibrarySystem and LibraryMCPServer.
+    """
+    server: "LibraryHTTPServer"
+
+    def _parts(self):
+        """Split the request path into its non-empty segments."""
+        return [p for p in self.path.split("?")[0].split("/") if p]
+
+    def _body(self) -> Optional[Dict[str, Any]]:
+        """Read a JSON object body, answering 400 and returning None when invalid."""
+        try:
+            body = self.read_json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            self.send_json(400, {"error": "Request body must be a JSON object"})
+            return None
+        return body
+
+    def _admin_allowed(self) -> bool:
+        """Check the admin token, answering 404 when admin is disabled and 403 when it is wrong."""
+        token = os.getenv("LIBRARY_ADMIN_TOKEN")
+        if not token:
+            self.send_json(404, {"error": "Not found"})
+            return False
+        if not hmac.compare_digest(self.headers.get("X-Admin-Token", ""), token):
+            self.send_json(403, {"error": "Forbidden"})
+            return False
+        return True
+
+    def do_GET(self):
+        library = self.server.library
+        parts = self._parts()
+        try:
+            if parts[:1] == ["admin"]:
+                if not self._admin_allowed():
+                    return
+                if parts == ["admin", "profile"]:
+                    self.send_json(200, PROFILER.status())
+                else:
+                    self.send_json(404, {"error": "Not found"})
+            elif parts == ["health"]:
+                self.send_json(200, {"status": "ok"})
+            elif parts == ["books"]:
+                with read_view(library) as view:
+                    books = [to_wire(b) for b in view.books]
+                self.send_json(200, books)
+            elif parts == ["books", "search"]:
+                query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                matches = library.find_books(query.get("q", ""), int(query.get("limit", 5)))
+                self.send_json(200, [{"book": to_wire(b), "score": score} for b, score in matches])
+            elif len(parts) == 2 and parts[0] == "books":
+                book = library.get_book(int(parts[1]))
+                self._send_entity(book, "Book")
+            elif len(parts) == 2 and parts[0] == "titles":
+                title = library.get_title(int(parts[1]))
+                self._send_entity(title, "Title")
+            elif parts == ["patrons"]:
+                self.send_json(200, [to_wire(p) for p in library.patrons])
+            elif parts == ["patrons", "search"]:
+                self._search_patrons(library)
+            elif len(parts) == 2 and parts[0] == "patrons":
+                patron = library.get_patron(int(parts[1]))
+                self._send_entity(patron, "Patron")
+            elif len(parts) == 3 and parts[0] == "patrons" and parts[2] == "loans":
+                loans = library.get_patron_loans(int(parts[1]))
+                self.send_json(200, [to_wire(l) for l in loans])
+            elif parts == ["loans"]:
+                with read_view(library) as view:
+                    rows = [to_wire(l) for l in view.loans]
+                self.send_json(200, rows)
+            elif parts == ["loans", "overdue"]:
+                query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                if query.get("expand", "0") in ("1", "true"):
+                    with read_view(library) as view:
+                        details = overdue_details(view)
+                    self.send_json(200, [
+                        {"loan": to_wire(l), "book": to_wire(b), "patron": to_wire(p)} for l, b, p in details
+                    ])
+                else:
+                    self.send_json(200, [to_wire(l) for l in library.get_overdue_loans()])
+            elif parts == ["loans", "due-soon"]:
+                query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                loans = library.get_due_soon_loans(float(query.get("days", "3")))
+                self.send_json(200, [to_wire(l) for l in loans])
+            elif parts == ["stats"]:
+                self.send_json(200, library.get_stats())
+            elif len(parts) == 2 and parts[0] == "status":
+                self._status_page(library, parts[1])
+            elif parts == ["jobs"]:
+                self.send_json(200, [to_dict(j, JOB_FIELDS) for j in self.server.jobs.list_jobs()])
+            elif len(parts) == 2 and parts[0] == "jobs":
+                job = self.server.jobs.get_job(int(parts[1]))
+                if job is None:
+                    self.send_json(404, {"error": "Job not found"})
+                else:
+                    data = to_dict(job, JOB_FIELDS)
+                    if job.status == "done":
+                        data["result"] = to_plain(job.result)
+                    self.send_json(200, data)
+            elif parts == ["tools"]:
+                self.send_json(200, self.server.mcp_server.get_tools())
+            elif parts == ["changes"]:
+                self._read_changes()
+            else:
+                self.send_json(404, {"error": "Not found"})
+        except ValueError:
+            self.send_json(400, {"error": "IDs must be integers"})
+
+    def do_POST(self):
+        library = self.server.library
+        parts = self._parts()
+        body = self._body()
+        if body is None:
+            return
+        try:
+            if parts[:1] == ["admin"]:
+                if not self._admin_allowed():
+                    return
+                if parts == ["admin", "profile", "start"]:
+                    PROFILER.start(body.get("modes", ["stats", "sampling"]), body.get("interval"))
+                    self.send_json(200, PROFILER.status())
+                elif parts == ["admin", "profile", "stop"]:
+                    dump_dir = _confined_path(os.getenv("LIBRARY_PROFILE_DIR", "profiles"), body.get("dump_dir", ""))
+                    if dump_dir is None:
+                        self.send_json(400, {"error": "dump_dir must be inside LIBRARY_PROFILE_DIR"})
+                        return
+                    paths = PROFILER.stop(dump_dir)
+                    self.send_json(200, {"files": paths, **PROFILER.status()})
+                elif parts == ["admin", "archive"]:
+                    path = _confined_path(os.getenv("LIBRARY_ARCHIVE_DIR", "archives"), body["path"])
+                    if path is None:
+                        self.send_json(400, {"error": "path must be inside LIBRARY_ARCHIVE_DIR"})
+                        return
+                    try:
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        header = save_library(library, path, bool(body.get("compress", True)))
+                    except OSError as e:
+                        self.send_json(400, {"error": f"Cannot write archive: {e}"})
+                        return
+                    self.send_json(200, {
+                        "path": path,
+                        "rows": {name: table["rows"] for name, table in header["tables"].items()},
+                    })
+                else:
+                    self.send_json(404, {"error": "Not found"})
+            elif parts == ["books"]:
+                book = library.add_book(body["title"], body["author"], body["isbn"])
+                self.send_json(201, to_wire(book))
+            elif parts == ["patrons"]:
+                patron = library.add_patron(body["name"], body["email"], body["phone"])
+                self.send_json(201, to_wire(patron))
+            elif parts == ["loans"]:
+                loan = library.borrow_book(
+                    int(body["book_id"]), int(body["patron_id"]), int(body.get("days", 14))
+                )
+                if loan:
+                    self.send_json(201, to_wire(loan))
+                else:
+                    self.send_json(409, {"error": "Failed to borrow book"})
+            elif parts == ["returns"]:
+                if library.return_book(int(body["book_id"])):
+                    self.send_json(200, {"returned": True})
+                else:
+                    self.send_json(409, {"error": "Failed to return book"})
+            elif len(parts) == 3 and parts[0] == "titles" and parts[2] == "copies":
+                books = library.add_copies(int(parts[1]), int(body.get("count", 1)))
+                if books:
+                    self.send_json(201, [to_wire(b) for b in books])
+                else:
+                    self.send_json(404, {"error": "Title not found"})
+            elif parts == ["holds"]:
+                hold = library.place_hold(
+                    int(body["book_id"]), int(body["patron_id"]), int(body.get("days", 14))
+                )
+                if hold:
+                    self.send_json(201, to_wire(hold))
+                else:
+                    self.send_json(409, {"error": "Failed to place hold"})
+            elif len(parts) == 3 and parts[0] == "holds" and parts[2] == "cancel":
+                if library.cancel_hold(int(parts[1])):
+                    self.send_json(200, {"cancelled": True})
+                else:
+                    self.send_json(409, {"error": "Failed to cancel hold"})
+            elif parts == ["jobs"]:
+                job = self.server.jobs.submit(body["kind"], body.get("params"))
+                self.send_json(202, to_dict(job, JOB_FIELDS))
+            elif len(parts) == 2 and parts[0] == "tools":
+                result = self.server.mcp_server.execute_tool(parts[1], body)
+                self.send_json(200, {"result": result})
+            else:
+                self.send_json(404, {"error": "Not found"})
+        except KeyError as e:
+            self.send_json(400, {"error": f"Missing field: {e.args[0]}"})
+        except (TypeError, ValueError) as e:
+            self.send_json(400, {"error": str(e)})
+
+    def _search_patrons(self, library):
+        """Answer a patron search by exact email or phone, or by name prefix."""
+        query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        if "email" in query:
+            patron = library.find_patron_by_email(query["email"])
+            patrons = [patron] if patron else []
+        elif "phone" in query:
+            patron = library.find_patron_by_phone(query["phone"])
+            patrons = [patron] if patron else []
+        elif "name" in query:
+            patrons = library.find_patrons_by_name(query["name"], int(query.get("limit", 10)))
+        else:
+            self.send_json(400, {"error": "Search by email, phone or name"})
+            return
+        self.send_json(200, [to_wire(p) for p in patrons])
+
+    def _status_page(self, library, view: str):
+        """Answer one page of a status table, computed on a snapshot."""
+        if view not in STATUS_COLUMNS:
+            self.send_json(404, {"error": f"Unknown view: {view}"})
+            return
+        query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        page = int(query.get("page", 1))
+        page_size = min(int(query.get("page_size", 25)), MAX_STATUS_PAGE_SIZE)
+        with read_view(library) as source:
+            result = status_page(
+                source, view, query.get("q", ""), query.get("sort", ""),
+                query.get("desc", "0") in ("1", "true"), page, page_size
+            )
+        self.send_json(200, result)
+
+    def _read_changes(self):
+        """
+        Answer a change feed read; long-polls up to wait seconds when nothing is new.
+        Waiting reads are capped so they cannot take every worker from other requests.
+        """
+        query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        feed = self.server.changes
+        after = int(query.get("after", 0))
+        limit = min(int(query.get("limit", 1000)), MAX_CHANGES_PER_READ)
+        wait = min(float(query.get("wait", 0)), MAX_CHANGES_WAIT)
+        long_polls = self.server.long_polls
+        if wait > 0 and not long_polls.acquire(blocking=False):
+            self.send_json(503, {"error": "Too many waiting change feed reads"}, {"Retry-After": "1"})
+            return
+        try:
+            changes = feed.read(after, limit, wait, query.get("stream"))
+        except CursorExpired as e:
+            self.send_json(410, {"error": str(e), "stream_id": feed.stream_id, "oldest_seq": e.oldest})
+            return
+        finally:
+            if wait > 0:
+                long_polls.release()
+        self.send_json(200, {
+            "stream_id": feed.stream_id,
+            "latest_seq": feed.latest_seq,
+            "changes": [to_wire(c) for c in changes],
+        })
+
+    def _send_entity(self, entity: Any, kind: str):
+        """Send a single model object, or 404 when it does not exist."""
+        if entity is None:
+            self.send_json(404, {"error": f"{kind} not found"})
+        else:
+            self.send_json(200, to_wire(entity))
+
+
+class LibraryHTTPServer(PooledHTTPServer):
+    """
+    PooledHTTPServer serving one LibrarySystem, with the services its request
+    handlers reach through self.server.
+    """
+
+    def __init__(self, server_address: Tuple[str, int], library: LibrarySystem, max_workers: int = 16):
+        """
+        Initialize the server and the services built around the library.
+
+        Args:
+            server_address: (host, port) to bind; port 0 picks a free port.
+            library: The LibrarySystem to serve.
+            max_workers: Number of worker threads handling requests.
+        """
+        super().__init__(server_address, LibraryAPIRequestHandler, max_workers=max_workers)
+        self.library = library
+        self.jobs = JobManager(library)
+        self.changes = ChangeFeed(library)
+        self.long_polls = threading.BoundedSemaphore(max(1, int(max_workers * LONG_POLL_SHARE)))
+        self.fines = FineEngine(library, FinePolicy.from_env())
+        self.recommendations = CoBorrowIndex(library)
+        self.mcp_server = LibraryMCPServer(
+            library, jobs=self.jobs, fines=self.fines, recommendations=self.recommendations
+        )
+
+
+def create_api_server(library: LibrarySystem, host: str = "127.0.0.1",
+                      port: int = 8000, workers: int = 16) -> LibraryHTTPServer:
+    """
+    Create (but do not start) the API server for a LibrarySystem.
+    Call serve_forever() on the result to start handling requests.
+    """
+    return LibraryHTTPServer((host, port), library, max_workers=workers)
+
+
+def main(argv=None):
+    """
+    Run the API service with a fresh LibrarySystem.
+    """
+    parser = argparse.ArgumentParser(description="Library API service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--sample-data", action="store_true", help="Seed demonstration records")
+    parser.add_argument("--load-state", metavar="PATH", help="Start from a library archive (see archive.py)")
+    parser.add_argument("--shard-index", type=int, default=0, help="Index of this branch shard")
+    parser.add_argument("--shard-count", type=int, default=1, help="Total number of branch shards")
+    parser.add_argument(
+        "--overdue-notifications", action="store_true",
+        default=os.getenv("ENABLE_OVERDUE_NOTIFICATIONS", "false").lower() in ("1", "true", "yes", "on"),
+        help="Log loans as they become overdue (default from ENABLE_OVERDUE_NOTIFICATIONS)"
+    )
+    args = parser.parse_args(argv)
+
+    configure_from_env()
+    if args.load_state:
+        library = load_library(args.load_state)
+        if (library._id_start, library._id_step) != (args.shard_index + 1, args.shard_count):
+            parser.error("--load-state archive was saved by a different shard layout")
+    else:
+        library = LibrarySystem(id_start=args.shard_index + 1, id_step=args.shard_count)
+    # Patrons of other branches are validated by the ShardedLibrary router
+    library.sibling_patrons = args.shard_count > 1
+    if args.sample_data:
+        add_sample_data(library)
+    if args.overdue_notifications:
+        OverdueScanner(library, LogSink()).start()
+    server = create_api_server(library, args.host, args.port, args.workers)
+    print(f"Library API listening on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
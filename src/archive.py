@@ -0,0 +1,300 @@
+"""
+archive.py
+----------
+Compact binary archive of the entire library state, for moving a library
+between hosts or seeding test environments without replaying every add_book,
+add_patron and borrow_book call.
+
+The file is columnar: every record field is stored as one section (int64 or
+int8 arrays; strings as a UTF-8 blob plus int64 offsets), each optionally
+zlib-compressed and aligned to 8 bytes. A JSON header lists the sections and
+the ID counters. Uncompressed sections are read straight from a memory map
+without copying.
+
+Layout: MAGIC, header length (uint32, little-endian), JSON header, padding to
+8 bytes, then the sections at the offsets named in the header.
+"""
+
+import gc
+import json
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Sequence, Tuple, Union
+
+from .clock import from_epoch_micros, to_epoch_micros
+from .library import LibrarySystem
+from .models import Book, Hold, Loan, Patron, Title
+from .snapshot import clone
+
+MAGIC = b"LIBARCH\x00"
+FORMAT_VERSION = 1
+# Stored in int64 columns for None (optional IDs and dates)
+NULL = -2 ** 63
+_ALIGN = 8
+
+# Column layout per table: (field, type); "ref" is an optional int
+SCHEMA: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "titles": (("id", "int"), ("title", "str"), ("author", "str"), ("isbn", "str"),
+               ("total_copies", "int"), ("available_copies", "int")),
+    # A book's title, author and ISBN come from its title record
+    "books": (("id", "int"), ("title_id", "int"), ("available", "bool"), ("borrowed_by", "ref")),
+    "patrons": (("id", "int"), ("name", "str"), ("email", "str"), ("phone", "str")),
+    "loans": (("id", "int"), ("book_id", "int"), ("patron_id", "int"), ("loan_date", "datetime"),
+              ("due_date", "datetime"), ("return_date", "datetime")),
+    "holds": (("id", "int"), ("book_id", "int"), ("patron_id", "int"), ("placed_date", "datetime"),
+              ("days", "int"), ("loan_id", "ref"), ("cancelled", "bool")),
+}
+
+
+def _to_micros(moment: Optional[datetime]) -> int:
+    """Encode a naive datetime as microseconds since 1970-01-01 (NULL for None)."""
+    return NULL if moment is None else to_epoch_micros(moment)
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector while millions of records are built:
+    they contain no cycles, and repeated full collections would dominate the time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class _SectionWriter:
+    """Collects encoded sections and their offsets relative to the data start."""
+
+    def __init__(self, compress: bool, level: int):
+        self.compress = compress
+        self.level = level
+        self.chunks: List[bytes] = []
+        self.offset = 0
+
+    def add(self, data: bytes) -> Dict[str, Any]:
+        """Append one section and describe it for the header."""
+        raw_size = len(data)
+        codec = "raw"
+        if self.compress:
+            packed = zlib.compress(data, self.level)
+            if len(packed) < raw_size:
+                data, codec = packed, "zlib"
+        section = {"offset": self.offset, "size": len(data), "raw_size": raw_size, "codec": codec}
+        padding = -len(data) % _ALIGN
+        self.chunks.append(data + b"\0" * padding)
+        self.offset += len(data) + padding
+        return section
+
+    def column(self, kind: str, values: Sequence[Any]) -> Dict[str, Any]:
+        """Encode one column."""
+        if kind == "str":
+            offsets = array("q", [0])
+            total = 0
+            for value in values:
+                total += len(value)
+                offsets.append(total)
+            return {
+                "type": kind,
+                "offsets": self.add(offsets.tobytes()),
+                "data": self.add("".join(values).encode("utf-8")),
+            }
+        if kind == "bool":
+            data = array("b", values).tobytes()
+        elif kind == "ref":
+            data = array("q", [NULL if v is None else v for v in values]).tobytes()
+        elif kind == "datetime":
+            data = array("q", map(_to_micros, values)).tobytes()
+        else:
+            data = array("q", values).tobytes()
+        return {"type": kind, **self.add(data)}
+
+
+def save_library(library: LibrarySystem, path: str, compress: bool = True, level: int = 1) -> Dict[str, Any]:
+    """
+    Write the full state of a library to an archive file.
+    Records are read from a snapshot, so checkouts continue while the file is written.
+
+    Args:
+        library: The LibrarySystem to save.
+        path: Output file.
+        compress: zlib-compress each section (kept raw when that does not shrink it).
+            Uncompressed archives are larger but load without copying.
+        level: zlib compression level.
+
+    Returns:
+        The archive header.
+    """
+    with library._lock:
+        snapshot = library.snapshot()
+        holds = [clone(h) for h in library._holds.values()]
+        next_hold = library._hold_id_counter
+    writer = _SectionWriter(compress, level)
+    tables: Dict[str, Dict[str, Any]] = {}
+    with snapshot, _gc_paused():
+        sources = {
+            "titles": snapshot.titles,
+            "books": snapshot.books,
+            "patrons": snapshot.patrons,
+            "loans": snapshot.loans,
+        }
+        for name, schema in SCHEMA.items():
+            fields = [field for field, _ in schema]
+            if name == "holds":
+                rows = [tuple(getattr(h, field) for field in fields) for h in holds]
+            else:
+                rows = list(sources[name].rows(*fields))
+            # Transpose the rows into one list per column
+            values = list(zip(*rows)) if rows else [()] * len(fields)
+            tables[name] = {
+                "rows": len(rows),
+                "columns": {field: writer.column(kind, column) for (field, kind), column in zip(schema, values)},
+            }
+        next_ids = {
+            "title": snapshot._next_ids[Title],
+            "book": snapshot._next_ids[Book],
+            "patron": snapshot._next_ids[Patron],
+            "loan": snapshot._next_ids[Loan],
+            "hold": next_hold,
+        }
+    header = {
+        "version": FORMAT_VERSION,
+        "created": datetime.now().isoformat(),
+        "byteorder": sys.byteorder,
+        "id_start": library._id_start,
+        "id_step": library._id_step,
+        "next_ids": next_ids,
+        "tables": tables,
+    }
+    encoded = json.dumps(header).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(encoded)) + encoded
+    prefix += b"\0" * (-len(prefix) % _ALIGN)
+    with open(path, "wb") as f:
+        f.write(prefix)
+        for chunk in writer.chunks:
+            f.write(chunk)
+    return header
+
+
+def _read_prefix(buffer) -> Tuple[Dict[str, Any], int]:
+    """Parse the header. Returns (header, offset of the first section)."""
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a library archive")
+    (length,) = struct.unpack_from("<I", buffer, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(bytes(buffer[start:start + length]))
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported library archive version: {header.get('version')}")
+    data_start = start + length
+    return header, data_start + (-data_start % _ALIGN)
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    """Read an archive's header (format version, counters, tables and sections)."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return _read_prefix(mapped)[0]
+
+
+class _SectionReader:
+    """Decodes sections from a memory-mapped archive."""
+
+    def __init__(self, view: memoryview, data_start: int, byteorder: str):
+        self.view = view
+        self.data_start = data_start
+        self.swap = byteorder != sys.byteorder
+
+    def raw(self, section: Dict[str, Any]):
+        """Get a section's bytes: a zero-copy view when stored raw."""
+        start = self.data_start + section["offset"]
+        data = self.view[start:start + section["size"]]
+        if section["codec"] == "zlib":
+            return zlib.decompress(data)
+        if section["codec"] != "raw":
+            raise ValueError(f"Unknown section codec: {section['codec']}")
+        return data
+
+    def ints(self, section: Dict[str, Any],
+             typecode: Literal["q", "b"] = "q") -> Union["array[int]", "memoryview[int]"]:
+        """Decode an integer section: int64 ("q") or int8 ("b") values."""
+        data = self.raw(section)
+        if self.swap and typecode == "q":
+            values = array("q", data)
+            values.byteswap()
+            return values
+        return memoryview(data).cast(typecode)
+
+    def column(self, spec: Dict[str, Any]) -> List[Any]:
+        """Decode one column into a list of Python values."""
+        kind = spec["type"]
+        if kind == "str":
+            offsets = self.ints(spec["offsets"]).tolist()
+            text = str(self.raw(spec["data"]), "utf-8")
+            return [text[a:b] for a, b in zip(offsets, offsets[1:])]
+        if kind == "bool":
+            return [bool(v) for v in self.ints(spec, "b")]
+        values = self.ints(spec).tolist()
+        if kind == "ref":
+            return [None if v == NULL else v for v in values]
+        if kind == "datetime":
+            return [None if v == NULL else from_epoch_micros(v) for v in values]
+        return values
+
+
+def load_library(path: str, clock: Callable[[], datetime] = datetime.now) -> LibrarySystem:
+    """
+    Load a library from an archive written by save_library.
+    clock is the loaded library's time source (see LibrarySystem).
+
+    Raises:
+        ValueError: The file is not a library archive or has an unsupported version.
+    """
+    with _gc_paused():
+        return _load(path, clock)
+
+
+def _load(path: str, clock: Callable[[], datetime]) -> LibrarySystem:
+    """Decode an archive into a LibrarySystem."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            header, data_start = _read_prefix(view)
+            reader = _SectionReader(view, data_start, header["byteorder"])
+            columns = {
+                name: {field: reader.column(spec) for field, spec in table["columns"].items()}
+                for name, table in header["tables"].items()
+            }
+        finally:
+            view.release()
+
+    t = columns["titles"]
+    titles = [Title(*row) for row in zip(
+        t["id"], t["title"], t["author"], t["isbn"], t["total_copies"], t["available_copies"]
+    )]
+    titles_by_id = {title.id: title for title in titles}
+    b = columns["books"]
+    books = []
+    for book_id, title_id, available, borrowed_by in zip(b["id"], b["title_id"], b["available"], b["borrowed_by"]):
+        title = titles_by_id[title_id]
+        books.append(Book(book_id, title.title, title.author, title.isbn, title_id, available, borrowed_by))
+    p = columns["patrons"]
+    patrons = [Patron(*row) for row in zip(p["id"], p["name"], p["email"], p["phone"])]
+    l = columns["loans"]
+    loans = [Loan(*row) for row in zip(
+        l["id"], l["book_id"], l["patron_id"], l["loan_date"], l["due_date"], l["return_date"]
+    )]
+    h = columns["holds"]
+    holds = [Hold(*row) for row in zip(
+        h["id"], h["book_id"], h["patron_id"], h["placed_date"], h["days"], h["loan_id"], h["cancelled"]
+    )]
+    return LibrarySystem.from_records(
+        titles, books, patrons, loans, holds, header["next_ids"],
+        id_start=header["id_start"], id_step=header["id_step"], clock=clock
+    )
@@ -0,0 +1,266 @@
+"""
+changefeed.py
+-------------
+Ordered change stream of library mutations for downstream consumers such as
+search indexes, dashboards and notification services.
+Every mutation reported through the library's listener hook gets a sequence
+number and is kept in a bounded in-memory log. Consumers read the changes after
+a cursor (the last sequence number they processed) at their own pace, so a slow
+consumer never delays writers or other consumers. A consumer that falls further
+behind than the log retains gets CursorExpired and resynchronizes from a
+snapshot taken at a known sequence number.
+"""
+
+import logging
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .locking import locked
+from .serializers import to_wire
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Change:
+    """
+    One library mutation.
+    Attributes:
+        seq: Position in the stream, starting at 1 and increasing by 1.
+        event: Listener event name, e.g. "book_added" or "book_returned".
+        kind: Type of the affected record: "title", "book", "patron", "loan" or "hold".
+        record_id: ID of the affected record.
+        record: The record's fields right after the mutation (to_wire encoding).
+        at: When the mutation happened.
+    """
+    seq: int
+    event: str
+    kind: str
+    record_id: int
+    record: Dict[str, Any]
+    at: datetime
+
+
+class CursorExpired(LookupError):
+    """
+    A cursor cannot be served: it is older than the retained log, ahead of the
+    stream, or from another stream (e.g. before a restart). The consumer must
+    resynchronize (see ChangeFeed.resync).
+    """
+    def __init__(self, cursor: int, oldest: int, message: str):
+        super().__init__(message)
+        self.cursor = cursor
+        self.oldest = oldest
+
+
+class ChangeFeed:
+    """
+    Sequence-numbered log of the mutations of a LibrarySystem (or ShardedLibrary).
+    Appending runs inside the library's listener hook and costs one record
+    encoding; delivery is pull-based through read() or in-process subscriptions.
+    """
+
+    def __init__(self, library, capacity: int = 100_000, clock: Callable[[], datetime] = datetime.now):
+        """
+        Initialize the feed and start recording.
+
+        Args:
+            library: The library to watch.
+            capacity: Changes retained for consumers that are behind.
+            clock: Function returning the current time.
+        """
+        self.library = library
+        self.capacity = capacity
+        self.clock = clock
+        # Identifies this stream; cursors from another stream are rejected
+        self.stream_id = uuid.uuid4().hex[:12]
+        self._log: Deque[Change] = deque(maxlen=capacity)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._subscriptions: List["Subscription"] = []
+        library.add_listener(self._on_event)
+
+    @property
+    def latest_seq(self) -> int:
+        """Sequence number of the newest change (0 before the first)."""
+        return self._seq
+
+    @property
+    def oldest_seq(self) -> int:
+        """Sequence number of the oldest retained change."""
+        with self._cond:
+            return self._log[0].seq if self._log else self._seq + 1
+
+    def _on_event(self, event: str, record: Any):
+        """Listener hook: number and log one mutation (runs under the library lock)."""
+        change = Change(0, event, type(record).__name__.lower(), record.id, to_wire(record), self.clock())
+        with self._cond:
+            self._seq += 1
+            change.seq = self._seq
+            self._log.append(change)
+            self._cond.notify_all()
+
+    def read(self, after: int = 0, limit: int = 1000, timeout: Optional[float] = None,
+             stream_id: Optional[str] = None) -> List[Change]:
+        """
+        Get up to limit changes with a sequence number above after, oldest first.
+
+        Args:
+            after: Cursor: the last sequence number already processed (0 for the start).
+            limit: Maximum number of changes returned.
+            timeout: Seconds to wait for a change when none is available yet;
+                     None or 0 returns immediately.
+            stream_id: Stream the cursor belongs to; checked when given.
+
+        Raises:
+            CursorExpired: The cursor cannot be resumed from this log.
+        """
+        with self._cond:
+            if stream_id is not None and stream_id != self.stream_id:
+                raise CursorExpired(after, self.oldest_seq, f"Cursor belongs to stream {stream_id}, not {self.stream_id}")
+            if after > self._seq:
+                raise CursorExpired(after, self.oldest_seq, f"Cursor {after} is ahead of the stream ({self._seq})")
+            if timeout and after == self._seq:
+                self._cond.wait_for(lambda: self._seq > after or self._closed, timeout)
+            oldest = self._log[0].seq if self._log else self._seq + 1
+            if after < oldest - 1:
+                raise CursorExpired(after, oldest, f"Cursor {after} is older than the retained changes (from {oldest})")
+            # Deques index in linear time: walk from whichever end is nearer
+            start = after - oldest + 1
+            count = min(limit, self._seq - after)
+            if start <= len(self._log) // 2:
+                return list(islice(self._log, start, start + count))
+            newer = list(islice(reversed(self._log), len(self._log) - start))
+            newer.reverse()
+            return newer[:count]
+
+    def resync(self):
+        """
+        Take a library snapshot together with the sequence number it reflects.
+        A consumer rebuilds its state from the snapshot, then reads changes after
+        the returned sequence number.
+        Returns (snapshot, seq).
+        """
+        with locked(self.library):
+            return self.library.snapshot(), self._seq
+
+    def subscribe(self, callback: Callable[[List[Change]], Any], after: Optional[int] = None,
+                  batch_size: int = 500, on_expired: Optional[Callable[["ChangeFeed", CursorExpired], int]] = None,
+                  name: str = "") -> "Subscription":
+        """
+        Deliver changes to callback in batches on a dedicated thread.
+        See Subscription for the delivery guarantees.
+
+        Args:
+            callback: Called with each batch of changes, in order.
+            after: Cursor to start from; the current end of the stream by default.
+            batch_size: Largest batch delivered at once.
+            on_expired: Called when the subscription fell too far behind; returns
+                        the cursor to continue from (e.g. after a resync). By
+                        default the subscription logs a warning and skips ahead.
+            name: Name used in logs and metrics.
+        """
+        subscription = Subscription(
+            self, callback, self._seq if after is None else after, batch_size, on_expired,
+            name or f"subscriber-{len(self._subscriptions) + 1}"
+        )
+        self._subscriptions.append(subscription)
+        subscription.start()
+        return subscription
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get the stream position, the retained range and each subscription's lag."""
+        return {
+            "stream_id": self.stream_id,
+            "latest_seq": self._seq,
+            "oldest_seq": self.oldest_seq,
+            "subscriptions": {s.name: s.lag for s in self._subscriptions if not s.closed},
+        }
+
+    def close(self):
+        """Stop recording and stop every subscription."""
+        self.library.remove_listener(self._on_event)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for subscription in self._subscriptions:
+            subscription.close()
+
+
+class Subscription:
+    """
+    In-process consumer of a ChangeFeed.
+    Changes are delivered at least once and in order: the cursor only advances
+    after the callback returned, and a failing batch is retried with backoff.
+    A slow callback simply receives larger batches (up to batch_size) as it
+    falls behind; it never blocks writers or other subscriptions.
+    """
+
+    # Retry delays in seconds after a failing callback: doubles up to the maximum
+    RETRY_DELAY = 0.1
+    MAX_RETRY_DELAY = 5.0
+
+    def __init__(self, feed: ChangeFeed, callback: Callable[[List[Change]], Any], after: int,
+                 batch_size: int, on_expired: Optional[Callable[[ChangeFeed, CursorExpired], int]], name: str):
+        self.feed = feed
+        self.callback = callback
+        self.cursor = after
+        self.batch_size = batch_size
+        self.on_expired = on_expired
+        self.name = name
+        self.closed = False
+        self.delivered = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"changefeed-{name}", daemon=True)
+
+    @property
+    def lag(self) -> int:
+        """Changes recorded but not yet delivered."""
+        return self.feed.latest_seq - self.cursor
+
+    def start(self):
+        """Start the delivery thread."""
+        self._thread.start()
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop delivering; a batch being delivered is finished first."""
+        self.closed = True
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self):
+        """Delivery loop."""
+        delay = self.RETRY_DELAY
+        while not self._stop.is_set():
+            try:
+                batch = self.feed.read(self.cursor, self.batch_size, timeout=0.5)
+            except CursorExpired as e:
+                self.cursor = self._expired(e)
+                continue
+            if not batch:
+                continue
+            try:
+                self.callback(batch)
+            except Exception:
+                logger.exception("Change subscriber %s failed; retrying from %s", self.name, self.cursor)
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY)
+                continue
+            delay = self.RETRY_DELAY
+            self.cursor = batch[-1].seq
+            self.delivered += len(batch)
+
+    def _expired(self, error: CursorExpired) -> int:
+        """Get the cursor to continue from after falling out of the retained log."""
+        if self.on_expired is not None:
+            return self.on_expired(self.feed, error)
+        logger.warning("Change subscriber %s fell behind (%s); skipping to %s",
+                       self.name, error, error.oldest - 1)
+        return error.oldest - 1
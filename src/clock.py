@@ -0,0 +1,61 @@
+"""
+clock.py
+--------
+Time sources and epoch-integer time for the Library Management System.
+Components that need the current time take a clock: any callable returning a
+naive datetime (datetime.now by default). ManualClock lets tests and benchmarks
+run against a fixed, steppable time, so batch runs are reproducible.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+# Epoch for integer timestamps; naive, wall-clock time like the rest of the models
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+_ONE_SECOND = timedelta(seconds=1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_seconds(moment: datetime) -> int:
+    """Convert a naive datetime to whole seconds since 1970-01-01 (wall-clock time)."""
+    return (moment - EPOCH) // _ONE_SECOND
+
+
+def to_epoch_micros(moment: datetime) -> int:
+    """Convert a naive datetime to microseconds since 1970-01-01 (wall-clock time)."""
+    return (moment - EPOCH) // _ONE_MICROSECOND
+
+
+def from_epoch_micros(value: int) -> datetime:
+    """Convert microseconds since 1970-01-01 back to a naive datetime."""
+    return EPOCH + timedelta(microseconds=value)
+
+
+class ManualClock:
+    """
+    Clock that only moves when told to, for time-travel tests and benchmarks.
+    Call it like datetime.now.
+    """
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.now = start or datetime(2026, 1, 1, 9, 0)
+        self._lock = threading.Lock()
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, delta: Optional[timedelta] = None, **kwargs) -> datetime:
+        """
+        Move the clock forward by a timedelta or timedelta keyword arguments,
+        e.g. advance(days=15). Returns the new time.
+        """
+        with self._lock:
+            self.now += delta if delta is not None else timedelta(**kwargs)
+            return self.now
+
+    def set(self, moment: datetime):
+        """Jump to a given time."""
+        with self._lock:
+            self.now = moment
@@ -0,0 +1,308 @@
+"""
+fines.py
+--------
+Overdue fines for the Library Management System.
+A FinePolicy sets the daily rate, the grace days and the caps per item type.
+FineEngine keeps a columnar copy of the loan history (due date, return date,
+patron and item type per loan, as epoch integers) fed by the library's
+listener hook, so fines for every loan are computed in one bulk pass:
+vectorized with NumPy when it is installed, and plain loops over the compact
+arrays otherwise. Per-patron balances of returned loans are cached and updated
+incrementally when a book is returned; only a patron's open loans are
+re-evaluated when their balance is read.
+
+Amounts are integers in cents.
+"""
+
+import os
+import threading
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+np: Optional[ModuleType]
+try:
+    import numpy
+    np = numpy
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+from .clock import SECONDS_PER_DAY, to_epoch_micros
+from .locking import locked
+from .models import Book, Loan
+
+DAY_MICROS = SECONDS_PER_DAY * 1_000_000
+# Stored in the return column for loans that are still open
+NOT_RETURNED = -2 ** 63
+# Cap used for item types without one
+NO_CAP = 2 ** 63 - 1
+DEFAULT_ITEM_TYPE = "book"
+
+
+def format_amount(cents: int) -> str:
+    """Format an amount in cents, e.g. 1250 -> "$12.50"."""
+    return f"${cents // 100}.{cents % 100:02d}"
+
+
+def _parse_caps(text: str) -> Dict[str, int]:
+    """Parse "book=1000,dvd=500" into {"book": 1000, "dvd": 500}."""
+    caps = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        item_type, _, cap = item.partition("=")
+        caps[item_type.strip()] = int(cap)
+    return caps
+
+
+@dataclass
+class FinePolicy:
+    """
+    How overdue loans are fined.
+    Attributes:
+        daily_rate: Fine per started day past the due date, in cents.
+        grace_days: Days late that are not charged; a loan returned within the
+                    grace period has no fine.
+        max_fine: Cap per loan, in cents, for item types without their own cap
+                  (None for no cap).
+        caps: Cap per loan for each item type, in cents.
+    """
+    daily_rate: int = 25
+    grace_days: int = 0
+    max_fine: Optional[int] = None
+    caps: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls, prefix: str = "FINE") -> "FinePolicy":
+        """
+        Build a policy from <prefix>_DAILY_RATE, <prefix>_GRACE_DAYS, <prefix>_MAX
+        and <prefix>_CAPS (e.g. "book=1000,dvd=500"), falling back to the defaults.
+        """
+        max_fine = os.getenv(f"{prefix}_MAX")
+        return cls(
+            daily_rate=int(os.getenv(f"{prefix}_DAILY_RATE", "25")),
+            grace_days=int(os.getenv(f"{prefix}_GRACE_DAYS", "0")),
+            max_fine=int(max_fine) if max_fine else None,
+            caps=_parse_caps(os.getenv(f"{prefix}_CAPS", "")),
+        )
+
+    def cap_for(self, item_type: str) -> int:
+        """Get the cap per loan for an item type (NO_CAP when uncapped)."""
+        cap = self.caps.get(item_type, self.max_fine)
+        return NO_CAP if cap is None else cap
+
+    def fine(self, due: int, end: int, cap: int) -> int:
+        """Fine of one loan due at due and returned (or assessed) at end, in epoch microseconds."""
+        days_late = -(-(end - due) // DAY_MICROS)
+        if days_late <= self.grace_days:
+            return 0
+        return min((days_late - self.grace_days) * self.daily_rate, cap)
+
+
+class FineEngine:
+    """
+    Computes overdue fines for a LibrarySystem (or ShardedLibrary).
+    Loans are picked up through the library's listener hook, so the loan list
+    is only scanned once, when the engine is created.
+    """
+
+    def __init__(self, library, policy: Optional[FinePolicy] = None,
+                 item_type: Optional[Callable[[Book], str]] = None,
+                 clock: Optional[Callable[[], datetime]] = None):
+        """
+        Initialize the engine and start tracking loans.
+
+        Args:
+            library: The library to watch.
+            policy: Fine policy; FinePolicy() by default.
+            item_type: Function returning a book's item type, used to pick its
+                       cap; every book is DEFAULT_ITEM_TYPE by default.
+            clock: Function returning the current time; the library's clock by default.
+        """
+        self.library = library
+        self.policy = policy or FinePolicy()
+        self.item_type = item_type or (lambda book: DEFAULT_ITEM_TYPE)
+        self.clock: Callable[[], datetime] = clock if clock is not None else getattr(library, "clock", datetime.now)
+        # Reentrant: set_policy holds it across _settle_all
+        self._lock = threading.RLock()
+        # One entry per loan, in the order the engine saw them
+        self._loan_id = array("q")
+        self._patron = array("q")
+        self._due = array("q")
+        self._returned = array("q")
+        self._type = array("q")
+        self._types: List[str] = []
+        self._type_codes: Dict[str, int] = {}
+        self._positions: Dict[int, int] = {}
+        self._by_patron: Dict[int, List[int]] = {}
+        # Cached balances: fines of returned loans per patron, and each patron's open loans
+        self._settled: Dict[int, int] = {}
+        self._open: Dict[int, Dict[int, None]] = {}
+        with locked(library):
+            for loan in library.loans:
+                self._track(loan)
+            library.add_listener(self._on_event)
+        self._settle_all()
+
+    def close(self):
+        """Stop tracking loans."""
+        self.library.remove_listener(self._on_event)
+
+    def _type_code(self, loan: Loan) -> int:
+        """Get the code of the item type of a loan's book."""
+        book = self.library.get_book(loan.book_id)
+        item_type = self.item_type(book) if book is not None else DEFAULT_ITEM_TYPE
+        code = self._type_codes.get(item_type)
+        if code is None:
+            code = self._type_codes[item_type] = len(self._types)
+            self._types.append(item_type)
+        return code
+
+    def _track(self, loan: Loan):
+        """Append a loan to the columns."""
+        position = len(self._loan_id)
+        self._positions[loan.id] = position
+        self._by_patron.setdefault(loan.patron_id, []).append(position)
+        self._loan_id.append(loan.id)
+        self._patron.append(loan.patron_id)
+        self._due.append(to_epoch_micros(loan.due_date))
+        self._type.append(self._type_code(loan))
+        if loan.return_date is None:
+            self._returned.append(NOT_RETURNED)
+            self._open.setdefault(loan.patron_id, {})[position] = None
+        else:
+            self._returned.append(to_epoch_micros(loan.return_date))
+
+    def _on_event(self, event: str, record: Any):
+        """Listener hook: track new loans and settle the fine of returned ones."""
+        if event == "book_borrowed":
+            with self._lock:
+                self._track(record)
+        elif event == "book_returned":
+            with self._lock:
+                position = self._positions.get(record.id)
+                if position is None:
+                    return
+                returned = to_epoch_micros(record.return_date)
+                self._returned[position] = returned
+                self._open.get(record.patron_id, {}).pop(position, None)
+                fine = self._fine_at(position, returned)
+                if fine:
+                    self._settled[record.patron_id] = self._settled.get(record.patron_id, 0) + fine
+
+    def _fine_at(self, position: int, end: int) -> int:
+        """Fine of the loan at a position, assessed at end (epoch microseconds)."""
+        cap = self.policy.cap_for(self._types[self._type[position]])
+        return self.policy.fine(self._due[position], end, cap)
+
+    def _fines(self, now: int):
+        """
+        Compute the fine of every loan in one pass (called with the engine lock held).
+        Open loans are assessed at now; returned loans at their return date.
+        Returns a NumPy array, or a list without NumPy.
+        """
+        policy = self.policy
+        caps = [policy.cap_for(item_type) for item_type in self._types]
+        if np is not None:
+            count = len(self._loan_id)
+            if not count:
+                return np.zeros(0, dtype=np.int64)
+            due = np.frombuffer(self._due, dtype=np.int64)
+            returned = np.frombuffer(self._returned, dtype=np.int64)
+            end = np.where(returned == NOT_RETURNED, now, returned)
+            days_late = -((due - end) // DAY_MICROS)
+            charged = np.maximum(days_late - policy.grace_days, 0) * policy.daily_rate
+            cap = np.array(caps, dtype=np.int64)[np.frombuffer(self._type, dtype=np.int64)]
+            return np.minimum(charged, cap)
+        fine = policy.fine
+        return [
+            fine(due, now if returned == NOT_RETURNED else returned, caps[code])
+            for due, returned, code in zip(self._due, self._returned, self._type)
+        ]
+
+    def _settle_all(self):
+        """Rebuild the cached balances of returned loans with one bulk pass."""
+        with self._lock:
+            fines = self._fines(0)
+            settled: Dict[int, int] = {}
+            patron = self._patron
+            for position, (fine, returned) in enumerate(zip(_as_list(fines), self._returned)):
+                if fine and returned != NOT_RETURNED:
+                    settled[patron[position]] = settled.get(patron[position], 0) + fine
+            self._settled = settled
+
+    def set_policy(self, policy: FinePolicy):
+        """Switch to another policy and recompute every cached balance."""
+        with self._lock:
+            self.policy = policy
+            self._settle_all()
+
+    def loan_fines(self, now: Optional[datetime] = None) -> Dict[int, int]:
+        """
+        Compute the fines of all open and returned-late loans in one pass.
+        Returns a dict mapping loan ID to its fine, for loans with a fine.
+        """
+        with self._lock:
+            fines = self._fines(to_epoch_micros(now or self.clock()))
+            if np is not None:
+                positions = np.flatnonzero(fines).tolist()
+                amounts = fines[positions].tolist()
+            else:
+                positions = [i for i, fine in enumerate(fines) if fine]
+                amounts = [fines[i] for i in positions]
+            loan_id = self._loan_id
+            return {loan_id[i]: amount for i, amount in zip(positions, amounts)}
+
+    def balances(self, now: Optional[datetime] = None) -> Dict[int, int]:
+        """
+        Compute every patron's outstanding fines in one pass over all loans.
+        Returns a dict mapping patron ID to their total fines, for patrons who owe any.
+        """
+        with self._lock:
+            fines = self._fines(to_epoch_micros(now or self.clock()))
+            if np is not None:
+                if not len(fines):
+                    return {}
+                patrons = np.frombuffer(self._patron, dtype=np.int64)
+                owing = fines > 0
+                ids, inverse = np.unique(patrons[owing], return_inverse=True)
+                sums = np.bincount(inverse, weights=fines[owing], minlength=len(ids))
+                return dict(zip(ids.tolist(), sums.astype(np.int64).tolist()))
+            totals: Dict[int, int] = {}
+            for patron, fine in zip(self._patron, fines):
+                if fine:
+                    totals[patron] = totals.get(patron, 0) + fine
+            return totals
+
+    def patron_balance(self, patron_id: int, now: Optional[datetime] = None) -> int:
+        """
+        Get a patron's outstanding fines: the cached total of their returned
+        loans plus the fines accrued so far by their open loans.
+        """
+        end = to_epoch_micros(now or self.clock())
+        with self._lock:
+            accrued = sum(self._fine_at(position, end) for position in self._open.get(patron_id, ()))
+            return self._settled.get(patron_id, 0) + accrued
+
+    def patron_fines(self, patron_id: int, now: Optional[datetime] = None) -> List[Tuple[int, int]]:
+        """
+        Get the fined loans of a patron.
+        Returns (loan_id, fine) pairs in loan order.
+        """
+        end = to_epoch_micros(now or self.clock())
+        with self._lock:
+            pairs = []
+            for position in self._by_patron.get(patron_id, ()):
+                returned = self._returned[position]
+                fine = self._fine_at(position, end if returned == NOT_RETURNED else returned)
+                if fine:
+                    pairs.append((self._loan_id[position], fine))
+            return pairs
+
+
+def _as_list(fines: Any) -> List[int]:
+    """Get the result of FineEngine._fines as a list of ints."""
+    values: List[int] = fines.tolist() if np is not None else fines
+    return values
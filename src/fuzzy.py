@@ -0,0 +1,155 @@
+"""
+fuzzy.py
+--------
+Typo-tolerant text matching for the Library Management System.
+TrigramIndex maps the character trigrams of each entry's words to the
+entries containing them. A query collects candidates from its rarest trigrams
+and ranks them by the share of trigrams they have in common, and the best
+candidates are reranked by edit distance between words. Word order does not
+matter, so "Orwell 1984" finds "1984" by George Orwell.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+# Candidates reranked by edit distance per result requested
+RERANK_FACTOR = 4
+# Entries counted per query: posting lists are visited rarest first until this
+# many entries were counted, so common trigrams like " th" cost nothing
+POSTINGS_BUDGET = 4000
+# Shortlisted entries are reranked when their trigram overlap is at least this
+# share of the best one's
+RERANK_CUTOFF = 0.5
+
+
+def normalize_words(text: str) -> List[str]:
+    """Split text into lowercased alphanumeric words."""
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+def trigrams(words: List[str]) -> Set[str]:
+    """Get the trigrams of some words, each padded so short words have trigrams too."""
+    grams: Set[str] = set()
+    for word in words:
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Levenshtein distance: insertions, deletions and substitutions turning a into b.
+    Bit-parallel (Myers/Hyyro): one pass over b with a few integer operations
+    per character, whatever the length of a.
+    """
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a) or len(b)
+    peq: Dict[str, int] = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    for c in b:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score
+
+
+def word_similarity(query: List[str], words: List[str]) -> float:
+    """
+    Average, over the query words, of the similarity (1 - edit distance / length)
+    to the closest word of the entry; 1.0 when every query word appears.
+    """
+    if not query or not words:
+        return 0.0
+    total = 0.0
+    for q in query:
+        best = 0.0
+        for w in words:
+            if q == w:
+                best = 1.0
+                break
+            # Edit distance is at least the length difference: skip hopeless pairs
+            longest = max(len(q), len(w))
+            if 1 - abs(len(q) - len(w)) / longest <= best:
+                continue
+            best = max(best, 1 - edit_distance(q, w) / longest)
+        total += best
+    return total / len(query)
+
+
+class TrigramIndex:
+    """
+    Trigram index over short texts (e.g. "title author"), keyed by an integer ID.
+    Entries are only added, never changed.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, List[int]] = {}
+        self._words: Dict[int, List[str]] = {}
+        self._gram_counts: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def add(self, key: int, text: str) -> None:
+        """Index text under key."""
+        words = normalize_words(text)
+        grams = trigrams(words)
+        self._words[key] = words
+        self._gram_counts[key] = len(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(key)
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.3) -> List[Tuple[int, float]]:
+        """
+        Find the entries closest to a query.
+        Returns up to limit (key, score) pairs, best first; scores run from 0 to 1.
+        """
+        words = normalize_words(query)
+        grams = trigrams(words)
+        if not grams or limit <= 0:
+            return []
+        postings = sorted((self._postings[g] for g in grams if g in self._postings), key=len)
+        shared: Counter[int] = Counter()
+        visited = counted = 0
+        for keys in postings:
+            if counted and counted + len(keys) > POSTINGS_BUDGET:
+                break
+            shared.update(keys)
+            visited += 1
+            counted += len(keys)
+        if not shared:
+            return []
+        gram_counts = self._gram_counts
+        # Shortlist by shared trigrams, then by the Dice coefficient of the trigram
+        # sets (against the trigrams actually visited); only close contenders are reranked
+        shortlist = [
+            (2 * count / (visited + gram_counts[key]), key)
+            for key, count in shared.most_common(limit * RERANK_FACTOR * 2)
+        ]
+        shortlist.sort(reverse=True)
+        cutoff = shortlist[0][0] * RERANK_CUTOFF
+        candidates = [(key, dice) for dice, key in shortlist[:limit * RERANK_FACTOR] if dice >= cutoff]
+        scored = []
+        for key, dice in candidates:
+            score = 0.8 * word_similarity(words, self._words[key]) + 0.2 * min(dice, 1.0)
+            if score >= min_score:
+                scored.append((key, round(score, 3)))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
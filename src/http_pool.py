@@ -0,0 +1,95 @@
+"""
+http_pool.py
+------------
+Small HTTP server helpers shared by the MCP and API services.
+Requests are handled by a bounded worker pool instead of one thread per
+connection, so a burst of clients cannot spawn unbounded threads.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer that dispatches each accepted connection to a ThreadPoolExecutor.
+    Connections beyond the pool size wait in the executor queue.
+    """
+    daemon_threads = True
+
+    def __init__(self, server_address: Tuple[str, int], handler_class, max_workers: int = 8):
+        """
+        Initialize the server and its worker pool.
+
+        Args:
+            server_address: (host, port) to bind; port 0 picks a free port.
+            handler_class: BaseHTTPRequestHandler subclass handling requests.
+            max_workers: Number of worker threads handling requests.
+        """
+        super().__init__(server_address, handler_class)
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-worker")
+
+    def process_request(self, request, client_address):
+        """Hand the connection to the worker pool."""
+        self._pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        """Handle one connection inside a worker thread."""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        """Close the listening socket and stop the worker pool."""
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+class JSONRequestHandler(BaseHTTPRequestHandler):
+    """
+    Base request handler with helpers for reading and writing JSON bodies.
+    Uses HTTP/1.1 keep-alive so clients can reuse connections.
+    """
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+    # Seconds a kept-alive connection may sit idle (or a request may stall) before
+    # it is closed: each connection holds a pool worker until then
+    timeout = 10
+
+    def read_json(self) -> Any:
+        """
+        Read and decode the JSON request body.
+        Returns None for an empty body; raises ValueError for invalid JSON.
+        """
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def send_json(self, status: int, data: Any, headers: Optional[Dict[str, str]] = None):
+        """Encode data as compact JSON and send it with the given status."""
+        body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_empty(self, status: int):
+        """Send a response without a body."""
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        """Silence per-request logging; the services log at a higher level."""
+        pass
@@ -3,14 +3,39 @@ interface.py
 -------------
 This module defines the Gradio-based user interface for the Library Management System.
 It provides interactive tabs for adding books and patrons, borrowing and returning books,
-and viewing the library status, all backed by the LibrarySystem class.
+viewing the library status and overdue fines, all backed by the LibrarySystem class.
+
+Heavy dependencies (gradio, langsmith) are imported lazily, so this
+module and the library core can be imported without them.
 """
 
-import gradio as gr
 import os
 from datetime import datetime
-from typing import Tuple
+from typing import Any, Dict, List, Tuple, Union
+from .admission import AdmissionController, AdmissionRejected
+from .api_client import LibraryAPIClient, LibraryAPIError
 from .library import LibrarySystem
+from .llm_pool import LLMEndpointPool, LLMHTTPError
+from .profiling import configure_from_env, traced
+from .rendering import RowRenderer
+from .sample_data import add_sample_data
+from .snapshot import read_view
+from .status_views import STATUS_COLUMNS, status_page
+from .tool_calls import as_openai_tool_calls, parse_tool_calls
+
+
+PAGE_SIZES = (25, 50, 100)
+# Chat workers beyond the admission controller's capacity: overflow chats run on
+# them only to be rejected by the controller right away
+CHAT_REJECT_WORKERS = 4
+
+
+def markdown_table(values: Dict[str, Any]) -> str:
+    """Format a flat dict of counters as a one-row Markdown table."""
+    header = " | ".join(name.replace("_", " ").title() for name in values)
+    row = " | ".join(str(value) for value in values.values())
+    separator = " | ".join("---" for _ in values)
+    return f"| {header} |\n| {separator} |\n| {row} |"
 
 
 class LibraryInterface:
@@ -18,23 +43,25 @@ class LibraryInterface:
     Provides high-level methods for interacting with the LibrarySystem.
     Used by the Gradio interface to manage books, patrons, loans, and status queries.
     """
-    def __init__(self):
+    def __init__(self, library=None):
         """
-        Initialize the LibraryInterface and add sample data for demonstration.
+        Initialize the LibraryInterface.
+        
+        Args:
+            library: LibrarySystem or LibraryAPIClient to use. When omitted, a local
+                     LibrarySystem is created and seeded with sample data.
         """
-        self.library = LibrarySystem()
-        self._add_sample_data()
+        self.library = library if library is not None else LibrarySystem()
+        self.rows = RowRenderer(self.library)
+        if library is None:
+            self._add_sample_data()
 
 
     def _add_sample_data(self):
         """
         Add sample books and patrons to the library for demonstration purposes.
         """
-        self.library.add_book("The Great Gatsby", "F. Scott Fitzgerald", "978-0743273565")
-        self.library.add_book("To Kill a Mockingbird", "Harper Lee", "978-0446310789")
-        self.library.add_book("1984", "George Orwell", "978-0451524935")
-        self.library.add_patron("John Doe", "john@example.com", "123-456-7890")
-        self.library.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
+        add_sample_data(self.library)
 
 
     def add_book(self, title: str, author: str, isbn: str) -> str:
@@ -51,11 +78,15 @@ class LibraryInterface:
     def add_patron(self, name: str, email: str, phone: str) -> str:
         """
         Add a new patron to the library.
-        Returns a success message or prompts for missing fields.
+        Returns a success message, prompts for missing fields, or reports a
+        duplicate email or phone.
         """
         if not all([name, email, phone]):
             return "Please fill in all fields"
-        patron = self.library.add_patron(name, email, phone)
+        try:
+            patron = self.library.add_patron(name, email, phone)
+        except (ValueError, LibraryAPIError) as e:
+            return f"Failed to add patron: {e}"
         return f"Patron added successfully! Patron ID: {patron.id}"
 
 
@@ -95,15 +126,11 @@ class LibraryInterface:
         List all books in the library with their status.
         Returns a formatted string of book details.
         """
-        if not self.library.books:
-            return "No books in the library"
-        book_list = []
-        for book in self.library.books:
-            status = "Available" if book.available else f"Borrowed by Patron #{book.borrowed_by}"
-            book_list.append(
-                f"ID: {book.id} | {book.title} by {book.author} | ISBN: {book.isbn} | {status}"
-            )
-        return "\n".join(book_list)
+        with read_view(self.library) as view:
+            books = view.books
+            if not books:
+                return "No books in the library"
+            return "\n".join(map(self.rows.book_row, books))
 
 
     def list_patrons(self) -> str:
@@ -111,14 +138,11 @@ class LibraryInterface:
         List all registered patrons in the library.
         Returns a formatted string of patron details.
         """
-        if not self.library.patrons:
-            return "No patrons registered"
-        patron_list = []
-        for patron in self.library.patrons:
-            patron_list.append(
-                f"ID: {patron.id} | {patron.name} | Email: {patron.email} | Phone: {patron.phone}"
-            )
-        return "\n".join(patron_list)
+        with read_view(self.library) as view:
+            patrons = view.patrons
+            if not patrons:
+                return "No patrons registered"
+            return "\n".join(map(self.rows.patron_row, patrons))
 
 
     def list_overdue(self) -> str:
@@ -126,50 +150,102 @@ class LibraryInterface:
         List all overdue loans in the library.
         Returns a formatted string of overdue book and patron details.
         """
-        overdue = self.library.get_overdue_loans()
-        if not overdue:
+        if hasattr(self.library, "get_overdue_details"):
+            # Client mode: loans come joined to their book and patron in one request
+            rows = self.rows.overdue_detail_rows(self.library.get_overdue_details())
+        else:
+            rows = self.rows.overdue_rows(self.library.get_overdue_loans())
+        if not rows:
             return "No overdue books"
-        overdue_list = []
-        for loan in overdue:
-            book = next(b for b in self.library.books if b.id == loan.book_id)
-            patron = next(p for p in self.library.patrons if p.id == loan.patron_id)
-            overdue_list.append(
-                f"Book: {book.title} (ID: {book.id}) | "
-                f"Patron: {patron.name} (ID: {patron.id}) | "
-                f"Due date: {loan.due_date.strftime('%Y-%m-%d')}"
-            )
-        return "\n".join(overdue_list)
+        return "\n".join(rows)
 
 
-def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
+    def status_page(self, view: str, query: str = "", sort_by: str = "", descending: bool = False,
+                    page: int = 1, page_size: int = 25) -> Tuple[Dict[str, Any], str, int]:
+        """
+        Compute one page of a status view, filtering and sorting in the backend.
+        Only the rows of the requested page are formatted and sent to the browser;
+        in client mode the API service computes the page.
+
+        Args:
+            view: One of the STATUS_COLUMNS views.
+            query: Case-insensitive text matched against the view's text columns.
+            sort_by: Column to sort on; the view's natural order when empty or unknown.
+            descending: Sort in descending order.
+            page: 1-based page number, clamped to the available pages.
+            page_size: Rows per page.
+
+        Returns:
+            A (table, summary, page) tuple: the table as {"headers", "data"}, a
+            "Page x of y" summary and the page actually shown.
+        """
+        remote = getattr(self.library, "status_page", None)
+        if remote is not None:
+            result = remote(view, query, sort_by, descending, page, page_size)
+        else:
+            with read_view(self.library) as source:
+                result = status_page(source, view, query, sort_by, descending, page, page_size)
+        summary = f"Page {result['page']} of {result['pages']} ({result['total']} rows)"
+        return {"headers": result["headers"], "data": result["data"]}, summary, result["page"]
+
+
+    def stats_summary(self) -> str:
+        """
+        Summarize the library totals for the dashboard panel.
+        Returns a Markdown table built from the O(1) counters of get_stats.
+        """
+        return markdown_table(self.library.get_stats())
+
+
+def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None, library_api_url=None):
     """
     Build and return the Gradio Blocks interface for the Library Management System.
     Provides tabs for all major library operations.
     
     Args:
-        llm_api_url: URL endpoint for the LLM API (required).
+        llm_api_url: URL endpoint for the LLM API (required), or a comma-separated
+                     list of OpenAI-compatible endpoints to fail over between.
                      Set via LLM_API_URL environment variable.
         llm_api_key: API key for authentication with the LLM service (optional).
                      Used for services like OpenAI, Anthropic, or other hosted LLM providers.
         llm_model_name: Model name to use with the LLM service (optional).
                         If not provided, auto-detects based on API URL.
+        library_api_url: URL of a headless library API service (optional).
+                         When set, the interface is a client of that service instead of
+                         owning a LibrarySystem, so several UI replicas can share it.
     """
-    interface = LibraryInterface()
-    import requests
+    import gradio as gr
     from .mcp_server import LibraryMCPServer
-    try:
-        from langsmith import Client as LangSmithClient
-    except ImportError:
-        LangSmithClient = None
     
-    # Initialize MCP server for library tools
-    mcp_server = LibraryMCPServer(interface.library)
+    configure_from_env()
+    mcp_server: Union[LibraryAPIClient, LibraryMCPServer]
+    if library_api_url:
+        # Tools run inside the API service, next to the shared library
+        client = LibraryAPIClient(library_api_url)
+        interface = LibraryInterface(client)
+        mcp_server = client
+    else:
+        from .fines import FineEngine, FinePolicy
+        interface = LibraryInterface()
+        # Initialize MCP server for library tools
+        mcp_server = LibraryMCPServer(
+            interface.library, fines=FineEngine(interface.library, FinePolicy.from_env())
+        )
+        if os.getenv("ENABLE_OVERDUE_NOTIFICATIONS", "false").lower() in ("1", "true", "yes", "on"):
+            from .overdue import LogSink, OverdueScanner
+            OverdueScanner(interface.library, LogSink()).start()
+    llm_pool = LLMEndpointPool.from_config(llm_api_url, llm_api_key) if llm_api_url else None
+    # Chat runs behind its own admission control so a burst of chats cannot starve the other tabs
+    chat_admission = AdmissionController.from_env("CHAT")
     langsmith_enabled = os.getenv("LANGSMITH_TRACING", "false").lower() in ("1", "true", "yes", "on")
     langsmith_project = os.getenv("LANGSMITH_PROJECT", "librarian")
     langsmith_client = None
 
     if langsmith_enabled:
-        if LangSmithClient is None:
+        # Only pay for the langsmith import when tracing is turned on
+        try:
+            from langsmith import Client as LangSmithClient
+        except ImportError:
             print("Warning: LANGSMITH_TRACING is enabled but langsmith package is not installed.")
         else:
             try:
@@ -244,16 +320,19 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
         
         Args:
             messages: List of dicts with 'role' and 'content'.
-            api_url: Endpoint for the LLM API (must be OpenAI-compatible format).
+            api_url: Endpoint for the LLM API (must be OpenAI-compatible format), or a
+                     comma-separated list of endpoints.
             api_key: Optional API key for authentication.
         
         Returns:
             The assistant's reply as a string.
         """
         import json
-        headers = {"Content-Type": "application/json"}
-        if api_key:
-            headers["Authorization"] = f"Bearer {api_key}"
+        # Failover, retries, circuit breaking and hedging happen in the endpoint pool
+        if llm_pool is not None and (api_url, api_key) == (llm_api_url, llm_api_key):
+            pool = llm_pool
+        else:
+            pool = LLMEndpointPool.from_config(api_url, api_key)
         token_usage_total = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
         per_call_usage = []
         
@@ -266,7 +345,7 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
             model_name = "local-model"
         
         # Define available tools for the LLM
-        tools = [
+        tools: List[Dict[str, Any]] = [
             {
                 "type": "function",
                 "function": {
@@ -345,6 +424,102 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
                     }
                 }
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "place_hold",
+                    "description": "Join the waiting list for a borrowed book; it is lent automatically when returned",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "book_id": {"type": "integer"},
+                            "patron_id": {"type": "integer"}
+                        },
+                        "required": ["book_id", "patron_id"]
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "cancel_hold",
+                    "description": "Cancel a hold on a book",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "hold_id": {"type": "integer"}
+                        },
+                        "required": ["hold_id"]
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "find_patron",
+                    "description": "Find a patron by email address or phone number",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "email": {"type": "string"},
+                            "phone": {"type": "string"}
+                        },
+                        "required": []
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "find_book",
+                    "description": "Find books by approximate title and/or author; tolerates typos and word order",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "query": {"type": "string"},
+                            "limit": {"type": "integer"}
+                        },
+                        "required": ["query"]
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "recommend_books",
+                    "description": "Recommend books that patrons who borrowed the given book also borrowed",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "book_id": {"type": "integer"},
+                            "limit": {"type": "integer"}
+                        },
+                        "required": ["book_id"]
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "search_patrons",
+                    "description": "Search patrons by the start of their first or last name",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"}
+                        },
+                        "required": ["name"]
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "get_stats",
+                    "description": "Get library totals: books, available, on loan, overdue and active patrons",
+                    "parameters": {"type": "object", "properties": {}, "required": []}
+                }
+            },
             {
                 "type": "function",
                 "function": {
@@ -352,9 +527,39 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
                     "description": "Get all overdue loans",
                     "parameters": {"type": "object", "properties": {}, "required": []}
                 }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "get_fines",
+                    "description": "List the patrons with outstanding overdue fines, largest first",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "limit": {"type": "integer"}
+                        },
+                        "required": []
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "get_patron_fines",
+                    "description": "Get a patron's outstanding overdue fines by loan",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "patron_id": {"type": "integer"}
+                        },
+                        "required": ["patron_id"]
+                    }
+                }
             }
         ]
         
+        tool_names = {tool["function"]["name"] for tool in tools}
+        
         # Build payload
         payload = {
             "model": model_name,
@@ -389,9 +594,7 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
                 print(f"Warning: Failed to create LangSmith run: {e}")
         
         try:
-            response = requests.post(api_url, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = pool.post(payload)
             usage = extract_token_usage(data)
             per_call_usage.append(usage)
             token_usage_total = merge_usage(token_usage_total, usage)
@@ -400,6 +603,16 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
             if "choices" in data and len(data["choices"]) > 0:
                 message = data["choices"][0]["message"]
                 
+                # Models without native tool calling may write the calls as JSON in the text
+                if not message.get("tool_calls") and message.get("content"):
+                    text_calls = parse_tool_calls(message["content"], tool_names)
+                    if text_calls:
+                        message = {
+                            "role": "assistant",
+                            "content": message["content"],
+                            "tool_calls": as_openai_tool_calls(text_calls),
+                        }
+                
                 # Check if there are tool calls to execute
                 if "tool_calls" in message and message["tool_calls"]:
                     # Add assistant's message to conversation
@@ -431,9 +644,7 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
                         "top_p": 0.9,
                         "max_tokens": 1024
                     }
-                    response = requests.post(api_url, json=payload_with_results, headers=headers, timeout=30)
-                    response.raise_for_status()
-                    data = response.json()
+                    data = pool.post(payload_with_results)
                     usage = extract_token_usage(data)
                     per_call_usage.append(usage)
                     token_usage_total = merge_usage(token_usage_total, usage)
@@ -457,8 +668,8 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
                 )
                 return error_msg
             
-        except requests.exceptions.HTTPError as e:
-            error_msg = f"HTTP Error: {e.response.status_code} - {e.response.text}"
+        except LLMHTTPError as e:
+            error_msg = f"HTTP Error: {e.status} - {e.body}"
             update_langsmith_run(
                 run_id=trace_run_id,
                 error_text=error_msg,
@@ -475,6 +686,8 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
                 per_call=per_call_usage,
             )
             return error_msg
+
+    chat_with_llm = traced("create_interface.chat_with_llm", chat_with_llm)
 
     with gr.Blocks(title="Library Management System") as demo:
         gr.Markdown("# Library Management System")
@@ -529,15 +742,74 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
             )
 
         with gr.Tab("View Library Status"):
+            # Dashboard totals are cheap counters, so refresh them every second
+            stats_panel = gr.Markdown(interface.stats_summary())
+            stats_timer = gr.Timer(1.0)
+            stats_timer.tick(fn=interface.stats_summary, outputs=stats_panel)
+            chat_panel = gr.Markdown(markdown_table(chat_admission.metrics()))
+            stats_timer.tick(fn=lambda: markdown_table(chat_admission.metrics()), outputs=chat_panel)
+            # Tables are paginated, filtered and sorted server-side: only the
+            # visible page is formatted and sent to the browser
             with gr.Row():
-                list_books_btn = gr.Button("List Books")
-                list_patrons_btn = gr.Button("List Patrons")
-                list_overdue_btn = gr.Button("List Overdue")
-            status_output = gr.Textbox(label="Library Status", lines=10)
-
-            list_books_btn.click(fn=interface.list_books, outputs=status_output)
-            list_patrons_btn.click(fn=interface.list_patrons, outputs=status_output)
-            list_overdue_btn.click(fn=interface.list_overdue, outputs=status_output)
+                status_view = gr.Radio(list(STATUS_COLUMNS), value="Books", label="Show")
+                status_query = gr.Textbox(label="Filter")
+                status_sort = gr.Dropdown(list(STATUS_COLUMNS["Books"]), value="ID", label="Sort by")
+                status_desc = gr.Checkbox(label="Descending")
+                status_page_size = gr.Dropdown(list(PAGE_SIZES), value=PAGE_SIZES[0], label="Rows per page")
+            with gr.Row():
+                prev_page_btn = gr.Button("Previous")
+                status_page_number = gr.Number(value=1, precision=0, label="Page")
+                next_page_btn = gr.Button("Next")
+            status_summary = gr.Markdown()
+            status_table = gr.Dataframe(interactive=False, wrap=True)
+
+            def first_page(view, query, sort_by, descending, page, page_size):
+                return interface.status_page(view, query, sort_by, descending, 1, page_size)
+
+            def prev_page(view, query, sort_by, descending, page, page_size):
+                return interface.status_page(view, query, sort_by, descending, (page or 1) - 1, page_size)
+
+            def next_page(view, query, sort_by, descending, page, page_size):
+                return interface.status_page(view, query, sort_by, descending, (page or 1) + 1, page_size)
+
+            def change_view(view, query, sort_by, descending, page, page_size):
+                columns = list(STATUS_COLUMNS[view])
+                table, summary, page = interface.status_page(view, query, columns[0], descending, 1, page_size)
+                return gr.Dropdown(choices=columns, value=columns[0]), table, summary, page
+
+            page_inputs = [status_view, status_query, status_sort, status_desc, status_page_number, status_page_size]
+            page_outputs = [status_table, status_summary, status_page_number]
+            status_view.change(fn=change_view, inputs=page_inputs, outputs=[status_sort] + page_outputs)
+            for control in (status_desc, status_page_size):
+                control.change(fn=first_page, inputs=page_inputs, outputs=page_outputs)
+            status_query.submit(fn=first_page, inputs=page_inputs, outputs=page_outputs)
+            status_sort.input(fn=first_page, inputs=page_inputs, outputs=page_outputs)
+            status_page_number.submit(fn=interface.status_page, inputs=page_inputs, outputs=page_outputs)
+            prev_page_btn.click(fn=prev_page, inputs=page_inputs, outputs=page_outputs)
+            next_page_btn.click(fn=next_page, inputs=page_inputs, outputs=page_outputs)
+            demo.load(fn=interface.status_page, inputs=page_inputs, outputs=page_outputs)
+
+        with gr.Tab("Fines"):
+            # Fines are computed by the MCP tools, so this tab works against a local
+            # library and against the API service alike
+            fines_patron_id = gr.Textbox(label="Patron ID")
+            with gr.Row():
+                patron_fines_btn = gr.Button("Show Patron Fines")
+                all_fines_btn = gr.Button("List Outstanding Fines")
+            fines_output = gr.Textbox(label="Result", lines=10)
+
+            def show_patron_fines(patron_id):
+                try:
+                    patron_id = int(patron_id)
+                except ValueError:
+                    return "Please enter a valid numeric patron ID"
+                return mcp_server.execute_tool("get_patron_fines", {"patron_id": patron_id})
+
+            patron_fines_btn.click(fn=show_patron_fines, inputs=fines_patron_id, outputs=fines_output)
+            all_fines_btn.click(
+                fn=lambda: mcp_server.execute_tool("get_fines", {"limit": 50}),
+                outputs=fines_output
+            )
 
         # New Chat with LLM Tab
         with gr.Tab("Chat with LLM"):
@@ -545,7 +817,7 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
             user_msg = gr.Textbox(label="Your message", lines=2)
             send_btn = gr.Button("Send")
 
-            def gradio_chat(history, user_input):
+            def gradio_chat(history, user_input, request: gr.Request):
                 if not user_input.strip():
                     return history, ""
                 
@@ -563,8 +835,13 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
                 # Add new user message
                 messages.append({"role": "user", "content": user_input})
                 
-                # Get response from LLM
-                reply = chat_with_llm(messages)
+                # Get response from LLM, unless the session or the chat pool is over its budget
+                session_id = getattr(request, "session_hash", None) or "anonymous"
+                try:
+                    with chat_admission.admit(session_id):
+                        reply = chat_with_llm(messages)
+                except AdmissionRejected as e:
+                    reply = str(e)
                 
                 # Add to history in new message format
                 history.append({"role": "user", "content": user_input})
@@ -575,8 +852,17 @@ def create_interface(llm_api_url=None, llm_api_key=None, llm_model_name=None):
             send_btn.click(
                 fn=gradio_chat,
                 inputs=[chatbot, user_msg],
-                outputs=[chatbot, user_msg]
+                outputs=[chatbot, user_msg],
+                # Separate worker budget: the running and queued chats admitted above,
+                # plus headroom so overflow reaches the controller and is rejected at
+                # once instead of waiting, unbounded, in Gradio's own queue
+                concurrency_limit=chat_admission.max_concurrent + chat_admission.max_queue + CHAT_REJECT_WORKERS,
+                concurrency_id="chat",
             )
+
+    # Other events keep their own per-event limits. Chat is capped well below Gradio's
+    # worker thread pool (40 by default), so checkouts always find a free worker
+    demo.queue(default_concurrency_limit=int(os.getenv("UI_CONCURRENCY", "8")))
     return demo
 
 
@@ -0,0 +1,269 @@
+"""
+jobs.py
+-------
+Background job subsystem for heavy bulk operations.
+CPU-bound work (circulation reports, validating large book imports) runs in a
+process pool against a columnar snapshot of the LibrarySystem, so it never
+holds the GIL that interactive checkouts need. Jobs are split into chunks; each
+finished chunk advances the job's progress.
+"""
+
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .reporting import LoanColumns, export_chunks, merge_report, report_partials
+from .snapshot import read_view
+
+JOB_KINDS = ("circulation_report", "import_books")
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+@dataclass
+class Job:
+    """
+    Represents a background job.
+    Attributes:
+        id: Unique identifier for the job.
+        kind: Job kind, one of JOB_KINDS.
+        status: "queued", "running", "done" or "failed".
+        total_steps: Number of chunks the job was split into.
+        completed_steps: Number of chunks finished so far.
+        submitted_at: When the job was submitted.
+        finished_at: When the job finished (None while running).
+        result: Job result once done.
+        error: Error message if the job failed.
+    """
+    id: int
+    kind: str
+    status: str = "queued"
+    total_steps: int = 0
+    completed_steps: int = 0
+    submitted_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of chunks finished, between 0 and 1."""
+        return self.completed_steps / self.total_steps if self.total_steps else 0.0
+
+
+def _report_chunk(rows: List[Tuple[Any, ...]], title_ids: List[int], now: datetime) -> Dict[str, Any]:
+    """Worker: columnar export and partial report aggregates for one chunk of loans."""
+    return report_partials(LoanColumns.from_rows(rows, title_ids), now)
+
+
+def _clean_book_rows(rows: Sequence[Sequence[Any]]) -> Dict[str, List[Any]]:
+    """
+    Worker: validate and normalize one chunk of [title, author, isbn] import rows.
+    Returns the accepted rows and the rejected rows with a reason.
+    """
+    accepted = []
+    rejected = []
+    for row in rows:
+        if not isinstance(row, (list, tuple)) or len(row) != 3:
+            rejected.append([row, "expected [title, author, isbn]"])
+            continue
+        title, author, isbn = (" ".join(str(v).split()) for v in row)
+        digits = isbn.replace("-", "").replace(" ", "").upper()
+        if not title or not author:
+            rejected.append([row, "missing title or author"])
+        elif len(digits) not in (10, 13) or not digits[:-1].isdigit() or not (digits[-1].isdigit() or digits[-1] == "X"):
+            rejected.append([row, "invalid ISBN"])
+        else:
+            accepted.append([title, author, isbn])
+    return {"accepted": accepted, "rejected": rejected}
+
+
+class JobManager:
+    """
+    Submits chunked jobs to a process pool and tracks their status.
+    The pool is created on the first submission, so an idle manager costs nothing.
+    """
+
+    def __init__(self, library, max_workers: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, executor: Optional[Executor] = None):
+        """
+        Initialize the job manager.
+
+        Args:
+            library: The LibrarySystem jobs read from and import into.
+            max_workers: Process pool size (defaults to the CPU count).
+            chunk_size: Rows per chunk sent to a worker.
+            executor: Optional executor to use instead of a private process pool.
+        """
+        self.library = library
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self._executor = executor
+        self._jobs: Dict[int, Job] = {}
+        self._job_id_counter = 1
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+
+    def _pool(self) -> Executor:
+        """
+        Get the executor, starting the process pool on first use.
+        Workers are spawned rather than forked, since the parent runs server threads.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(self, kind: str, params: Optional[Dict[str, Any]] = None) -> Job:
+        """
+        Submit a job.
+
+        Args:
+            kind: "circulation_report" (params: optional "top_k") or
+                  "import_books" (params: "rows", a list of [title, author, isbn]).
+            params: Job parameters.
+
+        Returns:
+            The submitted Job; poll it with get_job or block on it with wait.
+        """
+        params = params or {}
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        with self._lock:
+            job = Job(id=self._job_id_counter, kind=kind)
+            self._jobs[job.id] = job
+            self._job_id_counter += 1
+
+        if kind == "circulation_report":
+            now = getattr(self.library, "clock", datetime.now)()
+            top_k = int(params.get("top_k", 10))
+            # Reading the loan history walks every loan: it runs in the job's own
+            # thread, so the caller gets the Job right away
+            threading.Thread(
+                target=self._start_report, args=(job, now, top_k), name=f"job-{job.id}", daemon=True
+            ).start()
+        else:
+            rows = list(params.get("rows", []))
+            chunks = [rows[i:i + self.chunk_size] for i in range(0, len(rows), self.chunk_size)] or [[]]
+            summary: Dict[str, Any] = {"added": 0, "rejected": []}
+
+            def apply(cleaned):
+                # Mutations happen here, in this process, in small locked steps
+                for title, author, isbn in cleaned["accepted"]:
+                    self.library.add_book(title, author, isbn)
+                summary["added"] += len(cleaned["accepted"])
+                summary["rejected"].extend(cleaned["rejected"])
+
+            self._run(job, [(_clean_book_rows, (chunk,)) for chunk in chunks], len(chunks),
+                      on_chunk=apply, on_finish=lambda: summary)
+        return job
+
+    def _start_report(self, job: Job, now: datetime, top_k: int):
+        """
+        Read the loan history from a snapshot and submit a circulation report's chunks.
+        This thread only reads raw loan rows; the workers convert them into
+        columns and aggregate them, and the partials are merged here.
+        """
+        partials: List[Dict[str, Any]] = []
+        try:
+            with read_view(self.library) as view:
+                loans = view.loans
+                chunks = export_chunks(view.books, loans, self.chunk_size)
+                self._run(job, ((_report_chunk, (rows, title_ids, now)) for rows, title_ids in chunks),
+                          max(math.ceil(len(loans) / self.chunk_size), 1),
+                          on_chunk=partials.append,
+                          on_finish=lambda: merge_report(partials, top_k))
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            self._finish(job, "failed")
+
+    def _run(self, job: Job, tasks: Iterable[Tuple[Callable[..., Any], Tuple[Any, ...]]], total: int,
+             on_chunk: Callable[[Any], None], on_finish: Callable[[], Any]):
+        """
+        Submit a job's chunk tasks and wire up progress tracking.
+        tasks may be lazy (total is their count): each is built right before
+        its submission, and the GIL is handed over between submissions.
+        Chunk results are handed to on_chunk one at a time; on_finish builds the result.
+        When a chunk fails, the chunks not started yet are cancelled.
+        """
+        job.total_steps = total
+        job.status = "running"
+        # Reentrant: cancelling a future runs its done callback in the cancelling thread
+        results_lock = threading.RLock()
+        futures: List["Future[Any]"] = []
+
+        def fail(e: Exception):
+            # Called with results_lock held
+            job.error = f"{type(e).__name__}: {e}"
+            self._finish(job, "failed")
+            for future in futures:
+                future.cancel()
+
+        def chunk_done(future):
+            with results_lock:
+                if job.status != "running":
+                    return
+                try:
+                    on_chunk(future.result())
+                    job.completed_steps += 1
+                    if job.completed_steps == job.total_steps:
+                        job.result = on_finish()
+                        self._finish(job, "done")
+                except Exception as e:
+                    fail(e)
+
+        try:
+            pool = self._pool()
+            for fn, args in tasks:
+                with results_lock:
+                    if job.status != "running":
+                        break
+                    future = pool.submit(fn, *args)
+                    futures.append(future)
+                future.add_done_callback(chunk_done)
+                # Let interactive threads run before the next chunk is read
+                time.sleep(0)
+        except Exception as e:
+            with results_lock:
+                fail(e)
+
+    def _finish(self, job: Job, status: str):
+        """Mark a job finished and wake any waiters."""
+        with self._done:
+            job.status = status
+            job.finished_at = datetime.now()
+            self._done.notify_all()
+
+    def get_job(self, job_id: int) -> Optional[Job]:
+        """
+        Get a job by ID.
+        Returns the Job object, or None if not found.
+        """
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        """Get all jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> Optional[Job]:
+        """
+        Block until a job finishes or the timeout expires.
+        Returns the Job object, or None if not found.
+        """
+        with self._done:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._done.wait_for(lambda: job.status in ("done", "failed"), timeout)
+            return job
+
+    def shutdown(self):
+        """Stop the process pool, letting running chunks finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -3,76 +3,427 @@
 library.py
 ----------
 Implements the core business logic for the Library Management System.
-Handles book and patron management, borrowing, returning, and overdue tracking.
+Handles title, copy and patron management, borrowing, returning, holds, and overdue tracking.
 """
 
+import bisect
+import heapq
+import logging
+import threading
+import weakref
+from array import array
+from collections import deque
+from itertools import compress
 from datetime import datetime, timedelta
-from typing import List, Optional
-from .models import Book, Patron, Loan
+from types import ModuleType
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+np: Optional[ModuleType]
+try:
+    import numpy
+    np = numpy
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+from .clock import to_epoch_micros
+from .fuzzy import TrigramIndex
+from .models import Title, Book, Patron, Loan, Hold
+from .snapshot import LibrarySnapshot, clone
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_email(email: str) -> str:
+    """Normalize an email address for lookups: trimmed and lowercased."""
+    return email.strip().lower()
+
+
+def normalize_phone(phone: str) -> str:
+    """Normalize a phone number for lookups: its digits only."""
+    return "".join(c for c in phone if c.isdigit())
+
+
+def name_tokens(name: str) -> List[str]:
+    """Split a name into the lowercased words indexed for prefix search."""
+    return name.lower().split()
 
 
 class LibrarySystem:
     """
     Core logic for managing books, patrons, and loans in the library.
     Provides methods for adding, borrowing, returning, and querying status.
+    Mutating methods are serialized by an internal lock, so one instance can be
+    shared by concurrent request handlers.
     """
-    def __init__(self):
+    def __init__(self, id_start: int = 1, id_step: int = 1,
+                 clock: Callable[[], datetime] = datetime.now, sibling_patrons: bool = False):
         """
         Initialize the LibrarySystem with empty lists and ID counters.
+        
+        Args:
+            id_start: First ID handed out for every kind of record.
+            id_step: Increment between consecutive IDs. Shards of a ShardedLibrary
+                     use interleaved sequences (start=shard index + 1, step=shard
+                     count) so IDs stay globally unique.
+            clock: Function returning the current time, used for loan, return and
+                   hold dates and for overdue checks (e.g. a clock.ManualClock in tests).
+            sibling_patrons: Lend to patron IDs of sibling shards' sequences without
+                             looking them up; set for the shards of a ShardedLibrary,
+                             whose router validates patrons in their home shard.
         """
+        self.clock = clock
+        self.sibling_patrons = sibling_patrons
+        self._id_start = id_start
+        self._id_step = id_step
+        self._lock = threading.RLock()
+        self.titles: List[Title] = []
         self.books: List[Book] = []
         self.patrons: List[Patron] = []
         self.loans: List[Loan] = []
-        self._book_id_counter = 1
-        self._patron_id_counter = 1
-        self._loan_id_counter = 1
+        self._title_id_counter = id_start
+        self._book_id_counter = id_start
+        self._patron_id_counter = id_start
+        self._loan_id_counter = id_start
+        self._hold_id_counter = id_start
+        # Indexes for constant-time lookups by ID
+        self._titles_by_id: Dict[int, Title] = {}
+        self._titles_by_isbn: Dict[str, Title] = {}
+        self._books_by_id: Dict[int, Book] = {}
+        self._patrons_by_id: Dict[int, Patron] = {}
+        # Secondary patron indexes: normalized email/phone, and sorted name words
+        self._patrons_by_email: Dict[str, Patron] = {}
+        self._patrons_by_phone: Dict[str, Patron] = {}
+        self._patron_name_index: List[Tuple[str, int]] = []
+        # Typo-tolerant index of "title author", keyed by the ID of each title's first copy
+        self._book_search = TrigramIndex()
+        self._active_loans: Dict[int, Loan] = {}
+        # Dashboard counters maintained on every mutation (see get_stats)
+        self._available_count = 0
+        self._active_loans_per_patron: Dict[int, int] = {}
+        # Due dates as epoch microseconds, one entry per loan in self.loans order,
+        # and whether each loan is still open, for bulk overdue checks
+        self._loan_due = array("q")
+        self._loan_open = bytearray()
+        self._due_heap: List[Tuple[int, int, Loan]] = []
+        self._overdue_ids: Set[int] = set()
+        # Free list of available copy IDs per title (dict used as an ordered set)
+        self._free_copies: Dict[int, Dict[int, None]] = {}
+        # FIFO waiting list per title; cancelled holds are skipped at hand-off
+        self._holds: Dict[int, Hold] = {}
+        self._hold_queues: Dict[int, Deque[Hold]] = {}
+        self._waiting: Dict[Tuple[int, int], Hold] = {}
+        self._listeners: List[Callable[[str, Any], None]] = []
+        # Open read snapshots; records are preserved for them before in-place mutation
+        self._snapshots: "weakref.WeakSet[LibrarySnapshot]" = weakref.WeakSet()
+        self._snapshot_epoch = 0
+        self._preserved_epoch: Dict[Tuple[type, int], int] = {}
+
+
+    @classmethod
+    def from_records(cls, titles: List[Title], books: List[Book], patrons: List[Patron],
+                     loans: List[Loan], holds: List[Hold], next_ids: Dict[str, int],
+                     id_start: int = 1, id_step: int = 1,
+                     clock: Callable[[], datetime] = datetime.now,
+                     sibling_patrons: bool = False) -> "LibrarySystem":
+        """
+        Rebuild a library from its records, e.g. when loading an archive.
+        Indexes and counters are built in bulk instead of replaying every
+        mutation, and no listeners are notified.
+
+        Args:
+            titles, books, patrons, loans, holds: Every record, in ID order.
+            next_ids: Next ID to hand out per kind: "title", "book", "patron", "loan" and "hold".
+            id_start, id_step, clock, sibling_patrons: As for __init__.
+        """
+        library = cls(id_start=id_start, id_step=id_step, clock=clock, sibling_patrons=sibling_patrons)
+        library.titles = titles
+        library.books = books
+        library.patrons = patrons
+        library.loans = loans
+        library._title_id_counter = next_ids["title"]
+        library._book_id_counter = next_ids["book"]
+        library._patron_id_counter = next_ids["patron"]
+        library._loan_id_counter = next_ids["loan"]
+        library._hold_id_counter = next_ids["hold"]
+        library._titles_by_id = {t.id: t for t in titles}
+        library._titles_by_isbn = {t.isbn: t for t in titles}
+        library._books_by_id = {b.id: b for b in books}
+        library._free_copies = {t.id: {} for t in titles}
+        for book in books:
+            if book.available:
+                library._free_copies[book.title_id][book.id] = None
+        library._available_count = sum(len(free) for free in library._free_copies.values())
+        indexed: Set[int] = set()
+        for book in books:
+            if book.title_id not in indexed:
+                indexed.add(book.title_id)
+                library._book_search.add(book.id, f"{book.title} {book.author}")
+        library._patrons_by_id = {p.id: p for p in patrons}
+        for patron in patrons:
+            email_key = normalize_email(patron.email)
+            phone_key = normalize_phone(patron.phone)
+            if email_key:
+                library._patrons_by_email[email_key] = patron
+            if phone_key:
+                library._patrons_by_phone[phone_key] = patron
+        library._patron_name_index = sorted(
+            (token, p.id) for p in patrons for token in set(name_tokens(p.name))
+        )
+        library._loan_due = array("q", (to_epoch_micros(loan.due_date) for loan in loans))
+        library._loan_open = bytearray(loan.return_date is None for loan in loans)
+        active = [loan for loan in loans if loan.return_date is None]
+        library._active_loans = {loan.book_id: loan for loan in active}
+        for loan in active:
+            patron_id = loan.patron_id
+            library._active_loans_per_patron[patron_id] = library._active_loans_per_patron.get(patron_id, 0) + 1
+        library._due_heap = [(to_epoch_micros(loan.due_date), loan.id, loan) for loan in active]
+        heapq.heapify(library._due_heap)
+        library._holds = {h.id: h for h in holds}
+        for hold in holds:
+            if not hold.cancelled and hold.loan_id is None:
+                title_id = library._books_by_id[hold.book_id].title_id
+                library._hold_queues.setdefault(title_id, deque()).append(hold)
+                library._waiting[(title_id, hold.patron_id)] = hold
+        return library
+
+
+    def add_listener(self, callback: Callable[[str, Any], None]):
+        """
+        Register a callback notified after every mutation.
+        The callback receives the event name ("title_added", "book_added", "patron_added",
+        "book_borrowed", "book_returned", "hold_placed" or "hold_cancelled") and
+        the affected Title, Book, Patron, Loan or Hold.
+        Callbacks run while the library lock is held, in mutation order, so they
+        must be fast and must not call back into the library's mutating methods.
+        Exceptions raised by a callback are logged and do not reach the caller.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+
+    def remove_listener(self, callback: Callable[[str, Any], None]):
+        """
+        Unregister a callback previously passed to add_listener.
+        """
+        with self._lock:
+            self._listeners.remove(callback)
+
+
+    def owns_id(self, record_id: int) -> bool:
+        """
+        Check whether an ID belongs to this instance's ID sequence.
+        Always True for a standalone LibrarySystem.
+        """
+        return record_id >= self._id_start and (record_id - self._id_start) % self._id_step == 0
+
+
+    def _known_patron(self, patron_id: int) -> bool:
+        """
+        Check that a patron may borrow here.
+        Only registered patrons may, except that a shard with sibling_patrons set
+        trusts positive IDs from another shard's sequence: the ShardedLibrary
+        router validates those in their home shard before it calls in.
+        """
+        if patron_id in self._patrons_by_id:
+            return True
+        return self.sibling_patrons and patron_id > 0 and not self.owns_id(patron_id)
+
+
+    def snapshot(self) -> LibrarySnapshot:
+        """
+        Take a consistent point-in-time view of titles, books, patrons and loans.
+        This is O(1) and holds the lock only briefly; reads on the snapshot take
+        no lock, so long listings, exports and reports never block checkouts.
+        Close the snapshot (or use it in a with-block) when done.
+        """
+        with self._lock:
+            if not self._snapshots:
+                self._preserved_epoch.clear()
+            self._snapshot_epoch += 1
+            snapshot = LibrarySnapshot(self)
+            self._snapshots.add(snapshot)
+            return snapshot
+
+
+    def _release_snapshot(self, snapshot: LibrarySnapshot):
+        """
+        Stop preserving records for a closed snapshot.
+        """
+        with self._lock:
+            self._snapshots.discard(snapshot)
+
+
+    def _preserve(self, record: Any):
+        """
+        Save a record's current state for the open snapshots before it is
+        mutated in place. Each record is copied at most once per snapshot epoch,
+        and not at all while no snapshot is open.
+        """
+        if not self._snapshots:
+            return
+        key = (type(record), record.id)
+        if self._preserved_epoch.get(key) == self._snapshot_epoch:
+            return
+        self._preserved_epoch[key] = self._snapshot_epoch
+        saved = clone(record)
+        for snapshot in self._snapshots:
+            snapshot._shadow.setdefault(key, saved)
+
+
+    def _loan_position(self, loan_id: int) -> int:
+        """
+        Get the index of a loan in self.loans (and the loan columns).
+        Loans are appended in ID order, so this is arithmetic on the ID.
+        """
+        return (loan_id - self._id_start) // self._id_step
+
+
+    def _notify(self, event: str, record: Any):
+        """
+        Notify all listeners of a mutation.
+        The mutation is already applied, so a failing listener is logged and
+        skipped rather than aborting the operation halfway.
+        """
+        for callback in self._listeners:
+            try:
+                callback(event, record)
+            except Exception:
+                logger.exception("Library listener %r failed on %s", callback, event)
 
 
     def add_book(self, title: str, author: str, isbn: str) -> Book:
         """
         Add a new book to the library.
+        A book with an ISBN the library already holds becomes another copy of
+        that title.
         Returns the created Book object.
         """
+        with self._lock:
+            title_record = self._titles_by_isbn.get(isbn)
+            if title_record is None:
+                title_record = Title(
+                    id=self._title_id_counter,
+                    title=title,
+                    author=author,
+                    isbn=isbn
+                )
+                self.titles.append(title_record)
+                self._titles_by_id[title_record.id] = title_record
+                self._titles_by_isbn[isbn] = title_record
+                self._free_copies[title_record.id] = {}
+                self._title_id_counter += self._id_step
+                self._notify("title_added", title_record)
+                book = self._add_copy(title_record)
+                self._book_search.add(book.id, f"{title} {author}")
+                return book
+            return self._add_copy(title_record)
+
+
+    def add_copies(self, title_id: int, count: int) -> List[Book]:
+        """
+        Add more copies of an existing title.
+        Returns the created Book objects, or an empty list if the title does not exist.
+        """
+        with self._lock:
+            title_record = self._titles_by_id.get(title_id)
+            if not title_record:
+                return []
+            return [self._add_copy(title_record) for _ in range(count)]
+
+
+    def _add_copy(self, title_record: Title) -> Book:
+        """
+        Add one available copy of a title while holding the library lock.
+        """
         book = Book(
             id=self._book_id_counter,
-            title=title,
-            author=author,
-            isbn=isbn
+            title=title_record.title,
+            author=title_record.author,
+            isbn=title_record.isbn,
+            title_id=title_record.id
         )
         self.books.append(book)
-        self._book_id_counter += 1
+        self._books_by_id[book.id] = book
+        self._free_copies[title_record.id][book.id] = None
+        self._preserve(title_record)
+        title_record.total_copies += 1
+        title_record.available_copies += 1
+        self._available_count += 1
+        self._book_id_counter += self._id_step
+        self._notify("book_added", book)
+        if title_record.available_copies == 1:
+            # A held title may have been waiting for its first free copy
+            self._hand_off(book.id)
         return book
 
 
     def add_patron(self, name: str, email: str, phone: str) -> Patron:
         """
         Add a new patron to the library.
+        Email addresses and phone numbers must be unique after normalization.
         Returns the created Patron object.
         """
-        patron = Patron(
-            id=self._patron_id_counter,
-            name=name,
-            email=email,
-            phone=phone
-        )
-        self.patrons.append(patron)
-        self._patron_id_counter += 1
-        return patron
+        email_key = normalize_email(email)
+        phone_key = normalize_phone(phone)
+        with self._lock:
+            if email_key and email_key in self._patrons_by_email:
+                raise ValueError(f"A patron with email {email} already exists")
+            if phone_key and phone_key in self._patrons_by_phone:
+                raise ValueError(f"A patron with phone {phone} already exists")
+            patron = Patron(
+                id=self._patron_id_counter,
+                name=name,
+                email=email,
+                phone=phone
+            )
+            self.patrons.append(patron)
+            self._patrons_by_id[patron.id] = patron
+            if email_key:
+                self._patrons_by_email[email_key] = patron
+            if phone_key:
+                self._patrons_by_phone[phone_key] = patron
+            for token in set(name_tokens(name)):
+                bisect.insort(self._patron_name_index, (token, patron.id))
+            self._patron_id_counter += self._id_step
+            self._notify("patron_added", patron)
+            return patron
 
 
     def borrow_book(self, book_id: int, patron_id: int, days: int = 14) -> Optional[Loan]:
         """
         Borrow a book for a patron for a specified number of days.
+        If that copy is out but another copy of the same title is free, the free
+        copy is lent instead.
         Returns the created Loan object, or None if borrowing fails.
         """
-        book = next((b for b in self.books if b.id == book_id), None)
-        patron = next((p for p in self.patrons if p.id == patron_id), None)
-        if not book or not patron:
+        with self._lock:
+            return self._borrow_book(book_id, patron_id, days)
+
+
+    def _borrow_book(self, book_id: int, patron_id: int, days: int) -> Optional[Loan]:
+        """
+        Borrow a book while holding the library lock.
+        """
+        book = self._books_by_id.get(book_id)
+        if not book or not self._known_patron(patron_id):
             return None
         if not book.available:
-            return None
-        loan_date = datetime.now()
+            free = self._free_copies[book.title_id]
+            if not free:
+                return None
+            book_id, _ = free.popitem()
+            book = self._books_by_id[book_id]
+        else:
+            del self._free_copies[book.title_id][book_id]
+        title_record = self._titles_by_id[book.title_id]
+        self._preserve(title_record)
+        title_record.available_copies -= 1
+        self._available_count -= 1
+        loan_date = self.clock()
         due_date = loan_date + timedelta(days=days)
+        due_micros = to_epoch_micros(due_date)
         loan = Loan(
             id=self._loan_id_counter,
             book_id=book_id,
@@ -80,34 +431,276 @@ class LibrarySystem:
             loan_date=loan_date,
             due_date=due_date
         )
+        self._preserve(book)
         book.available = False
         book.borrowed_by = patron_id
         self.loans.append(loan)
-        self._loan_id_counter += 1
+        self._loan_due.append(due_micros)
+        self._loan_open.append(1)
+        self._active_loans[book_id] = loan
+        self._active_loans_per_patron[patron_id] = self._active_loans_per_patron.get(patron_id, 0) + 1
+        heapq.heappush(self._due_heap, (due_micros, loan.id, loan))
+        self._loan_id_counter += self._id_step
+        self._notify("book_borrowed", loan)
         return loan
 
 
     def return_book(self, book_id: int) -> bool:
         """
         Return a borrowed book to the library.
+        If patrons are waiting for it, the book is immediately lent to the first
+        one in line.
         Returns True if successful, False otherwise.
         """
-        book = next((b for b in self.books if b.id == book_id), None)
+        with self._lock:
+            return self._return_book(book_id)
+
+
+    def _return_book(self, book_id: int) -> bool:
+        """
+        Return a book while holding the library lock.
+        """
+        book = self._books_by_id.get(book_id)
         if not book or book.available:
             return False
-        active_loan = next(
-            (l for l in self.loans 
-             if l.book_id == book_id and l.return_date is None),
-            None
-        )
+        active_loan = self._active_loans.pop(book_id, None)
         if not active_loan:
             return False
-        active_loan.return_date = datetime.now()
+        self._preserve(active_loan)
+        active_loan.return_date = self.clock()
+        self._loan_open[self._loan_position(active_loan.id)] = 0
+        self._preserve(book)
         book.available = True
         book.borrowed_by = None
+        self._free_copies[book.title_id][book_id] = None
+        title_record = self._titles_by_id[book.title_id]
+        self._preserve(title_record)
+        title_record.available_copies += 1
+        self._available_count += 1
+        self._overdue_ids.discard(active_loan.id)
+        remaining = self._active_loans_per_patron[active_loan.patron_id] - 1
+        if remaining:
+            self._active_loans_per_patron[active_loan.patron_id] = remaining
+        else:
+            del self._active_loans_per_patron[active_loan.patron_id]
+        self._notify("book_returned", active_loan)
+        self._hand_off(book_id)
         return True
 
 
+    def _hand_off(self, book_id: int):
+        """
+        Lend a just-freed copy to the first patron still waiting for its title.
+        Cancelled holds are discarded on the way, so each hold is dequeued once.
+        """
+        title_id = self._books_by_id[book_id].title_id
+        queue = self._hold_queues.get(title_id)
+        while queue:
+            hold = queue.popleft()
+            if hold.cancelled:
+                continue
+            del self._waiting[(title_id, hold.patron_id)]
+            loan = self._borrow_book(book_id, hold.patron_id, hold.days)
+            if loan:
+                hold.loan_id = loan.id
+                break
+        if queue is not None and not queue:
+            del self._hold_queues[title_id]
+
+
+    def place_hold(self, book_id: int, patron_id: int, days: int = 14) -> Optional[Hold]:
+        """
+        Join the waiting list for a borrowed book's title.
+        The first copy of the title to come back is lent automatically to the
+        first patron in line, so there is no need to retry borrow_book.
+        Returns the created Hold object, or None if the book or patron does not
+        exist, a copy is available, or the patron already has or awaits it.
+        """
+        with self._lock:
+            book = self._books_by_id.get(book_id)
+            if not book or not self._known_patron(patron_id):
+                return None
+            if self._free_copies[book.title_id] or book.borrowed_by == patron_id:
+                return None
+            if (book.title_id, patron_id) in self._waiting:
+                return None
+            hold = Hold(
+                id=self._hold_id_counter,
+                book_id=book_id,
+                patron_id=patron_id,
+                placed_date=self.clock(),
+                days=days
+            )
+            self._hold_queues.setdefault(book.title_id, deque()).append(hold)
+            self._waiting[(book.title_id, patron_id)] = hold
+            self._holds[hold.id] = hold
+            self._hold_id_counter += self._id_step
+            self._notify("hold_placed", hold)
+            return hold
+
+
+    def cancel_hold(self, hold_id: int) -> bool:
+        """
+        Cancel a waiting hold.
+        Returns True if successful, False if the hold does not exist or was
+        already fulfilled or cancelled.
+        """
+        with self._lock:
+            hold = self._holds.get(hold_id)
+            if not hold or hold.cancelled or hold.loan_id is not None:
+                return False
+            hold.cancelled = True
+            title_id = self._books_by_id[hold.book_id].title_id
+            del self._waiting[(title_id, hold.patron_id)]
+            self._notify("hold_cancelled", hold)
+            return True
+
+
+    def get_hold_queue(self, book_id: int) -> List[Hold]:
+        """
+        Get the waiting holds for a book's title, first in line first.
+        Returns a list of Hold objects.
+        """
+        with self._lock:
+            book = self._books_by_id.get(book_id)
+            if not book:
+                return []
+            return [h for h in self._hold_queues.get(book.title_id, ()) if not h.cancelled]
+
+
+    def get_title(self, title_id: int) -> Optional[Title]:
+        """
+        Get a title by ID.
+        Returns the Title object, or None if not found.
+        """
+        return self._titles_by_id.get(title_id)
+
+
+    def get_title_by_isbn(self, isbn: str) -> Optional[Title]:
+        """
+        Get a title by ISBN.
+        Returns the Title object, or None if not found.
+        """
+        return self._titles_by_isbn.get(isbn)
+
+
+    def is_title_available(self, title_id: int) -> bool:
+        """
+        Check whether any copy of a title is available, without touching copy records.
+        """
+        title_record = self._titles_by_id.get(title_id)
+        return bool(title_record and title_record.available_copies)
+
+
+    def get_book(self, book_id: int) -> Optional[Book]:
+        """
+        Get a book by ID.
+        Returns the Book object, or None if not found.
+        """
+        return self._books_by_id.get(book_id)
+
+
+    def get_patron(self, patron_id: int) -> Optional[Patron]:
+        """
+        Get a patron by ID.
+        Returns the Patron object, or None if not found.
+        """
+        return self._patrons_by_id.get(patron_id)
+
+
+    def find_patron_by_email(self, email: str) -> Optional[Patron]:
+        """
+        Find a patron by email address, ignoring case and surrounding spaces.
+        Returns the Patron object, or None if not found.
+        """
+        return self._patrons_by_email.get(normalize_email(email))
+
+
+    def find_patron_by_phone(self, phone: str) -> Optional[Patron]:
+        """
+        Find a patron by phone number, ignoring punctuation and spaces.
+        Returns the Patron object, or None if not found.
+        """
+        key = normalize_phone(phone)
+        return self._patrons_by_phone.get(key) if key else None
+
+
+    def find_patrons_by_name(self, prefix: str, limit: int = 10) -> List[Patron]:
+        """
+        Find patrons by name prefix, ignoring case: "jan" and "smi" both find
+        "Jane Smith", and "jane sm" requires both words to match.
+        Returns up to limit Patron objects, ordered by the first matched word.
+        """
+        words = name_tokens(prefix)
+        if not words or limit <= 0:
+            return []
+        first, rest = words[0], words[1:]
+        index = self._patron_name_index
+        found: List[Patron] = []
+        seen: Set[int] = set()
+        # Range scan over the sorted (word, patron_id) pairs starting with first
+        for i in range(bisect.bisect_left(index, (first,)), len(index)):
+            token, patron_id = index[i]
+            if not token.startswith(first):
+                break
+            if patron_id in seen:
+                continue
+            seen.add(patron_id)
+            patron = self._patrons_by_id[patron_id]
+            tokens = name_tokens(patron.name)
+            if all(any(t.startswith(w) for t in tokens) for w in rest):
+                found.append(patron)
+                if len(found) == limit:
+                    break
+        return found
+
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get dashboard totals without scanning books, patrons or loans.
+        Counters are kept up to date by every mutation; loans that became overdue
+        since the last call are moved off a due-date heap, so each loan is
+        examined at most once.
+        Returns a dict with titles, books, available, on_loan, overdue, patrons,
+        active_patrons and holds_waiting counts.
+        """
+        with self._lock:
+            now = to_epoch_micros(self.clock())
+            heap = self._due_heap
+            while heap and heap[0][0] < now:
+                loan = heapq.heappop(heap)[2]
+                if loan.return_date is None:
+                    self._overdue_ids.add(loan.id)
+            return {
+                "titles": len(self.titles),
+                "books": len(self.books),
+                "available": self._available_count,
+                "on_loan": len(self._active_loans),
+                "overdue": len(self._overdue_ids),
+                "patrons": len(self.patrons),
+                "active_patrons": len(self._active_loans_per_patron),
+                "holds_waiting": len(self._waiting),
+            }
+
+
+    def find_books(self, query: str, limit: int = 5) -> List[Tuple[Book, float]]:
+        """
+        Find books by approximate title and/or author, tolerating typos and word
+        order: "Great Gatsbi" and "Orwell 1984" both find their book.
+        Returns up to limit (Book, score) pairs, one per title, best first, with
+        scores from 0 to 1. A free copy is returned when the title has one.
+        """
+        with self._lock:
+            found = []
+            for book_id, score in self._book_search.search(query, limit):
+                book = self._books_by_id[book_id]
+                free = self._free_copies[book.title_id]
+                if free and book_id not in free:
+                    book = self._books_by_id[next(iter(free))]
+                found.append((book, score))
+            return found
+
+
     def get_patron_loans(self, patron_id: int) -> List[Loan]:
         """
         Get all loans for a specific patron.
@@ -119,10 +712,49 @@ class LibrarySystem:
     def get_overdue_loans(self) -> List[Loan]:
         """
         Get all loans that are overdue (not returned and past due date).
+        Runs as integer comparisons over the due-date column of open loans.
         Returns a list of Loan objects.
         """
-        now = datetime.now()
-        return [
-            loan for loan in self.loans
-            if loan.return_date is None and loan.due_date < now
-        ]
\ No newline at end of file
+        now = to_epoch_micros(self.clock())
+        return self._open_loans_due_between(None, now)
+
+
+    def get_due_soon_loans(self, days: float = 3) -> List[Loan]:
+        """
+        Get open loans that are not overdue yet but due within the given number of days.
+        Returns a list of Loan objects, in loan order.
+        """
+        now = self.clock()
+        return self._open_loans_due_between(to_epoch_micros(now), to_epoch_micros(now + timedelta(days=days)))
+
+
+    def _open_loans_due_between(self, start: Optional[int], end: int) -> List[Loan]:
+        """
+        Get open loans with start <= due < end (epoch microseconds; None for no lower bound).
+        """
+        loans = self.loans
+        return [loans[i] for i in self._open_loan_positions(start, end)]
+
+
+    def _open_loan_positions(self, start: Optional[int], end: int, length: Optional[int] = None) -> List[int]:
+        """
+        Get the positions (in self.loans) of open loans with start <= due < end,
+        among the first length loans (all by default).
+        With NumPy the columns are compared in bulk; otherwise only open loans
+        are visited, skipping returned ones in C.
+        """
+        if np is not None:
+            # The arrays cannot grow while NumPy views them: build the mask under the lock
+            with self._lock:
+                due = np.frombuffer(self._loan_due, dtype=np.int64)[:length]
+                mask = np.frombuffer(self._loan_open, dtype=np.bool_)[:length] & (due < end)
+                if start is not None:
+                    mask &= due >= start
+                selected: List[int] = np.flatnonzero(mask).tolist()
+                del due, mask
+            return selected
+        due = self._loan_due
+        positions = compress(range(len(self._loan_open) if length is None else length), self._loan_open)
+        if start is None:
+            return [i for i in positions if due[i] < end]
+        return [i for i in positions if start <= due[i] < end]
\ No newline at end of file
@@ -0,0 +1,326 @@
+"""
+llm_pool.py
+-----------
+Pool of OpenAI-compatible chat completion endpoints for the LLM chat.
+Requests fail over between endpoints, are retried with jittered exponential
+backoff, skip endpoints whose circuit breaker is open, and can be hedged: if
+the first endpoint has not answered after a latency threshold, the next one is
+asked as well and the first successful response wins.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Statuses worth retrying on another attempt or endpoint
+RETRIABLE_STATUSES = frozenset((408, 425, 429))
+# Request errors that point at the endpoint's configuration (key, permissions,
+# path) rather than at the request: not retried, but counted against its health
+ENDPOINT_FAULT_STATUSES = frozenset((401, 403, 404))
+
+
+class LLMError(RuntimeError):
+    """An LLM request failed."""
+
+
+class LLMHTTPError(LLMError):
+    """An LLM endpoint answered with an HTTP error status."""
+    def __init__(self, status: int, body: str, url: str):
+        super().__init__(f"HTTP {status} from {url}: {body[:200]}")
+        self.status = status
+        self.body = body
+        self.url = url
+
+    @property
+    def retriable(self) -> bool:
+        """True for server errors and throttling, False for request errors."""
+        return self.status >= 500 or self.status in RETRIABLE_STATUSES
+
+    @property
+    def endpoint_fault(self) -> bool:
+        """True when the status says something about the endpoint's health."""
+        return self.retriable or self.status in ENDPOINT_FAULT_STATUSES
+
+
+class LLMUnavailableError(LLMError):
+    """No endpoint could serve the request."""
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+    Opens after failure_threshold consecutive failures; after reset_timeout one
+    trial request is let through (half-open), which closes the breaker on
+    success and re-opens it on failure.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Check whether a request may be sent now; may start a half-open trial."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            # An abandoned trial is given up after another reset_timeout
+            if self.clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._opened_at = self.clock()
+                return True
+            return False
+
+    def record_success(self):
+        """Close the breaker after a successful request."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """Count a failure, opening the breaker at the threshold or after a failed trial."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+
+
+class Endpoint:
+    """
+    One OpenAI-compatible endpoint with its health: circuit breaker, smoothed
+    latency and success/failure counts.
+    """
+    # Weight of the newest sample in the smoothed latency
+    LATENCY_ALPHA = 0.3
+
+    def __init__(self, url: str, api_key: Optional[str] = None, breaker: Optional[CircuitBreaker] = None):
+        self.url = url
+        self.api_key = api_key
+        self.breaker = breaker or CircuitBreaker()
+        self.latency: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+
+    def record(self, ok: bool, latency: float):
+        """Update the endpoint's health after a request."""
+        if ok:
+            self.successes += 1
+            self.latency = latency if self.latency is None else (
+                self.LATENCY_ALPHA * latency + (1 - self.LATENCY_ALPHA) * self.latency
+            )
+            self.breaker.record_success()
+        else:
+            self.failures += 1
+            self.breaker.record_failure()
+
+    def health(self) -> Dict[str, Any]:
+        """Get a snapshot of the endpoint's health."""
+        return {
+            "url": self.url,
+            "state": self.breaker.state,
+            "latency": self.latency,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+
+class LLMEndpointPool:
+    """
+    Sends chat completion requests to the healthiest available endpoint.
+    Endpoints with a closed breaker are preferred, fastest first; failures move
+    on to the next endpoint, and a full round of failures is retried after a
+    jittered exponential backoff.
+    """
+
+    def __init__(self, endpoints: Sequence[Endpoint], timeout: float = 30.0, retries: int = 2,
+                 backoff: float = 0.5, max_backoff: float = 8.0, hedge_after: Optional[float] = None,
+                 sleep: Callable[[float], None] = time.sleep, rng: Callable[[], float] = random.random,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the pool.
+
+        Args:
+            endpoints: Endpoints in order of preference.
+            timeout: Per-request timeout in seconds.
+            retries: Extra rounds over the endpoints after every one has failed.
+            backoff: Base delay in seconds before the first retry round; doubles per round.
+            max_backoff: Upper bound on the backoff delay.
+            hedge_after: Seconds to wait for an answer before also asking the next
+                         endpoint; None disables hedging.
+            sleep, rng, clock: Injectable for tests.
+        """
+        if not endpoints:
+            raise ValueError("At least one LLM endpoint is required")
+        self.endpoints = list(endpoints)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_after = hedge_after
+        self.sleep = sleep
+        self.rng = rng
+        self.clock = clock
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, urls: str, api_key: Optional[str] = None, **kwargs: Any) -> "LLMEndpointPool":
+        """
+        Build a pool from a comma-separated URL list, e.g. the LLM_API_URL setting.
+        LLM_TIMEOUT, LLM_RETRIES, LLM_HEDGE_AFTER, LLM_BREAKER_FAILURES and
+        LLM_BREAKER_RESET override the defaults when set.
+        """
+        failures = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+        reset = float(os.getenv("LLM_BREAKER_RESET", "30"))
+        endpoints = [
+            Endpoint(url.strip(), api_key, CircuitBreaker(failures, reset))
+            for url in urls.split(",") if url.strip()
+        ]
+        hedge_after = os.getenv("LLM_HEDGE_AFTER")
+        settings: Dict[str, Any] = {
+            "timeout": float(os.getenv("LLM_TIMEOUT", "30")),
+            "retries": int(os.getenv("LLM_RETRIES", "2")),
+            "hedge_after": float(hedge_after) if hedge_after else None,
+        }
+        settings.update(kwargs)
+        return cls(endpoints, **settings)
+
+    def health(self) -> List[Dict[str, Any]]:
+        """Get the health of every endpoint."""
+        return [endpoint.health() for endpoint in self.endpoints]
+
+    def post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a chat completion request.
+
+        Returns:
+            The decoded JSON response.
+
+        Raises:
+            LLMHTTPError: An endpoint rejected the request itself (4xx other than throttling).
+            LLMUnavailableError: Every endpoint failed on every round.
+        """
+        body = json.dumps(payload).encode("utf-8")
+        last_error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.sleep(self.rng() * min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+            try:
+                return self._attempt(body)
+            except LLMHTTPError as e:
+                if not e.retriable:
+                    raise
+                last_error = e
+            except LLMError as e:
+                last_error = e
+        raise LLMUnavailableError(f"All LLM endpoints failed: {last_error}")
+
+    def _ranked(self) -> List[Endpoint]:
+        """Endpoints in the order to try them: closed breakers first, fastest first."""
+        return sorted(
+            self.endpoints,
+            key=lambda e: (e.breaker.state != CircuitBreaker.CLOSED, e.latency or 0.0)
+        )
+
+    def _attempt(self, body: bytes) -> Dict[str, Any]:
+        """
+        One round over the endpoints: fail over on errors and hedge slow requests.
+        Raises the last error when no endpoint succeeded.
+        """
+        queue = self._ranked()
+        last_error: Exception = LLMUnavailableError("Every endpoint's circuit breaker is open")
+
+        def next_endpoint() -> Optional[Endpoint]:
+            while queue:
+                endpoint = queue.pop(0)
+                if endpoint.breaker.allow():
+                    return endpoint
+            return None
+
+        if self.hedge_after is None:
+            endpoint = next_endpoint()
+            while endpoint is not None:
+                try:
+                    return self._send(endpoint, body)
+                except LLMHTTPError as e:
+                    if not e.retriable:
+                        raise
+                    last_error = e
+                except LLMError as e:
+                    last_error = e
+                endpoint = next_endpoint()
+            raise last_error
+
+        executor = self._hedge_executor()
+        pending = {}
+        endpoint = next_endpoint()
+        if endpoint is not None:
+            pending[executor.submit(self._send, endpoint, body)] = endpoint
+        while pending:
+            done, _ = wait(pending, timeout=self.hedge_after if queue else None, return_when=FIRST_COMPLETED)
+            if not done:
+                # Still waiting after the threshold: ask the next endpoint too
+                endpoint = next_endpoint()
+                if endpoint is not None:
+                    pending[executor.submit(self._send, endpoint, body)] = endpoint
+                continue
+            for future in done:
+                del pending[future]
+                try:
+                    return future.result()
+                except LLMHTTPError as e:
+                    if not e.retriable:
+                        raise
+                    last_error = e
+                except LLMError as e:
+                    last_error = e
+            if not pending:
+                endpoint = next_endpoint()
+                if endpoint is not None:
+                    pending[executor.submit(self._send, endpoint, body)] = endpoint
+        raise last_error
+
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool running hedged requests, creating it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=4 * len(self.endpoints),
+                                                    thread_name_prefix="llm-hedge")
+            return self._executor
+
+    def _send(self, endpoint: Endpoint, body: bytes) -> Dict[str, Any]:
+        """POST a request body to one endpoint and record the outcome in its health."""
+        headers = {"Content-Type": "application/json"}
+        if endpoint.api_key:
+            headers["Authorization"] = f"Bearer {endpoint.api_key}"
+        request = urllib.request.Request(endpoint.url, data=body, headers=headers, method="POST")
+        start = self.clock()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data: Dict[str, Any] = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            error = LLMHTTPError(e.code, e.read().decode("utf-8", errors="replace"), endpoint.url)
+            # A rejected request (e.g. 400) says nothing about the endpoint's health,
+            # but a bad key or a wrong path does
+            endpoint.record(not error.endpoint_fault, self.clock() - start)
+            raise error from e
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            endpoint.record(False, self.clock() - start)
+            raise LLMError(f"{endpoint.url}: {e}") from e
+        endpoint.record(True, self.clock() - start)
+        return data
@@ -0,0 +1,37 @@
+"""
+locking.py
+----------
+Lock and listener helpers for components that follow a LibrarySystem or a
+ShardedLibrary (change feed, fine engine, recommendation index): both expose
+the same listener hook, but a ShardedLibrary keeps one lock per in-process
+shard, and shards behind an API service have neither.
+"""
+
+from contextlib import ExitStack
+
+
+def locked(library) -> ExitStack:
+    """
+    Hold the lock of a LibrarySystem, or of every in-process shard of a
+    ShardedLibrary (in shard order).
+    Returns a context manager releasing the locks on exit.
+    """
+    stack = ExitStack()
+    if hasattr(library, "_lock"):
+        stack.enter_context(library._lock)
+    for shard in getattr(library, "shards", ()):
+        if hasattr(shard, "_lock"):
+            stack.enter_context(shard._lock)
+    return stack
+
+
+def supports_listeners(library) -> bool:
+    """
+    Check whether every mutation of a library reaches its listener hook: True
+    for a LibrarySystem and for a ShardedLibrary whose shards are all in-process,
+    False for API clients.
+    """
+    shards = getattr(library, "shards", None)
+    if shards is not None:
+        return all(supports_listeners(shard) for shard in shards)
+    return hasattr(library, "add_listener") and hasattr(library, "_lock")
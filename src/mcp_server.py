@@ -5,9 +5,35 @@ Model Context Protocol (MCP) server for the Library Management System.
 Allows LLMs to interact with the library system through standard MCP tools.
 """
 
+import heapq
 import json
-from typing import Any, Dict, List
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 from .library import LibrarySystem
+from .fines import FineEngine, format_amount
+from .jobs import JOB_KINDS, JobManager
+from .locking import supports_listeners
+from .recommend import CoBorrowIndex
+from .rendering import RowRenderer
+from .snapshot import read_view
+from .status_views import overdue_details
+from . import serializers
+from .serializers import BOOK_FIELDS, PATRON_FIELDS
+
+T = TypeVar("T")
+
+
+# Tools whose structured output can be narrowed with a "fields" argument
+FIELD_SELECTABLE_TOOLS = ("list_books", "find_book", "list_patrons", "get_book_info", "get_patron_info",
+                          "find_patron", "search_patrons")
+OUTPUT_FORMATS = ("text", "json")
+# Reported by the fine and recommendation tools when the library has no listener hook
+FINES_UNAVAILABLE = "Fines are not available for this library"
+RECOMMENDATIONS_UNAVAILABLE = "Recommendations are not available for this library"
+
+
+class ToolError(Exception):
+    """Raised by a tool that cannot complete; the message is the tool's error output."""
 
 
 class LibraryMCPServer:
@@ -16,16 +42,73 @@ class LibraryMCPServer:
     Allows an LLM to add books, manage patrons, handle loans, and query status.
     """
     
-    def __init__(self, library_system: LibrarySystem):
+    def __init__(self, library_system: LibrarySystem, output_format: str = "text",
+                 jobs: Optional[JobManager] = None, fines: Optional[FineEngine] = None,
+                 recommendations: Optional[CoBorrowIndex] = None):
         """
         Initialize the MCP server with a LibrarySystem instance.
         
         Args:
             library_system: The LibrarySystem instance to manage.
+            output_format: Default tool output format, "text" for human-formatted
+                           strings or "json" for compact structured JSON.
+            jobs: JobManager running background jobs; one is created for the
+                  library by default.
+            fines: FineEngine computing overdue fines; by default one with the
+                   default policy is created on first use, if the library
+                   supports listeners (the fine tools report that fines are
+                   not available otherwise, e.g. over API client shards).
+            recommendations: CoBorrowIndex answering recommend_books; created
+                             on first use like fines by default.
         """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
         self.library = library_system
+        self.output_format = output_format
+        self.jobs = jobs if jobs is not None else JobManager(library_system)
+        self._fines = fines
+        self._recommendations = recommendations
+        # Attributes holding engines created by this server, closed by close()
+        self._owned: List[str] = []
+        self._build_lock = threading.Lock()
+        self.rows = RowRenderer(library_system)
         self.tools = self._define_tools()
+        if output_format == "json":
+            self._add_field_selection()
     
+    def _build(self, attribute: str, factory: Callable[[Any], T]) -> Optional[T]:
+        """
+        Get a lazily built engine, creating it on first use.
+        Returns None when the library does not support listeners.
+        """
+        with self._build_lock:
+            engine: Optional[T] = getattr(self, attribute)
+            if engine is None and supports_listeners(self.library):
+                engine = factory(self.library)
+                setattr(self, attribute, engine)
+                self._owned.append(attribute)
+            return engine
+
+    @property
+    def fines(self) -> Optional[FineEngine]:
+        """The FineEngine behind the fine tools, or None if fines are not available."""
+        return self._fines if self._fines is not None else self._build("_fines", FineEngine)
+
+    @property
+    def recommendations(self) -> Optional[CoBorrowIndex]:
+        """The CoBorrowIndex behind recommend_books, or None if recommendations are not available."""
+        if self._recommendations is not None:
+            return self._recommendations
+        return self._build("_recommendations", CoBorrowIndex)
+
+    def close(self):
+        """Stop the engines this server created (fines and recommendations)."""
+        with self._build_lock:
+            for attribute in self._owned:
+                getattr(self, attribute).close()
+                setattr(self, attribute, None)
+            self._owned.clear()
+
     def _define_tools(self) -> List[Dict[str, Any]]:
         """
         Define all available library tools in MCP format.
@@ -40,7 +123,8 @@ class LibraryMCPServer:
                     "properties": {
                         "title": {"type": "string", "description": "Book title"},
                         "author": {"type": "string", "description": "Author name"},
-                        "isbn": {"type": "string", "description": "ISBN number"}
+                        "isbn": {"type": "string", "description": "ISBN number"},
+                        "copies": {"type": "integer", "description": "Number of copies to add", "default": 1}
                     },
                     "required": ["title", "author", "isbn"]
                 }
@@ -82,21 +166,144 @@ class LibraryMCPServer:
                     "required": ["book_id"]
                 }
             },
+            {
+                "name": "place_hold",
+                "description": "Join the waiting list for a borrowed book; it is lent automatically when returned",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "book_id": {"type": "integer", "description": "ID of the borrowed book"},
+                        "patron_id": {"type": "integer", "description": "ID of the waiting patron"},
+                        "days": {"type": "integer", "description": "Number of days for the loan", "default": 14}
+                    },
+                    "required": ["book_id", "patron_id"]
+                }
+            },
+            {
+                "name": "cancel_hold",
+                "description": "Cancel a hold on a book",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "hold_id": {"type": "integer", "description": "ID of the hold to cancel"}
+                    },
+                    "required": ["hold_id"]
+                }
+            },
             {
                 "name": "list_books",
                 "description": "List all books in the library with their status",
                 "inputSchema": {"type": "object", "properties": {}}
             },
+            {
+                "name": "find_book",
+                "description": "Find books by approximate title and/or author, tolerating typos and word order (e.g. 'Great Gatsbi', 'Orwell 1984'); returns the best candidates with a match score",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "Title and/or author, possibly misspelled"},
+                        "limit": {"type": "integer", "description": "Maximum number of candidates", "default": 5}
+                    },
+                    "required": ["query"]
+                }
+            },
+            {
+                "name": "recommend_books",
+                "description": "Recommend books borrowed by patrons who also borrowed the given book (\"patrons who borrowed this also borrowed...\")",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "book_id": {"type": "integer", "description": "ID of a copy of the book"},
+                        "limit": {"type": "integer", "description": "Maximum number of recommendations", "default": 5}
+                    },
+                    "required": ["book_id"]
+                }
+            },
             {
                 "name": "list_patrons",
                 "description": "List all patrons registered in the library",
                 "inputSchema": {"type": "object", "properties": {}}
             },
+            {
+                "name": "find_patron",
+                "description": "Find a patron by exact email address or phone number (case, spaces and punctuation are ignored)",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "email": {"type": "string", "description": "Email address"},
+                        "phone": {"type": "string", "description": "Phone number"}
+                    }
+                }
+            },
+            {
+                "name": "search_patrons",
+                "description": "Search patrons by the start of their first or last name, e.g. 'jane' or 'jane sm'",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string", "description": "Name prefix"},
+                        "limit": {"type": "integer", "description": "Maximum number of patrons", "default": 10}
+                    },
+                    "required": ["name"]
+                }
+            },
             {
                 "name": "get_overdue_loans",
                 "description": "Get all overdue loans in the library",
                 "inputSchema": {"type": "object", "properties": {}}
             },
+            {
+                "name": "get_stats",
+                "description": "Get library totals: titles, books, available, on loan, overdue, patrons, active patrons and waiting holds",
+                "inputSchema": {"type": "object", "properties": {}}
+            },
+            {
+                "name": "get_fines",
+                "description": "List the patrons with outstanding overdue fines, largest balance first",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "limit": {"type": "integer", "description": "Maximum number of patrons", "default": 20}
+                    }
+                }
+            },
+            {
+                "name": "get_patron_fines",
+                "description": "Get a patron's outstanding overdue fines and the loans they come from",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "patron_id": {"type": "integer", "description": "ID of the patron"}
+                    },
+                    "required": ["patron_id"]
+                }
+            },
+            {
+                "name": "submit_job",
+                "description": "Start a background job: a circulation report or a bulk book import",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "kind": {"type": "string", "enum": list(JOB_KINDS), "description": "Job kind"},
+                        "params": {
+                            "type": "object",
+                            "description": "Job parameters: top_k for circulation_report, rows ([title, author, isbn] lists) for import_books"
+                        }
+                    },
+                    "required": ["kind"]
+                }
+            },
+            {
+                "name": "get_job_status",
+                "description": "Get the status, progress and result of a background job",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "job_id": {"type": "integer", "description": "ID of the job"}
+                    },
+                    "required": ["job_id"]
+                }
+            },
             {
                 "name": "get_book_info",
                 "description": "Get detailed information about a specific book",
@@ -121,120 +328,395 @@ class LibraryMCPServer:
             }
         ]
     
+    def _add_field_selection(self):
+        """
+        Advertise the optional "fields" argument on tools that support it.
+        Only used in JSON mode, where callers can trim responses to the fields they need.
+        """
+        for tool in self.tools:
+            if tool["name"] in FIELD_SELECTABLE_TOOLS:
+                tool["inputSchema"]["properties"]["fields"] = {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Optional subset of fields to return"
+                }
+    
     def get_tools(self) -> List[Dict[str, Any]]:
         """Get all available tools in MCP format."""
         return self.tools
     
-    def execute_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> str:
+    @staticmethod
+    def _resolve_alias(tool_name: str) -> str:
+        """Map tool name aliases used by some LLMs to the actual tool names."""
+        tool_aliases = {
+            "get_all_books": "list_books",
+            "get_all_patrons": "list_patrons",
+            "get_books": "list_books",
+            "get_patrons": "list_patrons",
+        }
+        return tool_aliases.get(tool_name, tool_name)
+    
+    def _find_patron(self, tool_input: Dict[str, Any]):
+        """Look a patron up by the email or phone given in the tool input."""
+        if tool_input.get("email"):
+            return self.library.find_patron_by_email(tool_input["email"])
+        if tool_input.get("phone"):
+            return self.library.find_patron_by_phone(tool_input["phone"])
+        raise ValueError("Provide an email or a phone number")
+    
+    @staticmethod
+    def _largest_balances(fines: FineEngine, limit: int) -> List[Tuple[int, int]]:
+        """Get the (patron_id, fines) pairs of the patrons owing the most, largest first."""
+        return heapq.nlargest(limit, fines.balances().items(), key=lambda item: (item[1], -item[0]))
+    
+    def execute_tool(self, tool_name: str, tool_input: Dict[str, Any],
+                     output_format: Optional[str] = None) -> str:
         """
         Execute a library tool based on the tool name and input parameters.
         
         Args:
             tool_name: Name of the tool to execute
             tool_input: Dictionary of input parameters
+            output_format: "text" or "json"; defaults to the server's output format
         
         Returns:
             Result of the tool execution as a string
         """
+        return self.call_tool(tool_name, tool_input, output_format)[0]
+    
+    def execute_tool_structured(self, tool_name: str, tool_input: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute a library tool and return its result as structured data.
+        Results are built directly from the model objects; list results use a
+        compact row table ({"fields": [...], "rows": [...]}). Failures are
+        reported as {"error": "..."}.
+        
+        Args:
+            tool_name: Name of the tool to execute
+            tool_input: Dictionary of input parameters, optionally with "fields"
+                        to restrict the returned book/patron fields
+        
+        Returns:
+            Result of the tool execution as a JSON-serializable dict
+        """
+        return self._run(self._resolve_alias(tool_name), tool_input)[0]
+    
+    def call_tool(self, tool_name: str, tool_input: Dict[str, Any],
+                  output_format: Optional[str] = None) -> Tuple[str, Dict[str, Any], bool]:
+        """
+        Execute a library tool and return every form of its result.
+        
+        Args:
+            tool_name: Name of the tool to execute
+            tool_input: Dictionary of input parameters
+            output_format: "text" or "json"; defaults to the server's output format
+        
+        Returns:
+            (output, data, is_error): the output string in the requested format,
+            the structured result, and whether the tool failed.
+        """
+        tool = self._resolve_alias(tool_name)
+        if (output_format or self.output_format) == "json":
+            data, is_error = self._run(tool, tool_input)
+            return serializers.dumps(data), data, is_error
+        # Text rows are rendered from every field, whatever fields were asked for
+        data, is_error = self._run(tool, {k: v for k, v in tool_input.items() if k != "fields"})
+        if is_error:
+            return data["error"], data, True
+        render = getattr(self, f"_text_{tool}", None)
+        return (render(data, tool_input) if render else serializers.dumps(data)), data, False
+    
+    def _run(self, tool: str, tool_input: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run a tool through the dispatcher.
+        Returns the structured result and whether the tool failed, in which
+        case the result is {"error": "..."}.
+        """
         try:
-            # Handle tool name aliases
-            tool_aliases = {
-                "get_all_books": "list_books",
-                "get_all_patrons": "list_patrons",
-                "get_books": "list_books",
-                "get_patrons": "list_patrons",
+            return self._dispatch(tool, tool_input), False
+        except ToolError as e:
+            return {"error": str(e)}, True
+        except Exception as e:
+            return {"error": f"Error executing {tool}: {str(e)}"}, True
+    
+    def _dispatch(self, tool: str, tool_input: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute a tool (aliases already resolved) and build its structured result.
+        This is the only place tools are implemented; text output is rendered
+        from the result by the matching _text_<tool> method.
+        Raises ToolError when the tool cannot complete.
+        """
+        fields = tool_input.get("fields")
+        
+        if tool == "add_book":
+            new_book = self.library.add_book(
+                tool_input["title"],
+                tool_input["author"],
+                tool_input["isbn"]
+            )
+            copies = tool_input.get("copies", 1)
+            if copies > 1:
+                self.library.add_copies(new_book.title_id, copies - 1)
+            return {"book": serializers.to_dict(new_book, BOOK_FIELDS), "copies": max(copies, 1)}
+        
+        elif tool == "add_patron":
+            new_patron = self.library.add_patron(
+                tool_input["name"],
+                tool_input["email"],
+                tool_input["phone"]
+            )
+            return {"patron": serializers.to_dict(new_patron, PATRON_FIELDS)}
+        
+        elif tool == "borrow_book":
+            loan = self.library.borrow_book(
+                tool_input["book_id"],
+                tool_input["patron_id"],
+                tool_input.get("days", 14)
+            )
+            if not loan:
+                raise ToolError("Failed to borrow book. Check if book/patron exists and book is available.")
+            return {"loan": serializers.to_dict(loan, serializers.LOAN_FIELDS)}
+        
+        elif tool == "return_book":
+            if not self.library.return_book(tool_input["book_id"]):
+                raise ToolError("Failed to return book. Check if book exists and is borrowed.")
+            return {"returned": tool_input["book_id"]}
+        
+        elif tool == "place_hold":
+            hold = self.library.place_hold(
+                tool_input["book_id"],
+                tool_input["patron_id"],
+                tool_input.get("days", 14)
+            )
+            if not hold:
+                raise ToolError("Failed to place hold. Check if book/patron exists, the book is borrowed, "
+                                "and the patron is not already waiting.")
+            position = len(self.library.get_hold_queue(hold.book_id))
+            return {"hold": serializers.to_dict(hold, serializers.HOLD_FIELDS), "position": position}
+        
+        elif tool == "cancel_hold":
+            if not self.library.cancel_hold(tool_input["hold_id"]):
+                raise ToolError("Failed to cancel hold. Check if the hold exists and is still waiting.")
+            return {"cancelled": tool_input["hold_id"]}
+        
+        elif tool == "list_books":
+            with read_view(self.library) as view:
+                return serializers.to_table(view.books, serializers.select_fields(BOOK_FIELDS, fields))
+        
+        elif tool == "find_book":
+            matches = self.library.find_books(tool_input["query"], tool_input.get("limit", 5))
+            table = serializers.to_table(
+                [book for book, _ in matches], serializers.select_fields(BOOK_FIELDS, fields)
+            )
+            return {
+                "fields": table["fields"] + ["score"],
+                "rows": [list(row) + [score] for row, (_, score) in zip(table["rows"], matches)],
             }
-            
-            # Map aliases to actual tool names
-            actual_tool_name = tool_aliases.get(tool_name, tool_name)
-            
-            if actual_tool_name == "add_book":
-                book = self.library.add_book(
-                    tool_input["title"],
-                    tool_input["author"],
-                    tool_input["isbn"]
-                )
-                return f"Book added successfully! ID: {book.id}, Title: {book.title}"
-            
-            elif actual_tool_name == "add_patron":
-                patron = self.library.add_patron(
-                    tool_input["name"],
-                    tool_input["email"],
-                    tool_input["phone"]
-                )
-                return f"Patron added successfully! ID: {patron.id}, Name: {patron.name}"
-            
-            elif actual_tool_name == "borrow_book":
-                days = tool_input.get("days", 14)
-                loan = self.library.borrow_book(
-                    tool_input["book_id"],
-                    tool_input["patron_id"],
-                    days
-                )
-                if loan:
-                    return f"Book borrowed successfully! Due date: {loan.due_date.strftime('%Y-%m-%d')}"
-                return "Failed to borrow book. Check if book/patron exists and book is available."
-            
-            elif actual_tool_name == "return_book":
-                success = self.library.return_book(tool_input["book_id"])
-                if success:
-                    return "Book returned successfully!"
-                return "Failed to return book. Check if book exists and is borrowed."
-            
-            elif actual_tool_name == "list_books":
-                if not self.library.books:
-                    return "No books in the library"
-                book_list = []
-                for book in self.library.books:
-                    status = "Available" if book.available else f"Borrowed by Patron #{book.borrowed_by}"
-                    book_list.append(
-                        f"ID: {book.id} | {book.title} by {book.author} | ISBN: {book.isbn} | {status}"
-                    )
-                return "\n".join(book_list)
-            
-            elif actual_tool_name == "list_patrons":
-                if not self.library.patrons:
-                    return "No patrons registered"
-                patron_list = []
-                for patron in self.library.patrons:
-                    patron_list.append(
-                        f"ID: {patron.id} | {patron.name} | Email: {patron.email} | Phone: {patron.phone}"
-                    )
-                return "\n".join(patron_list)
-            
-            elif actual_tool_name == "get_overdue_loans":
-                overdue = self.library.get_overdue_loans()
-                if not overdue:
-                    return "No overdue books"
-                overdue_list = []
-                for loan in overdue:
-                    book = next(b for b in self.library.books if b.id == loan.book_id)
-                    patron = next(p for p in self.library.patrons if p.id == loan.patron_id)
-                    overdue_list.append(
-                        f"Book: {book.title} (ID: {book.id}) | "
-                        f"Patron: {patron.name} (ID: {patron.id}) | "
-                        f"Due date: {loan.due_date.strftime('%Y-%m-%d')}"
-                    )
-                return "\n".join(overdue_list)
-            
-            elif actual_tool_name == "get_book_info":
-                book = next((b for b in self.library.books if b.id == tool_input["book_id"]), None)
-                if not book:
-                    return f"Book with ID {tool_input['book_id']} not found"
-                status = "Available" if book.available else f"Borrowed by Patron #{book.borrowed_by}"
-                return f"ID: {book.id} | Title: {book.title} | Author: {book.author} | ISBN: {book.isbn} | Status: {status}"
-            
-            elif actual_tool_name == "get_patron_info":
-                patron = next((p for p in self.library.patrons if p.id == tool_input["patron_id"]), None)
-                if not patron:
-                    return f"Patron with ID {tool_input['patron_id']} not found"
-                loans = self.library.get_patron_loans(tool_input["patron_id"])
-                active_loans = len([l for l in loans if l.return_date is None])
-                return f"ID: {patron.id} | Name: {patron.name} | Email: {patron.email} | Phone: {patron.phone} | Active Loans: {active_loans}"
-            
-            else:
-                return f"Unknown tool: {actual_tool_name}"
         
-        except Exception as e:
-            return f"Error executing {actual_tool_name}: {str(e)}"
-
+        elif tool == "recommend_books":
+            recommendations = self.recommendations
+            if recommendations is None:
+                raise ToolError(RECOMMENDATIONS_UNAVAILABLE)
+            book = self.library.get_book(tool_input["book_id"])
+            if not book:
+                raise ToolError(f"Book with ID {tool_input['book_id']} not found")
+            recommended = recommendations.recommend(book.id, tool_input.get("limit", 5))
+            table = serializers.to_table([b for b, _ in recommended], BOOK_FIELDS)
+            return {
+                "fields": table["fields"] + ["patrons"],
+                "rows": [list(row) + [count] for row, (_, count) in zip(table["rows"], recommended)],
+            }
+        
+        elif tool == "list_patrons":
+            with read_view(self.library) as view:
+                return serializers.to_table(view.patrons, serializers.select_fields(PATRON_FIELDS, fields))
+        
+        elif tool == "find_patron":
+            found = self._find_patron(tool_input)
+            if not found:
+                raise ToolError("No patron found with that email or phone")
+            return serializers.to_dict(found, serializers.select_fields(PATRON_FIELDS, fields))
+        
+        elif tool == "search_patrons":
+            return serializers.to_table(
+                self.library.find_patrons_by_name(tool_input["name"], tool_input.get("limit", 10)),
+                serializers.select_fields(PATRON_FIELDS, fields)
+            )
+        
+        elif tool == "get_overdue_loans":
+            return {
+                "fields": ["book_id", "title", "patron_id", "name", "due_date"],
+                "rows": [
+                    [b.id, b.title, p.id, p.name, loan.due_date.strftime('%Y-%m-%d')]
+                    for loan, b, p in overdue_details(self.library)
+                ],
+            }
+        
+        elif tool == "get_stats":
+            return self.library.get_stats()
+        
+        elif tool == "get_fines":
+            fines = self.fines
+            if fines is None:
+                raise ToolError(FINES_UNAVAILABLE)
+            rows = []
+            for patron_id, amount in self._largest_balances(fines, tool_input.get("limit", 20)):
+                owner = self.library.get_patron(patron_id)
+                rows.append([patron_id, owner.name if owner else None, amount])
+            return {"fields": ["patron_id", "name", "fine_cents"], "rows": rows}
+        
+        elif tool == "get_patron_fines":
+            fines = self.fines
+            if fines is None:
+                raise ToolError(FINES_UNAVAILABLE)
+            patron = self.library.get_patron(tool_input["patron_id"])
+            if not patron:
+                raise ToolError(f"Patron with ID {tool_input['patron_id']} not found")
+            return {
+                "patron_id": patron.id,
+                "name": patron.name,
+                "balance_cents": fines.patron_balance(patron.id),
+                "loans": {"fields": ["loan_id", "fine_cents"],
+                          "rows": [list(pair) for pair in fines.patron_fines(patron.id)]},
+            }
+        
+        elif tool == "submit_job":
+            job = self.jobs.submit(tool_input["kind"], tool_input.get("params"))
+            return {"job": serializers.to_dict(job, serializers.JOB_FIELDS)}
+        
+        elif tool == "get_job_status":
+            status = self.jobs.get_job(tool_input["job_id"])
+            if not status:
+                raise ToolError(f"Job with ID {tool_input['job_id']} not found")
+            result = serializers.to_dict(status, serializers.JOB_FIELDS)
+            if status.status == "done":
+                result["result"] = serializers.to_plain(status.result)
+            return result
+        
+        elif tool == "get_book_info":
+            book = self.library.get_book(tool_input["book_id"])
+            if not book:
+                raise ToolError(f"Book with ID {tool_input['book_id']} not found")
+            result = serializers.to_dict(book, serializers.select_fields(BOOK_FIELDS, fields))
+            title = self.library.get_title(book.title_id)
+            if title is not None:
+                result["copies_available"] = title.available_copies
+                result["copies_total"] = title.total_copies
+            return result
+        
+        elif tool == "get_patron_info":
+            patron = self.library.get_patron(tool_input["patron_id"])
+            if not patron:
+                raise ToolError(f"Patron with ID {tool_input['patron_id']} not found")
+            result = serializers.to_dict(patron, serializers.select_fields(PATRON_FIELDS, fields))
+            loans = self.library.get_patron_loans(tool_input["patron_id"])
+            result["active_loans"] = len([l for l in loans if l.return_date is None])
+            return result
+        
+        raise ToolError(f"Unknown tool: {tool}")
+    
+    # Text renderings of the structured results, one per tool; data never holds an error
+    
+    def _text_add_book(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        book = data["book"]
+        if data["copies"] > 1:
+            return f"Book added successfully! ID: {book['id']}, Title: {book['title']}, Copies: {data['copies']}"
+        return f"Book added successfully! ID: {book['id']}, Title: {book['title']}"
+    
+    def _text_add_patron(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        return f"Patron added successfully! ID: {data['patron']['id']}, Name: {data['patron']['name']}"
+    
+    def _text_borrow_book(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        return f"Book borrowed successfully! Due date: {data['loan']['due_date']}"
+    
+    def _text_return_book(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        return "Book returned successfully!"
+    
+    def _text_place_hold(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        return f"Hold placed! Hold ID: {data['hold']['id']}, position in line: {data['position']}"
+    
+    def _text_cancel_hold(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        return "Hold cancelled successfully!"
+    
+    def _text_list_books(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        if not data["rows"]:
+            return "No books in the library"
+        return "\n".join(map(self.rows.book_fields_row, data["rows"]))
+    
+    def _text_find_book(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        if not data["rows"]:
+            return f"No books matching '{tool_input['query']}'"
+        return "\n".join(f"{self.rows.book_fields_row(row[:-1])} | Match: {row[-1]:.2f}" for row in data["rows"])
+    
+    def _text_recommend_books(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        if not data["rows"]:
+            book = self.library.get_book(tool_input["book_id"])
+            return f"No recommendations yet for '{book.title if book else tool_input['book_id']}'"
+        return "\n".join(
+            f"{self.rows.book_fields_row(row[:-1])} | Also borrowed by {row[-1]} patron{'s' if row[-1] != 1 else ''}"
+            for row in data["rows"]
+        )
+    
+    def _text_list_patrons(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        if not data["rows"]:
+            return "No patrons registered"
+        return "\n".join(map(self.rows.patron_fields_row, data["rows"]))
+    
+    def _text_find_patron(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        return self.rows.patron_fields_row([data[f] for f in PATRON_FIELDS])
+    
+    def _text_search_patrons(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        if not data["rows"]:
+            return f"No patrons matching '{tool_input['name']}'"
+        return "\n".join(map(self.rows.patron_fields_row, data["rows"]))
+    
+    def _text_get_overdue_loans(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        if not data["rows"]:
+            return "No overdue books"
+        return "\n".join(
+            f"Book: {title} (ID: {book_id}) | Patron: {name} (ID: {patron_id}) | Due date: {due_date}"
+            for book_id, title, patron_id, name, due_date in data["rows"]
+        )
+    
+    def _text_get_stats(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        return " | ".join(f"{name.replace('_', ' ').title()}: {value}" for name, value in data.items())
+    
+    def _text_get_fines(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        if not data["rows"]:
+            return "No outstanding fines"
+        return "\n".join(
+            f"Patron #{patron_id} {name or ''} | Fines: {format_amount(amount)}"
+            for patron_id, name, amount in data["rows"]
+        )
+    
+    def _text_get_patron_fines(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        lines = [f"ID: {data['patron_id']} | Name: {data['name']} | "
+                 f"Outstanding Fines: {format_amount(data['balance_cents'])}"]
+        for loan_id, amount in data["loans"]["rows"]:
+            lines.append(f"Loan #{loan_id} | Fine: {format_amount(amount)}")
+        return "\n".join(lines)
+    
+    def _text_submit_job(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        job = data["job"]
+        return f"Job submitted! Job ID: {job['id']}, Kind: {job['kind']}, Status: {job['status']}"
+    
+    def _text_get_job_status(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        info = (f"ID: {data['id']} | Kind: {data['kind']} | Status: {data['status']} | "
+                f"Progress: {data['completed_steps']}/{data['total_steps']}")
+        if data.get("error"):
+            info += f" | Error: {data['error']}"
+        elif "result" in data:
+            info += f" | Result: {serializers.dumps(data['result'])}"
+        return info
+    
+    def _text_get_book_info(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        status = "Available" if data["available"] else f"Borrowed by Patron #{data.get('borrowed_by')}"
+        info = (f"ID: {data['id']} | Title: {data['title']} | Author: {data['author']} | "
+                f"ISBN: {data['isbn']} | Status: {status}")
+        if data.get("copies_total", 0) > 1:
+            info += f" | Copies available: {data['copies_available']}/{data['copies_total']}"
+        return info
+    
+    def _text_get_patron_info(self, data: Dict[str, Any], tool_input: Dict[str, Any]) -> str:
+        return (f"ID: {data['id']} | Name: {data['name']} | Email: {data['email']} | "
+                f"Phone: {data['phone']} | Active Loans: {data['active_loans']}")
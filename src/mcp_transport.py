@@ -0,0 +1,248 @@
+"""
+mcp_transport.py
+----------------
+Standalone Model Context Protocol (MCP) server for the Library Management System.
+Speaks JSON-RPC 2.0 over stdio (newline-delimited messages) and over streamable
+HTTP (POST /mcp), dispatching tool calls to a LibraryMCPServer that wraps one
+shared LibrarySystem. Runs independently of the Gradio UI:
+
+    python -m src.mcp_transport --transport stdio
+    python -m src.mcp_transport --transport http --port 8765
+"""
+
+import argparse
+import json
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+from .http_pool import JSONRequestHandler, PooledHTTPServer
+from .library import LibrarySystem
+from .mcp_server import LibraryMCPServer
+from .profiling import configure_from_env
+from . import serializers
+
+PROTOCOL_VERSION = "2025-03-26"
+# Versions a client may request in initialize; any other is answered with PROTOCOL_VERSION
+SUPPORTED_PROTOCOL_VERSIONS = (PROTOCOL_VERSION, "2024-11-05")
+SERVER_INFO = {"name": "librarian", "version": "1.0.0"}
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+def _error(msg_id: Any, code: int, message: str) -> Dict[str, Any]:
+    """Build a JSON-RPC error response."""
+    return {"jsonrpc": "2.0", "id": msg_id, "error": {"code": code, "message": message}}
+
+
+class MCPProtocolHandler:
+    """
+    Transport-independent MCP message handler.
+    Implements initialize, ping, tools/list and tools/call on top of a LibraryMCPServer.
+    Safe to call from several threads at once.
+    """
+
+    def __init__(self, mcp_server: LibraryMCPServer):
+        """
+        Initialize the handler.
+
+        Args:
+            mcp_server: The LibraryMCPServer whose tools are exposed.
+        """
+        self.mcp_server = mcp_server
+
+    def handle_message(self, message: Any) -> Optional[Any]:
+        """
+        Handle one decoded JSON-RPC message or batch.
+        Returns the response (a dict, or a list for batches), or None when the
+        message only contained notifications.
+        """
+        if isinstance(message, list):
+            if not message:
+                return _error(None, INVALID_REQUEST, "Empty batch")
+            responses = [r for r in (self._handle_single(m) for m in message) if r is not None]
+            return responses or None
+        return self._handle_single(message)
+
+    def handle_line(self, line: str) -> Optional[str]:
+        """
+        Handle one raw JSON-RPC message.
+        Returns the encoded response, or None when there is nothing to send.
+        """
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return serializers.dumps(_error(None, PARSE_ERROR, "Parse error"))
+        response = self.handle_message(message)
+        return None if response is None else serializers.dumps(response)
+
+    def _handle_single(self, message: Any) -> Optional[Dict[str, Any]]:
+        """Dispatch a single JSON-RPC request or notification."""
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" or "method" not in message:
+            return _error(message.get("id") if isinstance(message, dict) else None,
+                          INVALID_REQUEST, "Invalid request")
+        is_notification = "id" not in message
+        msg_id = message.get("id")
+        method = message["method"]
+        params = message.get("params")
+        if params is None:
+            params = {}
+        elif not isinstance(params, dict):
+            return None if is_notification else _error(msg_id, INVALID_PARAMS, "Invalid params: expected an object")
+
+        if method == "initialize":
+            requested = params.get("protocolVersion")
+            result: Dict[str, Any] = {
+                "protocolVersion": requested if requested in SUPPORTED_PROTOCOL_VERSIONS else PROTOCOL_VERSION,
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": SERVER_INFO,
+            }
+        elif method == "ping":
+            result = {}
+        elif method == "tools/list":
+            result = {"tools": self.mcp_server.get_tools()}
+        elif method == "tools/call":
+            if not isinstance(params.get("name"), str):
+                return None if is_notification else _error(msg_id, INVALID_PARAMS, "Missing tool name")
+            if not isinstance(params.get("arguments") or {}, dict):
+                return None if is_notification else _error(msg_id, INVALID_PARAMS, "Invalid tool arguments")
+            result = self.call_tool(params["name"], params.get("arguments") or {})
+        elif method.startswith("notifications/"):
+            return None
+        else:
+            return None if is_notification else _error(msg_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+
+        if is_notification:
+            return None
+        return {"jsonrpc": "2.0", "id": msg_id, "result": result}
+
+    def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute a tool and wrap its output as an MCP tool result.
+        In JSON mode the structured result is also returned as structuredContent.
+        """
+        text, data, is_error = self.mcp_server.call_tool(name, arguments)
+        result: Dict[str, Any] = {"content": [{"type": "text", "text": text}]}
+        if self.mcp_server.output_format == "json":
+            result["structuredContent"] = data
+        result["isError"] = is_error
+        return result
+
+
+def serve_stdio(handler: MCPProtocolHandler, stdin: TextIO = sys.stdin,
+                stdout: TextIO = sys.stdout, workers: int = 4):
+    """
+    Serve MCP over stdio until stdin is closed.
+    Requests are processed concurrently by a worker pool; responses are written
+    as they complete, one JSON message per line.
+    """
+    write_lock = threading.Lock()
+
+    def process(line: str):
+        response = handler.handle_line(line)
+        if response is not None:
+            with write_lock:
+                stdout.write(response + "\n")
+                stdout.flush()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-stdio") as pool:
+        for line in stdin:
+            if line.strip():
+                pool.submit(process, line)
+
+
+class MCPHTTPRequestHandler(JSONRequestHandler):
+    """
+    Streamable HTTP transport: JSON-RPC messages are POSTed to /mcp and answered
+    with a single JSON response. Server-initiated SSE streams are not offered.
+    """
+    endpoint = "/mcp"
+    server: "MCPHTTPServer"
+
+    def do_POST(self):
+        if self.path.split("?")[0] != self.endpoint:
+            self.send_empty(404)
+            return
+        try:
+            message = self.read_json()
+        except ValueError:
+            self.send_json(400, _error(None, PARSE_ERROR, "Parse error"))
+            return
+        response = self.server.mcp_handler.handle_message(message)
+        if response is None:
+            self.send_empty(202)
+            return
+        headers = {}
+        if isinstance(message, dict) and message.get("method") == "initialize":
+            headers["Mcp-Session-Id"] = uuid.uuid4().hex
+        self.send_json(200, response, headers)
+
+    def do_GET(self):
+        self.send_empty(405 if self.path.split("?")[0] == self.endpoint else 404)
+
+    def do_DELETE(self):
+        self.send_empty(204 if self.path.split("?")[0] == self.endpoint else 404)
+
+
+class MCPHTTPServer(PooledHTTPServer):
+    """PooledHTTPServer answering MCP requests with one MCPProtocolHandler."""
+
+    def __init__(self, server_address: Tuple[str, int], mcp_handler: MCPProtocolHandler, max_workers: int = 8):
+        """
+        Initialize the server.
+
+        Args:
+            server_address: (host, port) to bind; port 0 picks a free port.
+            mcp_handler: The handler answering every JSON-RPC message.
+            max_workers: Number of worker threads handling requests.
+        """
+        super().__init__(server_address, MCPHTTPRequestHandler, max_workers=max_workers)
+        self.mcp_handler = mcp_handler
+
+
+def create_http_server(handler: MCPProtocolHandler, host: str = "127.0.0.1",
+                       port: int = 8765, workers: int = 8) -> MCPHTTPServer:
+    """
+    Create (but do not start) the streamable HTTP MCP server.
+    Call serve_forever() on the result to start handling requests.
+    """
+    return MCPHTTPServer((host, port), handler, max_workers=workers)
+
+
+def main(argv=None):
+    """
+    Run the MCP server over the selected transport with one shared LibrarySystem.
+    """
+    parser = argparse.ArgumentParser(description="Library MCP server")
+    parser.add_argument("--transport", choices=("stdio", "http"), default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--output-format", choices=("text", "json"), default="text")
+    args = parser.parse_args(argv)
+
+    configure_from_env()
+    library = LibrarySystem()
+    handler = MCPProtocolHandler(LibraryMCPServer(library, output_format=args.output_format))
+
+    if args.transport == "stdio":
+        serve_stdio(handler, workers=args.workers)
+        return
+    server = create_http_server(handler, args.host, args.port, args.workers)
+    print(f"MCP server listening on http://{args.host}:{server.server_port}/mcp", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 """
 models.py
 ---------
-Defines the core data models for the Library Management System: Book, Patron, and Loan.
+Defines the core data models for the Library Management System: Title, Book, Patron, Loan and Hold.
 Uses Python dataclasses for simplicity and type safety.
 """
 
@@ -11,15 +11,36 @@ from datetime import datetime
 from typing import Optional
 
 
+@dataclass
+class Title:
+    """
+    Represents a title (one ISBN) that the library holds one or more copies of.
+    Attributes:
+        id: Unique identifier for the title.
+        title: Title of the book.
+        author: Author of the book.
+        isbn: ISBN number shared by all copies.
+        total_copies: Number of copies owned.
+        available_copies: Number of copies currently available for borrowing.
+    """
+    id: int
+    title: str
+    author: str
+    isbn: str
+    total_copies: int = 0
+    available_copies: int = 0
+
+
 @dataclass
 class Book:
     """
-    Represents a book in the library.
+    Represents a physical copy of a book in the library.
     Attributes:
         id: Unique identifier for the book.
         title: Title of the book.
         author: Author of the book.
         isbn: ISBN number.
+        title_id: ID of the Title this book is a copy of.
         available: Whether the book is available for borrowing.
         borrowed_by: Patron ID who borrowed the book, if any.
     """
@@ -27,6 +48,7 @@ class Book:
     title: str
     author: str
     isbn: str
+    title_id: int
     available: bool = True
     borrowed_by: Optional[int] = None
 
@@ -64,4 +86,27 @@ class Loan:
     patron_id: int
     loan_date: datetime
     due_date: datetime
-    return_date: Optional[datetime] = None
\ No newline at end of file
+    return_date: Optional[datetime] = None
+
+
+@dataclass
+class Hold:
+    """
+    Represents a patron's place in the waiting list for a borrowed title.
+    Attributes:
+        id: Unique identifier for the hold.
+        book_id: ID of the book the hold was placed on; any copy of its title
+                 fulfills the hold.
+        patron_id: ID of the waiting patron.
+        placed_date: Date when the hold was placed.
+        days: Loan length in days used when the book is handed off.
+        loan_id: ID of the loan created when the hold was fulfilled (None while waiting).
+        cancelled: Whether the patron cancelled the hold.
+    """
+    id: int
+    book_id: int
+    patron_id: int
+    placed_date: datetime
+    days: int = 14
+    loan_id: Optional[int] = None
+    cancelled: bool = False
@@ -0,0 +1,182 @@
+"""
+overdue.py
+----------
+Background overdue scanner for the Library Management System.
+Keeps active loans in a min-heap ordered by due date and sleeps until exactly
+the next due time, then emits the newly overdue loans to a pluggable sink.
+Each loan is examined once when it becomes due and is never rescanned.
+"""
+
+import heapq
+import json
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from .library import LibrarySystem
+from .models import Loan
+from .serializers import to_wire
+
+logger = logging.getLogger(__name__)
+
+
+class LogSink:
+    """
+    Sink that logs each newly overdue loan.
+    """
+    def __init__(self, log: Optional[logging.Logger] = None):
+        self.log = log or logger
+
+    def emit(self, loans: List[Loan]):
+        for loan in loans:
+            self.log.warning(
+                "Loan %s overdue: book %s, patron %s, due %s",
+                loan.id, loan.book_id, loan.patron_id, loan.due_date.strftime('%Y-%m-%d %H:%M')
+            )
+
+
+class QueueSink:
+    """
+    Sink that puts each newly overdue loan on a queue for another consumer.
+    """
+    def __init__(self, target: Optional["queue.Queue[Loan]"] = None):
+        self.queue: "queue.Queue[Loan]" = target if target is not None else queue.Queue()
+
+    def emit(self, loans: List[Loan]):
+        for loan in loans:
+            self.queue.put(loan)
+
+
+class WebhookSink:
+    """
+    Webhook stand-in: encodes each batch as a JSON payload and hands it to a
+    post callable (e.g. a function doing an HTTP POST to url). Without a post
+    callable, payloads are kept in the sent list.
+    """
+    def __init__(self, url: str, post: Optional[Callable[[str, str], Any]] = None):
+        self.url = url
+        self.post = post
+        self.sent: List[str] = []
+
+    def emit(self, loans: List[Loan]):
+        payload = json.dumps({"event": "loans_overdue", "loans": [to_wire(l) for l in loans]})
+        if self.post is None:
+            self.sent.append(payload)
+        else:
+            self.post(self.url, payload)
+
+
+class OverdueScanner:
+    """
+    Background thread that reports loans as they become overdue.
+    New loans are picked up through the library's listener hook, so the scanner
+    never polls the full loan list after start-up.
+    """
+
+    def __init__(self, library: LibrarySystem, sink, clock: Optional[Callable[[], datetime]] = None,
+                 max_sleep: float = 300.0):
+        """
+        Initialize the scanner.
+
+        Args:
+            library: The LibrarySystem to watch.
+            sink: Object with an emit(loans) method receiving newly overdue loans.
+            clock: Function returning the current time; the library's clock by default.
+            max_sleep: Upper bound in seconds on a single wait, which guards
+                       against wall-clock adjustments.
+        """
+        self.library = library
+        self.sink = sink
+        self.clock: Callable[[], datetime] = clock if clock is not None else getattr(library, "clock", datetime.now)
+        self.max_sleep = max_sleep
+        self._heap: List[Tuple[datetime, int, Loan]] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self):
+        """
+        Seed the heap with the currently active loans and start the scanner thread.
+        """
+        with self.library._lock:
+            self.library.add_listener(self._on_event)
+            active = [l for l in self.library.loans if l.return_date is None]
+        with self._cond:
+            for loan in active:
+                heapq.heappush(self._heap, (loan.due_date, loan.id, loan))
+            self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="overdue-scanner", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the scanner thread and detach from the library.
+        """
+        self.library.remove_listener(self._on_event)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _on_event(self, event: str, record: Any):
+        """
+        Library listener: schedule new loans, waking the thread if the new loan
+        is due before everything already scheduled.
+        """
+        if event != "book_borrowed":
+            return
+        with self._cond:
+            entry = (record.due_date, record.id, record)
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self._cond.notify()
+
+    def collect_due(self) -> List[Loan]:
+        """
+        Pop every scheduled loan whose due date has passed.
+        Returns those still unreturned; returned loans are simply dropped.
+        """
+        now = self.clock()
+        due = []
+        with self._cond:
+            while self._heap and self._heap[0][0] < now:
+                loan = heapq.heappop(self._heap)[2]
+                if loan.return_date is None:
+                    due.append(loan)
+        return due
+
+    def _run(self):
+        """
+        Scanner loop: emit newly overdue loans, then sleep until the next due date.
+        """
+        while True:
+            overdue = self.collect_due()
+            if overdue:
+                try:
+                    self.sink.emit(overdue)
+                except Exception:
+                    logger.exception("Overdue sink failed")
+            with self._cond:
+                if self._stopped:
+                    return
+                if self._heap:
+                    wait = (self._heap[0][0] - self.clock()).total_seconds()
+                    if wait < 0:
+                        continue
+                    timeout = min(wait, self.max_sleep)
+                else:
+                    timeout = self.max_sleep
+                if self._sleep(timeout):
+                    return
+
+    def _sleep(self, timeout: float) -> bool:
+        """
+        Wait for a notification or the timeout (called with the lock held).
+        Returns whether the scanner was stopped meanwhile.
+        """
+        self._cond.wait(timeout)
+        return self._stopped
@@ -0,0 +1,337 @@
+"""
+profiling.py
+------------
+Opt-in profiling for the library, MCP and chat hot paths.
+Two independent tools, both off by default and free when off:
+
+- Method stats: wraps the methods of LibrarySystem, LibraryMCPServer and
+  LibraryInterface (and each execute_tool branch) to count calls and measure
+  cumulative and own time. The wrappers are only installed while enabled.
+- Sampling profiler: a background thread snapshots every thread's stack at a
+  fixed interval.
+
+Both can be dumped as pstats files (load with pstats.Stats) and the samples as
+collapsed stacks (flamegraph.pl / speedscope input). Enable them with the
+LIBRARY_PROFILE environment variable ("stats", "sampling" or "stats,sampling";
+dumps go to LIBRARY_PROFILE_DIR at exit) or at runtime through the API
+service's /admin/profile endpoints.
+"""
+
+import atexit
+import functools
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Methods whose first argument names the tool, so each branch is counted separately
+BRANCH_ARG_METHODS = frozenset(("execute_tool", "execute_tool_structured", "call_tool"))
+PROFILE_MODES = ("stats", "sampling")
+
+# pstats key of a function: (filename, first line, name)
+FuncKey = Tuple[str, int, str]
+# pstats entry of a function: (primitive calls, calls, own time, cumulative time, callers)
+FuncStats = Tuple[int, int, float, float, Dict[FuncKey, int]]
+
+
+def _write_pstats(path: str, stats: Dict[FuncKey, FuncStats]):
+    """Write a stats dict in the marshal format read by pstats.Stats."""
+    with open(path, "wb") as f:
+        marshal.dump(stats, f)
+
+
+class MethodStats:
+    """
+    Per-method call counts with cumulative and own time.
+    install() swaps the profiled classes' methods for timing wrappers and
+    uninstall() puts the originals back.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.installed = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # name -> [calls, cumulative time, own time, pstats key]
+        self._stats: Dict[str, List[Any]] = {}
+        self._patched: List[Tuple[type, str, Any]] = []
+
+    def record(self, name: str, key: FuncKey, elapsed: float, own: float):
+        """Add one finished call."""
+        with self._lock:
+            entry = self._stats.get(name)
+            if entry is None:
+                self._stats[name] = [1, elapsed, own, key]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += own
+
+    def wrap(self, name: str, func: Callable[..., Any], branch_arg: bool = False) -> Callable[..., Any]:
+        """Wrap a function so each call is timed under name (and name[branch])."""
+        code = getattr(func, "__code__", None)
+        key = (code.co_filename, code.co_firstlineno, name) if code else ("~", 0, name)
+        clock = self.clock
+        local = self._local
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            # Time spent in profiled callees is subtracted from this call's own time
+            stack = local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.record(name, key, elapsed, elapsed - children)
+                if branch_arg and len(args) > 1:
+                    self.record(f"{name}[{args[1]}]", key, elapsed, elapsed - children)
+
+        setattr(timed, "__wrapped_by_profiler__", True)
+        return timed
+
+    def install(self, targets: List[type]):
+        """Wrap every method defined on the target classes."""
+        with self._lock:
+            if self.installed:
+                return
+            for cls in targets:
+                for attr, value in list(vars(cls).items()):
+                    if attr.startswith("__") or not callable(value) or isinstance(value, type):
+                        continue
+                    if isinstance(value, (staticmethod, classmethod)):
+                        continue
+                    name = f"{cls.__name__}.{attr}"
+                    setattr(cls, attr, self.wrap(name, value, attr in BRANCH_ARG_METHODS))
+                    self._patched.append((cls, attr, value))
+            self.installed = True
+
+    def uninstall(self):
+        """Restore the original methods."""
+        with self._lock:
+            for cls, attr, value in reversed(self._patched):
+                setattr(cls, attr, value)
+            self._patched.clear()
+            self.installed = False
+
+    def reset(self):
+        """Forget the collected stats."""
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get the collected stats, most cumulative time first.
+        Returns dicts with name, calls, cumulative_ms and own_ms.
+        """
+        with self._lock:
+            rows = [
+                {"name": name, "calls": calls, "cumulative_ms": round(total * 1000, 3), "own_ms": round(own * 1000, 3)}
+                for name, (calls, total, own, _) in self._stats.items()
+            ]
+        rows.sort(key=lambda row: -row["cumulative_ms"])
+        return rows[:limit] if limit else rows
+
+    def dump_pstats(self, path: str):
+        """Write the stats as a pstats file."""
+        with self._lock:
+            stats: Dict[FuncKey, FuncStats] = {
+                (key[0], key[1], name): (calls, calls, own, total, {})
+                for name, (calls, total, own, key) in self._stats.items()
+            }
+        _write_pstats(path, stats)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: samples the stack of every other thread each interval.
+    Costs nothing until started; while running, the cost is one stack walk per
+    thread per interval, independent of how hot the code is.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter[Tuple[FuncKey, ...]] = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: Optional[float] = None):
+        """Start sampling in a background thread."""
+        if self._thread is not None:
+            return
+        if interval:
+            self.interval = interval
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling; the samples are kept until reset()."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def reset(self):
+        """Forget the collected samples."""
+        self.samples.clear()
+
+    def _run(self):
+        """Sampling loop."""
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, top in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack: List[FuncKey] = []
+                frame: Optional[FrameType] = top
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                self.samples[tuple(reversed(stack))] += 1
+
+    def collapsed(self) -> List[str]:
+        """Get the samples as collapsed stack lines ("root;caller;leaf count")."""
+        lines = []
+        for stack, count in self.samples.most_common():
+            frames = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for filename, line, name in stack)
+            lines.append(f"{frames} {count}")
+        return lines
+
+    def dump_collapsed(self, path: str):
+        """Write the collapsed stacks, one per line."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+
+    def dump_pstats(self, path: str):
+        """
+        Write the samples as a pstats file: call counts are sample counts and
+        times are samples times the interval.
+        """
+        stats: Dict[FuncKey, List[Any]] = {}
+        for stack, count in self.samples.items():
+            seconds = count * self.interval
+            for func in set(stack):
+                entry = stats.setdefault(func, [0, 0, 0.0, 0.0, {}])
+                entry[1] += count
+                entry[3] += seconds
+            stats[stack[-1]][2] += seconds
+            for caller, callee in zip(stack, stack[1:]):
+                callers = stats[callee][4]
+                callers[caller] = callers.get(caller, 0) + count
+        _write_pstats(path, {func: (e[1], e[1], e[2], e[3], e[4]) for func, e in stats.items()})
+
+
+def default_targets() -> List[type]:
+    """The classes covered by method stats."""
+    from .interface import LibraryInterface
+    from .library import LibrarySystem
+    from .mcp_server import LibraryMCPServer
+    return [LibrarySystem, LibraryMCPServer, LibraryInterface]
+
+
+class Profiler:
+    """
+    Start/stop control over method stats and the sampling profiler, shared by
+    the environment variable and the admin endpoints.
+    """
+
+    def __init__(self):
+        self.stats = MethodStats()
+        self.sampler = SamplingProfiler()
+        self._lock = threading.Lock()
+
+    def start(self, modes=PROFILE_MODES, interval: Optional[float] = None):
+        """Start the given profiling modes ("stats" and/or "sampling")."""
+        unknown = set(modes) - set(PROFILE_MODES)
+        if unknown:
+            raise ValueError(f"Unknown profiling mode: {', '.join(sorted(unknown))}")
+        with self._lock:
+            if "stats" in modes:
+                self.stats.install(default_targets())
+            if "sampling" in modes:
+                self.sampler.start(interval)
+
+    def stop(self, dump_dir: Optional[str] = None) -> List[str]:
+        """
+        Stop every running mode, optionally dumping what was collected.
+        Returns the paths of the files written.
+        """
+        with self._lock:
+            was_stats, was_sampling = self.stats.installed, self.sampler.running
+            self.stats.uninstall()
+            self.sampler.stop()
+            paths = []
+            if dump_dir:
+                os.makedirs(dump_dir, exist_ok=True)
+                stamp = time.strftime("%Y%m%d-%H%M%S")
+                if was_stats:
+                    paths.append(os.path.join(dump_dir, f"methods-{stamp}.pstats"))
+                    self.stats.dump_pstats(paths[-1])
+                if was_sampling:
+                    paths.append(os.path.join(dump_dir, f"samples-{stamp}.pstats"))
+                    self.sampler.dump_pstats(paths[-1])
+                    paths.append(os.path.join(dump_dir, f"samples-{stamp}.collapsed"))
+                    self.sampler.dump_collapsed(paths[-1])
+            return paths
+
+    def reset(self):
+        """Forget everything collected so far."""
+        self.stats.reset()
+        self.sampler.reset()
+
+    def status(self, limit: int = 20) -> Dict[str, Any]:
+        """Get the running modes, the top methods and the sample count."""
+        return {
+            "stats": self.stats.installed,
+            "sampling": self.sampler.running,
+            "interval": self.sampler.interval,
+            "samples": sum(self.sampler.samples.values()),
+            "methods": self.stats.snapshot(limit),
+        }
+
+
+PROFILER = Profiler()
+
+
+def traced(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Time a plain function (e.g. a closure that cannot be patched on a class)
+    under name while method stats are enabled; otherwise only a flag check.
+    """
+    timed = PROFILER.stats.wrap(name, func)
+
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        if PROFILER.stats.installed:
+            return timed(*args, **kwargs)
+        return func(*args, **kwargs)
+    return call
+
+
+def configure_from_env():
+    """
+    Start profiling if LIBRARY_PROFILE is set, dumping to LIBRARY_PROFILE_DIR
+    (default "profiles") when the process exits.
+    """
+    setting = os.getenv("LIBRARY_PROFILE", "").strip()
+    if not setting or PROFILER.stats.installed or PROFILER.sampler.running:
+        return
+    modes = [m.strip() for m in setting.split(",") if m.strip()]
+    interval = float(os.getenv("LIBRARY_PROFILE_INTERVAL", "0.005"))
+    PROFILER.start(modes, interval)
+    atexit.register(PROFILER.stop, os.getenv("LIBRARY_PROFILE_DIR", "profiles"))
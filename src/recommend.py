@@ -0,0 +1,149 @@
+"""
+recommend.py
+------------
+"Patrons who borrowed this also borrowed..." recommendations.
+CoBorrowIndex keeps an item-to-item co-occurrence index over titles, updated
+through the library's listener hook on every borrow: the new title is paired
+with the titles in the patron's recent borrowing history. Each title keeps a
+bounded set of neighbor counts (the lowest are pruned) and a ranked top-k
+list that is maintained on update, so reading recommendations never scans
+the loan history or sorts.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .locking import locked
+from .models import Book, Loan
+
+
+class CoBorrowIndex:
+    """
+    Co-borrowing counts between titles: how many patrons borrowed both.
+    Memory is bounded by max_neighbors per title and history titles per
+    patron for the max_patrons most recently active patrons; counts evicted by
+    pruning restart from zero, so rare pairs are approximate while the top
+    pairs of each title are exact.
+    """
+
+    def __init__(self, library, top_k: int = 10, max_neighbors: int = 100,
+                 history: int = 20, max_patrons: int = 100_000):
+        """
+        Initialize the index from the loan history and start following new loans.
+
+        Args:
+            library: The library to watch.
+            top_k: Recommendations kept ranked per title.
+            max_neighbors: Co-borrowed titles counted per title; the lowest
+                           counts are pruned beyond that.
+            history: Most recent distinct titles remembered per patron and
+                     paired with each new borrow.
+            max_patrons: Patrons whose history is remembered; the least
+                         recently active are forgotten first.
+        """
+        self.library = library
+        self.top_k = top_k
+        self.max_neighbors = max(max_neighbors, top_k)
+        self.history = history
+        self.max_patrons = max_patrons
+        self._lock = threading.Lock()
+        # title ID -> {co-borrowed title ID: number of patrons who borrowed both}
+        self._counts: Dict[int, Dict[int, int]] = {}
+        # title ID -> [(count, title ID)], best first, at most top_k entries
+        self._top: Dict[int, List[Tuple[int, int]]] = {}
+        # patron ID -> recently borrowed title IDs (dict used as an ordered set)
+        self._recent: "OrderedDict[int, Dict[int, None]]" = OrderedDict()
+        # title ID -> a copy to point readers at
+        self._copy_of: Dict[int, int] = {}
+        with locked(library):
+            for loan in library.loans:
+                self._add_loan(loan)
+            library.add_listener(self._on_event)
+
+    def close(self):
+        """Stop following new loans."""
+        self.library.remove_listener(self._on_event)
+
+    def _on_event(self, event: str, record: Any):
+        """Listener hook: count the pairs formed by a new loan."""
+        if event == "book_borrowed":
+            with self._lock:
+                self._add_loan(record)
+
+    def _add_loan(self, loan: Loan):
+        """Pair a loan's title with the borrower's recent titles."""
+        book = self.library.get_book(loan.book_id)
+        if book is None:
+            return
+        title_id = book.title_id
+        self._copy_of.setdefault(title_id, book.id)
+        recent = self._recent.get(loan.patron_id)
+        if recent is None:
+            recent = self._recent[loan.patron_id] = {}
+            if len(self._recent) > self.max_patrons:
+                self._recent.popitem(last=False)
+        else:
+            self._recent.move_to_end(loan.patron_id)
+        if title_id in recent:
+            # Borrowing a title again adds no new pairs
+            del recent[title_id]
+            recent[title_id] = None
+            return
+        for other in recent:
+            self._increment(title_id, other)
+            self._increment(other, title_id)
+        recent[title_id] = None
+        if len(recent) > self.history:
+            del recent[next(iter(recent))]
+
+    def _increment(self, title_id: int, other: int):
+        """Count one more patron for a pair, keeping the title's bound and ranking."""
+        counts = self._counts.setdefault(title_id, {})
+        count = counts[other] = counts.get(other, 0) + 1
+        if len(counts) > 2 * self.max_neighbors:
+            self._prune(counts)
+        # Rank by count, then by lowest title ID. Counts only grow, so an entry
+        # that does not beat the last ranked one cannot be ranked already
+        top = self._top.setdefault(title_id, [])
+        key = (count, -other)
+        if len(top) == self.top_k and key <= (top[-1][0], -top[-1][1]):
+            return
+        for i, (_, ranked) in enumerate(top):
+            if ranked == other:
+                del top[i]
+                break
+        position = len(top)
+        while position and (top[position - 1][0], -top[position - 1][1]) < key:
+            position -= 1
+        top.insert(position, (count, other))
+        del top[self.top_k:]
+
+    def _prune(self, counts: Dict[int, int]):
+        """Keep the max_neighbors highest counts of a title (amortized: runs when twice over)."""
+        kept = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:self.max_neighbors]
+        counts.clear()
+        counts.update(kept)
+
+    def recommend(self, book_id: int, limit: Optional[int] = None) -> List[Tuple[Book, int]]:
+        """
+        Get the titles most often borrowed by patrons who borrowed a book's title.
+        Returns up to limit (at most top_k) (Book, patron count) pairs, most
+        co-borrowed first; each Book is a copy of a recommended title.
+        """
+        book = self.library.get_book(book_id)
+        if book is None:
+            return []
+        with self._lock:
+            top = self._top.get(book.title_id, [])[:limit]
+            copies = [(self._copy_of[title_id], count) for count, title_id in top]
+        return [(self.library.get_book(copy_id), count) for copy_id, count in copies]
+
+    def metrics(self) -> Dict[str, int]:
+        """Get the index size: titles, counted pairs and remembered patrons."""
+        with self._lock:
+            return {
+                "titles": len(self._counts),
+                "pairs": sum(len(counts) for counts in self._counts.values()),
+                "patrons": len(self._recent),
+            }
@@ -0,0 +1,117 @@
+"""
+rendering.py
+------------
+Memoized text rendering of library records for list outputs.
+Each book, patron and overdue loan is formatted once and the row is reused
+until the record changes. Book rows are stamped with the status they were
+rendered from, so a borrow or return invalidates exactly that book's row.
+"""
+
+from typing import Any, Dict, Iterable, Sequence, Tuple
+
+from .models import Book, Loan, Patron
+
+
+class RowRenderer:
+    """
+    Formats list rows for books, patrons and overdue loans, caching each row.
+    Works with any library object offering get_book and get_patron.
+    """
+
+    def __init__(self, library):
+        """
+        Initialize the renderer.
+
+        Args:
+            library: LibrarySystem (or compatible) used to join loans to books and patrons.
+        """
+        self.library = library
+        self._book_rows: Dict[int, Tuple[Tuple[bool, object], str]] = {}
+        self._patron_rows: Dict[int, str] = {}
+        self._overdue_rows: Dict[int, str] = {}
+
+    def book_row(self, book: Book) -> str:
+        """Get the list row of a book, re-rendering it only if its status changed."""
+        stamp = (book.available, book.borrowed_by)
+        cached = self._book_rows.get(book.id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        return self._render_book(book.id, book.title, book.author, book.isbn, *stamp)
+
+    def book_fields_row(self, values: Sequence[Any]) -> str:
+        """
+        Get the list row of a book from its BOOK_FIELDS values (a row of a
+        structured table), sharing book_row's cache.
+        """
+        cached = self._book_rows.get(values[0])
+        if cached is not None and cached[0] == (values[4], values[5]):
+            return cached[1]
+        return self._render_book(*values)
+
+    def _render_book(self, book_id: int, title: str, author: str, isbn: str,
+                     available: bool, borrowed_by: Any) -> str:
+        """Format and cache the list row of a book."""
+        status = "Available" if available else f"Borrowed by Patron #{borrowed_by}"
+        row = f"ID: {book_id} | {title} by {author} | ISBN: {isbn} | {status}"
+        self._book_rows[book_id] = ((available, borrowed_by), row)
+        return row
+
+    def patron_row(self, patron: Patron) -> str:
+        """Get the list row of a patron."""
+        row = self._patron_rows.get(patron.id)
+        if row is None:
+            row = self._render_patron(patron.id, patron.name, patron.email, patron.phone)
+        return row
+
+    def patron_fields_row(self, values: Sequence[Any]) -> str:
+        """Get the list row of a patron from its PATRON_FIELDS values, sharing patron_row's cache."""
+        row = self._patron_rows.get(values[0])
+        if row is None:
+            row = self._render_patron(*values)
+        return row
+
+    def _render_patron(self, patron_id: int, name: str, email: str, phone: str) -> str:
+        """Format and cache the list row of a patron."""
+        row = f"ID: {patron_id} | {name} | Email: {email} | Phone: {phone}"
+        self._patron_rows[patron_id] = row
+        return row
+
+    def overdue_rows(self, loans: Iterable[Loan]) -> Iterable[str]:
+        """
+        Get the list rows of overdue loans.
+        Only loans without a cached row are joined to their book and patron, by ID.
+        Rows of loans no longer overdue are dropped from the cache.
+        """
+        previous = self._overdue_rows
+        current: Dict[int, str] = {}
+        for loan in loans:
+            row = previous.get(loan.id)
+            if row is None:
+                book = self.library.get_book(loan.book_id)
+                patron = self.library.get_patron(loan.patron_id)
+                row = _overdue_row(loan, book, patron)
+            current[loan.id] = row
+        self._overdue_rows = current
+        return current.values()
+
+    def overdue_detail_rows(self, details: Iterable[Tuple[Loan, Book, Patron]]) -> Iterable[str]:
+        """
+        Get the list rows of overdue loans already joined to their book and patron
+        (see status_views.overdue_details); rows are cached as in overdue_rows.
+        """
+        previous = self._overdue_rows
+        current: Dict[int, str] = {}
+        for loan, book, patron in details:
+            row = previous.get(loan.id)
+            current[loan.id] = row if row is not None else _overdue_row(loan, book, patron)
+        self._overdue_rows = current
+        return current.values()
+
+
+def _overdue_row(loan: Loan, book: Book, patron: Patron) -> str:
+    """Format the list row of an overdue loan."""
+    return (
+        f"Book: {book.title} (ID: {book.id}) | "
+        f"Patron: {patron.name} (ID: {patron.id}) | "
+        f"Due date: {loan.due_date.strftime('%Y-%m-%d')}"
+    )
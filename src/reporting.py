@@ -0,0 +1,315 @@
+"""
+reporting.py
+------------
+Circulation reports computed over a columnar export of the loan history.
+Loans are copied once into parallel int64 arrays (one per field) and every
+aggregate is a bulk operation over those columns: vectorized with NumPy when it
+is installed, and plain loops over the compact arrays otherwise.
+Every report, whole or split into chunks, goes through the same two steps:
+report_partials counts a chunk of loans, merge_report combines the counts.
+"""
+
+import heapq
+
+from array import array
+from collections import Counter
+from types import ModuleType
+from datetime import date, datetime, timedelta
+from itertools import islice, repeat
+from operator import attrgetter, itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+np: Optional[ModuleType]
+try:
+    import numpy
+    np = numpy
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+from .clock import EPOCH, SECONDS_PER_DAY, to_epoch_seconds
+from .models import Book, Loan
+from .snapshot import read_view
+
+# Marker stored in return_ts for loans that are still open
+NOT_RETURNED = -1
+
+# Loan fields of the rows exported by export_chunks, in LoanColumns.from_rows order
+LOAN_FIELDS = ("id", "book_id", "patron_id", "loan_date", "due_date", "return_date")
+
+
+class LoanColumns:
+    """
+    Columnar copy of a loan history: one int64 array per loan field.
+    Dates are whole seconds since 1970-01-01; return_ts is NOT_RETURNED for open loans.
+    """
+    COLUMNS = ("loan_id", "book_id", "title_id", "patron_id", "loan_ts", "due_ts", "return_ts")
+
+    def __init__(self, loan_id: Iterable[int] = (), book_id: Iterable[int] = (), title_id: Iterable[int] = (),
+                 patron_id: Iterable[int] = (), loan_ts: Iterable[int] = (), due_ts: Iterable[int] = (),
+                 return_ts: Iterable[int] = ()):
+        """
+        Initialize from one iterable of ints per column in COLUMNS (all empty by default).
+        """
+        self.loan_id = array("q", loan_id)
+        self.book_id = array("q", book_id)
+        self.title_id = array("q", title_id)
+        self.patron_id = array("q", patron_id)
+        self.loan_ts = array("q", loan_ts)
+        self.due_ts = array("q", due_ts)
+        self.return_ts = array("q", return_ts)
+        lengths = {len(getattr(self, name)) for name in self.COLUMNS}
+        if len(lengths) > 1:
+            raise ValueError("All loan columns must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.loan_id)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Any, ...]], title_ids: Iterable[int]) -> "LoanColumns":
+        """
+        Export loan rows into columns.
+
+        Args:
+            rows: Tuples of the LOAN_FIELDS of each loan.
+            title_ids: Title ID of each loan's book, in row order.
+        """
+        cols = cls()
+        for loan_id, book_id, patron_id, loan_date, due_date, return_date in rows:
+            cols.loan_id.append(loan_id)
+            cols.book_id.append(book_id)
+            cols.patron_id.append(patron_id)
+            cols.loan_ts.append(to_epoch_seconds(loan_date))
+            cols.due_ts.append(to_epoch_seconds(due_date))
+            cols.return_ts.append(NOT_RETURNED if return_date is None else to_epoch_seconds(return_date))
+        cols.title_id.extend(title_ids)
+        if len(cols.loan_id) != len(cols.title_id):
+            raise ValueError("Expected one title ID per loan row")
+        return cols
+
+    @classmethod
+    def from_loans(cls, loans: Iterable[Loan], title_of: Dict[int, int]) -> "LoanColumns":
+        """
+        Export Loan objects into columns.
+
+        Args:
+            loans: Loans to export.
+            title_of: Mapping from book ID to title ID.
+        """
+        rows = list(map(attrgetter(*LOAN_FIELDS), loans))
+        return cls.from_rows(rows, map(title_of.get, map(itemgetter(1), rows), repeat(0)))
+
+    @classmethod
+    def from_library(cls, library) -> "LoanColumns":
+        """
+        Export the full loan history of a LibrarySystem (or a ShardedLibrary).
+        The export reads a snapshot, so checkouts are not blocked meanwhile.
+        """
+        with read_view(library) as view:
+            return cls.from_rows(*next(export_chunks(view.books, view.loans)))
+
+    def slice(self, start: int, stop: int) -> "LoanColumns":
+        """
+        Copy rows [start, stop) into a new LoanColumns, e.g. to ship a chunk to a worker process.
+        """
+        return LoanColumns(**{name: getattr(self, name)[start:stop] for name in self.COLUMNS})
+
+    def column(self, name: str) -> Any:
+        """
+        Get a column as a NumPy array (a zero-copy view) when NumPy is installed,
+        otherwise as the underlying array.array.
+        """
+        data = getattr(self, name)
+        if np is not None:
+            return np.frombuffer(data, dtype=np.int64) if len(data) else np.zeros(0, dtype=np.int64)
+        return data
+
+
+def _field_rows(records: Iterable[Any], *fields: str) -> Iterator[Tuple[Any, ...]]:
+    """Iterate records as tuples of fields; snapshot record lists do it without copying records."""
+    rows = getattr(records, "rows", None)
+    return rows(*fields) if rows is not None else map(attrgetter(*fields), records)
+
+
+def export_chunks(books: Iterable[Book], loans: Iterable[Loan],
+                  chunk_size: Optional[int] = None) -> Iterator[Tuple[List[Tuple[Any, ...]], List[int]]]:
+    """
+    Read a loan history in chunks ready for LoanColumns.from_rows.
+    Only field reads and dict lookups happen here; the per-row date conversion
+    is left to from_rows, so a job can run it in a worker process.
+
+    Args:
+        books: Books of the library (or snapshot), to map loans to titles.
+        loans: Loans to export.
+        chunk_size: Rows per chunk; everything in one chunk when None.
+
+    Yields:
+        (rows, title_ids) pairs: LOAN_FIELDS tuples and the title ID of each row.
+        At least one chunk is yielded, even for an empty history.
+    """
+    title_of = dict(_field_rows(books, "id", "title_id"))
+    rows = _field_rows(loans, *LOAN_FIELDS)
+    book_id = itemgetter(1)
+    chunk = list(islice(rows, chunk_size))
+    while True:
+        yield chunk, list(map(title_of.get, map(book_id, chunk), repeat(0)))
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+
+
+def _counts(values: Any) -> Dict[int, int]:
+    """Count occurrences of each value in a column."""
+    if np is not None:
+        keys, counts = np.unique(values, return_counts=True)
+        return dict(zip(keys.tolist(), counts.tolist()))
+    return dict(Counter(values))
+
+
+def _day_counts(cols: LoanColumns) -> Dict[int, int]:
+    """Count loans by start day (days since 1970-01-01)."""
+    if np is not None:
+        return _counts(cols.column("loan_ts") // SECONDS_PER_DAY)
+    return _counts(ts // SECONDS_PER_DAY for ts in cols.loan_ts)
+
+
+def _returned_totals(cols: LoanColumns) -> Tuple[int, int]:
+    """Total length in seconds and number of the returned loans."""
+    if np is not None:
+        returned = cols.column("return_ts")
+        mask = returned != NOT_RETURNED
+        return int((returned[mask] - cols.column("loan_ts")[mask]).sum()), int(mask.sum())
+    total = count = 0
+    for start, end in zip(cols.loan_ts, cols.return_ts):
+        if end != NOT_RETURNED:
+            total += end - start
+            count += 1
+    return total, count
+
+
+def _patron_counts(cols: LoanColumns, now_ts: int) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """
+    Count each patron's loans, and those returned late or open and past due.
+    Returns (totals, lates), both keyed by patron ID; lates omits patrons with no late loan.
+    """
+    if np is not None:
+        patrons = cols.column("patron_id")
+        returned = cols.column("return_ts")
+        due = cols.column("due_ts")
+        late = np.where(returned == NOT_RETURNED, now_ts > due, returned > due)
+        return _counts(patrons), _counts(patrons[late])
+    lates: Counter[int] = Counter()
+    for patron, due_ts, end in zip(cols.patron_id, cols.due_ts, cols.return_ts):
+        if (now_ts if end == NOT_RETURNED else end) > due_ts:
+            lates[patron] += 1
+    return _counts(cols.patron_id), dict(lates)
+
+
+def _per_day(days: Mapping[int, int]) -> Dict[date, int]:
+    """Turn loan counts by day number into counts by calendar day, in day order."""
+    return {(EPOCH + timedelta(days=d)).date(): days[d] for d in sorted(days)}
+
+
+def _top(titles: Mapping[int, int], k: int) -> List[Tuple[int, int]]:
+    """Pick the k (title_id, loan_count) pairs with the most loans, ties by title ID."""
+    if k <= 0:
+        return []
+    return heapq.nsmallest(k, titles.items(), key=lambda item: (-item[1], item[0]))
+
+
+def _average_days(total: int, count: int) -> Optional[float]:
+    """Average loan length in days, None when nothing was returned."""
+    return total / count / SECONDS_PER_DAY if count else None
+
+
+def _rates(totals: Mapping[int, int], lates: Mapping[int, int]) -> Dict[int, float]:
+    """Late share of each patron's loans, in patron ID order."""
+    return {p: lates.get(p, 0) / totals[p] for p in sorted(totals)}
+
+
+def loans_per_day(cols: LoanColumns) -> Dict[date, int]:
+    """
+    Count loans by the calendar day they started on.
+    Returns a dict mapping each day to its loan count, in day order.
+    """
+    return _per_day(_day_counts(cols))
+
+
+def top_titles(cols: LoanColumns, k: int = 10) -> List[Tuple[int, int]]:
+    """
+    Find the most borrowed titles.
+    Returns up to k (title_id, loan_count) pairs, most borrowed first.
+    """
+    return _top(_counts(cols.column("title_id")), k)
+
+
+def average_loan_days(cols: LoanColumns) -> Optional[float]:
+    """
+    Average length in days of the loans that have been returned.
+    Returns None when no loan has been returned yet.
+    """
+    return _average_days(*_returned_totals(cols))
+
+
+def overdue_rate_by_patron(cols: LoanColumns, now: Optional[datetime] = None) -> Dict[int, float]:
+    """
+    Share of each patron's loans that were returned late or are open and past due.
+    Returns a dict mapping patron ID to a rate between 0 and 1.
+    """
+    return _rates(*_patron_counts(cols, to_epoch_seconds(now or datetime.now())))
+
+
+def report_partials(cols: LoanColumns, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Compute mergeable partial aggregates for a chunk of loans.
+    Partials of several chunks are combined with merge_report, which lets a
+    report over a large history be split across worker processes.
+    """
+    returned_total, returned_count = _returned_totals(cols)
+    patron_totals, patron_lates = _patron_counts(cols, to_epoch_seconds(now or datetime.now()))
+    return {
+        "total_loans": len(cols),
+        "days": _day_counts(cols),
+        "titles": _counts(cols.column("title_id")),
+        "returned_total": returned_total,
+        "returned_count": returned_count,
+        "patron_totals": patron_totals,
+        "patron_lates": patron_lates,
+    }
+
+
+def merge_report(partials: Iterable[Dict[str, Any]], k: int = 10) -> Dict[str, Any]:
+    """
+    Combine partial aggregates into a full circulation report.
+    Returns the same dict as circulation_report.
+    """
+    total = returned_total = returned_count = 0
+    days: Counter[int] = Counter()
+    titles: Counter[int] = Counter()
+    patron_totals: Counter[int] = Counter()
+    patron_lates: Counter[int] = Counter()
+    for part in partials:
+        total += part["total_loans"]
+        returned_total += part["returned_total"]
+        returned_count += part["returned_count"]
+        days.update(part["days"])
+        titles.update(part["titles"])
+        patron_totals.update(part["patron_totals"])
+        patron_lates.update(part["patron_lates"])
+    return {
+        "total_loans": total,
+        "loans_per_day": _per_day(days),
+        "top_titles": _top(titles, k),
+        "average_loan_days": _average_days(returned_total, returned_count),
+        "overdue_rate_by_patron": _rates(patron_totals, patron_lates),
+    }
+
+
+def circulation_report(cols: LoanColumns, now: Optional[datetime] = None, k: int = 10) -> Dict[str, Any]:
+    """
+    Compute every circulation aggregate over the same columns.
+    Returns a dict with total_loans, loans_per_day, top_titles, average_loan_days
+    and overdue_rate_by_patron.
+    """
+    return merge_report([report_partials(cols, now)], k)
@@ -0,0 +1,18 @@
+"""
+sample_data.py
+--------------
+Demonstration records used to seed a fresh LibrarySystem.
+Shared by the Gradio interface and the headless API service.
+"""
+
+
+def add_sample_data(library):
+    """
+    Add sample books and patrons to the library for demonstration purposes.
+    Works with a LibrarySystem or any object exposing the same add methods.
+    """
+    library.add_book("The Great Gatsby", "F. Scott Fitzgerald", "978-0743273565")
+    library.add_book("To Kill a Mockingbird", "Harper Lee", "978-0446310789")
+    library.add_book("1984", "George Orwell", "978-0451524935")
+    library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    library.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
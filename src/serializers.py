@@ -0,0 +1,130 @@
+"""
+serializers.py
+--------------
+Compact structured serialization of library models for MCP tool outputs.
+Builds plain dicts and row tables straight from model attributes and encodes
+them as minimal JSON, so clients and LLMs never have to re-parse formatted text.
+"""
+
+import dataclasses
+import json
+from datetime import date, datetime
+from operator import attrgetter
+from typing import Any, ClassVar, Dict, Iterable, List, Optional, Protocol, Sequence, Type, TypeVar
+
+
+class _Dataclass(Protocol):
+    """Any dataclass, as accepted by dataclasses.fields."""
+    __dataclass_fields__: ClassVar[Dict[str, Any]]
+
+
+T = TypeVar("T", bound=_Dataclass)
+
+TITLE_FIELDS = ("id", "title", "author", "isbn", "total_copies", "available_copies")
+BOOK_FIELDS = ("id", "title", "author", "isbn", "available", "borrowed_by")
+PATRON_FIELDS = ("id", "name", "email", "phone")
+LOAN_FIELDS = ("id", "book_id", "patron_id", "loan_date", "due_date", "return_date")
+HOLD_FIELDS = ("id", "book_id", "patron_id", "placed_date", "days", "loan_id", "cancelled")
+JOB_FIELDS = ("id", "kind", "status", "completed_steps", "total_steps", "error")
+# Fields holding datetimes, which need conversion before encoding
+DATE_FIELDS = frozenset(("loan_date", "due_date", "return_date", "placed_date"))
+
+_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def select_fields(default: Sequence[str], requested: Optional[Iterable[str]]) -> Sequence[str]:
+    """
+    Restrict a default field list to the requested fields, keeping the default order.
+    Unknown field names are ignored; an empty or missing request keeps every field.
+    """
+    if not requested:
+        return default
+    wanted = set(requested)
+    return tuple(f for f in default if f in wanted) or default
+
+
+def _value(value: Any) -> Any:
+    """Convert a model attribute into a JSON-native value."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def to_dict(obj: Any, fields: Sequence[str], omit_none: bool = True) -> Dict[str, Any]:
+    """
+    Build a dict of the given attributes of a model object.
+    None values are dropped when omit_none is set, which keeps responses minimal.
+    """
+    out = {}
+    for name in fields:
+        value = getattr(obj, name)
+        if value is None and omit_none:
+            continue
+        out[name] = _value(value)
+    return out
+
+
+def to_table(objs: Iterable[Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Build a row table for a list of model objects.
+    Field names are emitted once instead of once per row, e.g.
+    {"fields": ["id", "title"], "rows": [[1, "1984"], [2, "Emma"]]}.
+    """
+    rows: List[Any]
+    if DATE_FIELDS.intersection(fields):
+        rows = [[_value(getattr(obj, f)) for f in fields] for obj in objs]
+    elif len(fields) == 1:
+        getter = attrgetter(fields[0])
+        rows = [[getter(obj)] for obj in objs]
+    else:
+        # attrgetter returns tuples, which encode as JSON arrays
+        getter = attrgetter(*fields)
+        rows = [getter(obj) for obj in objs]
+    return {"fields": list(fields), "rows": rows}
+
+
+def to_plain(value: Any) -> Any:
+    """
+    Recursively convert nested results (e.g. job reports) into JSON-native values.
+    Date dict keys become ISO strings and tuples become lists.
+    """
+    if isinstance(value, dict):
+        return {_value(k) if isinstance(k, date) else k: to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    return _value(value)
+
+
+def to_wire(obj: Any) -> Dict[str, Any]:
+    """
+    Encode every field of a model dataclass losslessly for the HTTP API.
+    Datetimes are sent as full ISO 8601 strings.
+    """
+    out = {}
+    for f in dataclasses.fields(obj):
+        value = getattr(obj, f.name)
+        out[f.name] = value.isoformat() if isinstance(value, datetime) else value
+    return out
+
+
+def from_wire(cls: Type[T], data: Dict[str, Any]) -> T:
+    """
+    Rebuild a model dataclass from a dict produced by to_wire.
+    Unknown keys are ignored so older clients keep working against newer servers.
+    """
+    kwargs = {}
+    for f in dataclasses.fields(cls):
+        if f.name not in data:
+            continue
+        value = data[f.name]
+        if f.name in DATE_FIELDS and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        kwargs[f.name] = value
+    return cls(**kwargs)
+
+
+def dumps(data: Any) -> str:
+    """Encode structured data as compact JSON (no whitespace, UTF-8 kept as-is)."""
+    return _encoder.encode(data)
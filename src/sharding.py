@@ -0,0 +1,253 @@
+"""
+sharding.py
+-----------
+Multi-branch sharded mode for the Library Management System.
+Each branch is a shard with its own LibrarySystem (indexes, counters and lock),
+either in-process or behind its own API service process. Shards hand out
+interleaved ID sequences, so every ID is globally unique and encodes its shard:
+lookups by ID are routed straight to the owning shard.
+"""
+
+import threading
+import zlib
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .library import LibrarySystem, normalize_email, normalize_phone
+from .models import Book, Hold, Loan, Patron, Title
+from .snapshot import ShardedSnapshot
+
+
+class ShardedLibrary:
+    """
+    Routes library operations to per-branch shards.
+    Offers the same methods as LibrarySystem (plus optional branch arguments),
+    so LibraryInterface and LibraryMCPServer can use it unchanged. Loans live in
+    the shard that owns the book; patrons may borrow from any branch.
+    """
+
+    def __init__(self, branches: Sequence[str], shards: Optional[Sequence[Any]] = None,
+                 clock: Callable[[], datetime] = datetime.now):
+        """
+        Initialize the sharded library.
+
+        Args:
+            branches: Branch names; their order defines the shard index.
+            shards: Optional pre-built shards, one per branch, e.g. LibraryAPIClient
+                    instances for API services started with --shard-index i
+                    --shard-count len(branches). Defaults to in-process
+                    LibrarySystem shards. Shards must have sibling_patrons set
+                    so they lend to patrons of other branches.
+            clock: Function returning the current time, shared by in-process shards.
+        """
+        if not branches:
+            raise ValueError("At least one branch is required")
+        self.branches = list(branches)
+        count = len(self.branches)
+        if shards is None:
+            shards = [
+                LibrarySystem(id_start=i + 1, id_step=count, clock=clock, sibling_patrons=True)
+                for i in range(count)
+            ]
+        if len(shards) != count:
+            raise ValueError("Exactly one shard per branch is required")
+        # API clients mirror the LibrarySystem methods used here
+        self.shards: List[LibrarySystem] = list(shards)
+        self._shard_by_branch = dict(zip(self.branches, self.shards))
+        # Email/phone keys registered through this library, kept by the shard
+        # slot each key hashes to and guarded by that slot's lock
+        self._reserved: List[Set[str]] = [set() for _ in self.shards]
+        self._reserve_locks = [threading.Lock() for _ in self.shards]
+
+    def shard_for_id(self, record_id: int) -> LibrarySystem:
+        """Get the shard owning an ID (any kind of record)."""
+        return self.shards[(record_id - 1) % len(self.shards)]
+
+    def branch_for_id(self, record_id: int) -> str:
+        """Get the branch name owning an ID."""
+        return self.branches[(record_id - 1) % len(self.branches)]
+
+    def shard_for_branch(self, branch: Optional[str]) -> LibrarySystem:
+        """Get a branch's shard; None selects the first branch."""
+        if branch is None:
+            return self.shards[0]
+        try:
+            return self._shard_by_branch[branch]
+        except KeyError:
+            raise ValueError(f"Unknown branch: {branch}") from None
+
+    @property
+    def titles(self) -> List[Title]:
+        """All titles across branches."""
+        return [t for shard in self.shards for t in shard.titles]
+
+    @property
+    def books(self) -> List[Book]:
+        """All books across branches."""
+        return [b for shard in self.shards for b in shard.books]
+
+    @property
+    def patrons(self) -> List[Patron]:
+        """All patrons across branches."""
+        return [p for shard in self.shards for p in shard.patrons]
+
+    @property
+    def loans(self) -> List[Loan]:
+        """All loans across branches."""
+        return [l for shard in self.shards for l in shard.loans]
+
+    def snapshot(self) -> ShardedSnapshot:
+        """
+        Take a point-in-time view across all in-process shards.
+        Every shard lock is held (in shard order) while the shard snapshots are
+        taken, so the view is consistent across branches.
+        """
+        with ExitStack() as stack:
+            for shard in self.shards:
+                if hasattr(shard, "_lock"):
+                    stack.enter_context(shard._lock)
+            return ShardedSnapshot([
+                shard.snapshot() if hasattr(shard, "snapshot") else shard for shard in self.shards
+            ])
+
+    def add_listener(self, callback: Callable[[str, Any], None]):
+        """Register a mutation callback on every in-process shard."""
+        for shard in self.shards:
+            shard.add_listener(callback)
+
+    def remove_listener(self, callback: Callable[[str, Any], None]):
+        """Unregister a mutation callback from every in-process shard."""
+        for shard in self.shards:
+            shard.remove_listener(callback)
+
+    def add_book(self, title: str, author: str, isbn: str, branch: Optional[str] = None) -> Book:
+        """Add a book to a branch (the first branch by default)."""
+        return self.shard_for_branch(branch).add_book(title, author, isbn)
+
+    def add_copies(self, title_id: int, count: int) -> List[Book]:
+        """Add copies of a title in the branch that owns it."""
+        return self.shard_for_id(title_id).add_copies(title_id, count)
+
+    def add_patron(self, name: str, email: str, phone: str, branch: Optional[str] = None) -> Patron:
+        """
+        Register a patron at a branch (the first branch by default).
+        Email and phone must not belong to a patron of any branch. Each
+        normalized key is reserved in the shard slot it hashes to before the
+        patron is inserted, and only that slot's lock is held for the check, so
+        registrations with different keys do not contend; concurrent
+        registrations of the same key see each other's reservation.
+        """
+        keys: Dict[str, str] = {}
+        if normalize_email(email):
+            keys["email:" + normalize_email(email)] = f"email {email}"
+        if normalize_phone(phone):
+            keys["phone:" + normalize_phone(phone)] = f"phone {phone}"
+        with ExitStack() as stack:
+            for slot in sorted({self._slot_for_key(key) for key in keys}):
+                stack.enter_context(self._reserve_locks[slot])
+            for key, label in keys.items():
+                if key in self._reserved[self._slot_for_key(key)]:
+                    raise ValueError(f"A patron with {label} already exists")
+            # Patrons registered at a shard directly have no reservation
+            if normalize_email(email) and self.find_patron_by_email(email) is not None:
+                raise ValueError(f"A patron with email {email} already exists")
+            if normalize_phone(phone) and self.find_patron_by_phone(phone) is not None:
+                raise ValueError(f"A patron with phone {phone} already exists")
+            for key in keys:
+                self._reserved[self._slot_for_key(key)].add(key)
+        try:
+            return self.shard_for_branch(branch).add_patron(name, email, phone)
+        except BaseException:
+            for key in keys:
+                with self._reserve_locks[self._slot_for_key(key)]:
+                    self._reserved[self._slot_for_key(key)].discard(key)
+            raise
+
+    def _slot_for_key(self, key: str) -> int:
+        """Get the shard slot holding the reservation of a normalized email/phone key."""
+        return zlib.crc32(key.encode()) % len(self.shards)
+
+    def borrow_book(self, book_id: int, patron_id: int, days: int = 14) -> Optional[Loan]:
+        """
+        Borrow a book from its branch for a patron of any branch.
+        The patron is checked in their home shard before the book's shard is called.
+        """
+        if self.get_patron(patron_id) is None:
+            return None
+        return self.shard_for_id(book_id).borrow_book(book_id, patron_id, days)
+
+    def return_book(self, book_id: int) -> bool:
+        """Return a book to the branch that owns it."""
+        return self.shard_for_id(book_id).return_book(book_id)
+
+    def place_hold(self, book_id: int, patron_id: int, days: int = 14) -> Optional[Hold]:
+        """Join the waiting list for a book in its branch."""
+        if self.get_patron(patron_id) is None:
+            return None
+        return self.shard_for_id(book_id).place_hold(book_id, patron_id, days)
+
+    def cancel_hold(self, hold_id: int) -> bool:
+        """Cancel a hold in the branch that owns it."""
+        return self.shard_for_id(hold_id).cancel_hold(hold_id)
+
+    def get_hold_queue(self, book_id: int) -> List[Hold]:
+        """Get the waiting holds for a book's title."""
+        return self.shard_for_id(book_id).get_hold_queue(book_id)
+
+    def get_title(self, title_id: int) -> Optional[Title]:
+        """Get a title by ID from its branch."""
+        return self.shard_for_id(title_id).get_title(title_id)
+
+    def get_book(self, book_id: int) -> Optional[Book]:
+        """Get a book by ID from its branch."""
+        return self.shard_for_id(book_id).get_book(book_id)
+
+    def get_patron(self, patron_id: int) -> Optional[Patron]:
+        """Get a patron by ID from their home branch."""
+        return self.shard_for_id(patron_id).get_patron(patron_id)
+
+    def find_patron_by_email(self, email: str) -> Optional[Patron]:
+        """Find a patron of any branch by email address."""
+        return next((p for p in (s.find_patron_by_email(email) for s in self.shards) if p), None)
+
+    def find_patron_by_phone(self, phone: str) -> Optional[Patron]:
+        """Find a patron of any branch by phone number."""
+        return next((p for p in (s.find_patron_by_phone(phone) for s in self.shards) if p), None)
+
+    def find_patrons_by_name(self, prefix: str, limit: int = 10) -> List[Patron]:
+        """Find patrons of every branch by name prefix; up to limit, ordered by ID."""
+        found = [p for shard in self.shards for p in shard.find_patrons_by_name(prefix, limit)]
+        return sorted(found, key=lambda p: p.id)[:limit]
+
+    def find_books(self, query: str, limit: int = 5) -> List[Tuple[Book, float]]:
+        """Find books of every branch by approximate title or author; up to limit, best first."""
+        found = [match for shard in self.shards for match in shard.find_books(query, limit)]
+        return sorted(found, key=lambda match: (-match[1], match[0].id))[:limit]
+
+    def get_patron_loans(self, patron_id: int) -> List[Loan]:
+        """Get a patron's loans from every branch."""
+        return [l for shard in self.shards for l in shard.get_patron_loans(patron_id)]
+
+    def get_overdue_loans(self) -> List[Loan]:
+        """Get overdue loans from every branch."""
+        return [l for shard in self.shards for l in shard.get_overdue_loans()]
+
+    def get_due_soon_loans(self, days: float = 3) -> List[Loan]:
+        """Get loans due within the given number of days from every branch."""
+        return [l for shard in self.shards for l in shard.get_due_soon_loans(days)]
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Sum the dashboard counters of every branch.
+        A patron with loans at several branches counts once per branch in active_patrons.
+        """
+        totals: Dict[str, int] = {}
+        for shard in self.shards:
+            for name, value in shard.get_stats().items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def get_branch_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get the dashboard counters of each branch."""
+        return {branch: shard.get_stats() for branch, shard in zip(self.branches, self.shards)}
@@ -0,0 +1,263 @@
+"""
+snapshot.py
+-----------
+Point-in-time read views of a LibrarySystem.
+Taking a snapshot is O(1): it records the length of the append-only record
+lists and the ID counters. Writers preserve a record's state (copy-on-write)
+before mutating it in place while a snapshot is open, so readers get a
+consistent view without holding the library lock, and writers pay nothing
+when no snapshot is open.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .clock import to_epoch_micros
+from .models import Book, Loan, Patron, Title
+
+# Record kinds that the library mutates in place; patrons never change after creation
+MUTABLE_KINDS = (Title, Book, Loan)
+
+
+def clone(record: Any) -> Any:
+    """Shallow-copy a dataclass record (faster than copy.copy)."""
+    copied = object.__new__(type(record))
+    copied.__dict__.update(record.__dict__)
+    return copied
+
+
+class SnapshotRecords(Sequence[Any]):
+    """
+    Read-only view of one record list as it was when the snapshot was taken.
+    Records of mutable kinds are returned as copies, so they stay consistent
+    however long the reader keeps them.
+    """
+
+    def __init__(self, snapshot: "LibrarySnapshot", records: List[Any], length: int, mutable: bool):
+        self._snapshot = snapshot
+        self._records = records
+        self._length = length
+        self._mutable = mutable
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("snapshot index out of range")
+        record = self._records[index]
+        return self._snapshot._read(record) if self._mutable else record
+
+    def __iter__(self) -> Iterator[Any]:
+        records = self._records
+        if not self._mutable:
+            for i in range(self._length):
+                yield records[i]
+            return
+        read = self._snapshot._read
+        for i in range(self._length):
+            yield read(records[i])
+
+    def rows(self, *fields: str) -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterate the records as tuples of the given fields, as of the snapshot.
+        Cheaper than iterating records for bulk exports: no record is copied.
+        """
+        get = attrgetter(*fields) if len(fields) > 1 else (lambda r: (getattr(r, fields[0]),))
+        records = self._records
+        if not self._mutable:
+            for i in range(self._length):
+                yield get(records[i])
+            return
+        # Same protocol as LibrarySnapshot._read: read the fields, then check for a preserved state
+        shadow = self._snapshot._shadow
+        for i in range(self._length):
+            record = records[i]
+            values = get(record)
+            saved = shadow.get((type(record), record.id))
+            yield values if saved is None else get(saved)
+
+
+class LibrarySnapshot:
+    """
+    Consistent view of a LibrarySystem at one point in time.
+    Offers the read side of LibrarySystem (titles, books, patrons, loans and
+    the get_* lookups), so list, export and report code can run on it unchanged.
+    Close it (or use it as a context manager) when done, so writers stop
+    preserving records for it; a forgotten snapshot is released when collected.
+    """
+
+    def __init__(self, library):
+        """
+        Initialize the snapshot. Must be called with the library lock held
+        (use LibrarySystem.snapshot()).
+        """
+        self._library = library
+        # (record type, ID) -> the record's state before its first mutation after the snapshot
+        self._shadow: Dict[Tuple[type, int], Any] = {}
+        self._next_ids = {
+            Title: library._title_id_counter,
+            Book: library._book_id_counter,
+            Patron: library._patron_id_counter,
+            Loan: library._loan_id_counter,
+        }
+        self.taken_at = library.clock()
+        self.titles = SnapshotRecords(self, library.titles, len(library.titles), True)
+        self.books = SnapshotRecords(self, library.books, len(library.books), True)
+        self.patrons = SnapshotRecords(self, library.patrons, len(library.patrons), False)
+        self.loans = SnapshotRecords(self, library.loans, len(library.loans), True)
+
+    def __enter__(self) -> "LibrarySnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the snapshot; later mutations no longer preserve records for it."""
+        self._library._release_snapshot(self)
+
+    def _read(self, record: Any) -> Any:
+        """
+        Get a record's state as of the snapshot.
+        The record is copied before the shadow is checked: a writer preserves a
+        record before mutating it, so if no preserved state shows up after the
+        copy, the copy predates any mutation made since the snapshot.
+        """
+        copied = clone(record)
+        return self._shadow.get((type(record), record.id), copied)
+
+    def _lookup(self, kind: type, index: Dict[int, Any], record_id: int) -> Optional[Any]:
+        """Look up a record by ID, hiding records created after the snapshot."""
+        record = index.get(record_id)
+        if record is None or record_id >= self._next_ids[kind]:
+            return None
+        return self._read(record) if kind in MUTABLE_KINDS else record
+
+    def get_title(self, title_id: int) -> Optional[Title]:
+        """Get a title by ID as of the snapshot."""
+        return self._lookup(Title, self._library._titles_by_id, title_id)
+
+    def get_book(self, book_id: int) -> Optional[Book]:
+        """Get a book by ID as of the snapshot."""
+        return self._lookup(Book, self._library._books_by_id, book_id)
+
+    def get_patron(self, patron_id: int) -> Optional[Patron]:
+        """Get a patron by ID as of the snapshot."""
+        return self._lookup(Patron, self._library._patrons_by_id, patron_id)
+
+    def get_patron_loans(self, patron_id: int) -> List[Loan]:
+        """Get all loans of a patron as of the snapshot."""
+        return [loan for loan in self.loans if loan.patron_id == patron_id]
+
+    def get_overdue_loans(self) -> List[Loan]:
+        """
+        Get the loans that were overdue when the snapshot was taken.
+        Candidates are the loans open now and due before then, found on the
+        library's due-date columns, plus the loans returned since the snapshot
+        (their preserved state is open); only those candidates are copied.
+        """
+        library = self._library
+        length = len(self.loans)
+        # Columns first, preserved states second: a loan returned in between is
+        # preserved before its open flag is cleared, so it is found either way
+        positions = set(library._open_loan_positions(None, to_epoch_micros(self.taken_at), length))
+        for (kind, loan_id), saved in list(self._shadow.items()):
+            if kind is Loan and saved.return_date is None:
+                positions.add(library._loan_position(loan_id))
+        loans = library.loans
+        overdue = []
+        for position in sorted(positions):
+            if position < length:
+                loan = self._read(loans[position])
+                if loan.return_date is None and loan.due_date < self.taken_at:
+                    overdue.append(loan)
+        return overdue
+
+
+class ShardedSnapshot:
+    """
+    Consistent view of every in-process shard of a ShardedLibrary at one point
+    in time. Remote shards cannot be snapshotted and are read live.
+    """
+
+    def __init__(self, parts: Sequence[Any]):
+        self._parts = list(parts)
+        self.taken_at = getattr(self._parts[0], "taken_at", None) or datetime.now()
+
+    def __enter__(self) -> "ShardedSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release every shard's snapshot."""
+        for part in self._parts:
+            if isinstance(part, LibrarySnapshot):
+                part.close()
+
+    def _part_for_id(self, record_id: int) -> LibrarySnapshot:
+        """Get the snapshot of the shard owning an ID (remote shards mirror its lookups)."""
+        part: LibrarySnapshot = self._parts[(record_id - 1) % len(self._parts)]
+        return part
+
+    @property
+    def titles(self) -> List[Title]:
+        """All titles across branches."""
+        return [t for part in self._parts for t in part.titles]
+
+    @property
+    def books(self) -> List[Book]:
+        """All books across branches."""
+        return [b for part in self._parts for b in part.books]
+
+    @property
+    def patrons(self) -> List[Patron]:
+        """All patrons across branches."""
+        return [p for part in self._parts for p in part.patrons]
+
+    @property
+    def loans(self) -> List[Loan]:
+        """All loans across branches."""
+        return [l for part in self._parts for l in part.loans]
+
+    def get_title(self, title_id: int) -> Optional[Title]:
+        """Get a title from the shard that owns it."""
+        return self._part_for_id(title_id).get_title(title_id)
+
+    def get_book(self, book_id: int) -> Optional[Book]:
+        """Get a book from the shard that owns it."""
+        return self._part_for_id(book_id).get_book(book_id)
+
+    def get_patron(self, patron_id: int) -> Optional[Patron]:
+        """Get a patron from the shard that owns it."""
+        return self._part_for_id(patron_id).get_patron(patron_id)
+
+    def get_patron_loans(self, patron_id: int) -> List[Loan]:
+        """Get a patron's loans from every branch."""
+        return [l for part in self._parts for l in part.get_patron_loans(patron_id)]
+
+    def get_overdue_loans(self) -> List[Loan]:
+        """Get overdue loans from every branch."""
+        return [l for part in self._parts for l in part.get_overdue_loans()]
+
+
+@contextmanager
+def read_view(library) -> Iterator[Any]:
+    """
+    Yield a snapshot of the library for a long read, or the library itself
+    when it cannot be snapshotted (e.g. a LibraryAPIClient).
+    """
+    take = getattr(library, "snapshot", None)
+    if take is None:
+        yield library
+        return
+    with take() as snapshot:
+        yield snapshot
@@ -0,0 +1,111 @@
+"""
+status_views.py
+---------------
+Paged, filtered and sorted status tables (books, patrons, overdue loans).
+Shared by the UI and the API service, so a UI in client mode asks the
+service for one page instead of downloading the whole catalog.
+"""
+
+import math
+from typing import Any, Callable, Dict, List, Tuple
+
+from .models import Book, Loan, Patron
+
+# Tables offered by the paginated status view, with their columns
+STATUS_COLUMNS = {
+    "Books": ("ID", "Title", "Author", "ISBN", "Status"),
+    "Patrons": ("ID", "Name", "Email", "Phone"),
+    "Overdue": ("Book ID", "Title", "Patron ID", "Patron", "Due Date"),
+}
+
+
+def overdue_details(source: Any) -> List[Tuple[Loan, Book, Patron]]:
+    """
+    Get the overdue loans of a library (or snapshot) joined to their book and patron.
+    Uses the source's own get_overdue_details when it has one (e.g. a
+    LibraryAPIClient, in one request), and indexed lookups by ID otherwise.
+    """
+    details = getattr(source, "get_overdue_details", None)
+    if details is not None:
+        joined: List[Tuple[Loan, Book, Patron]] = details()
+        return joined
+    return [
+        (loan, source.get_book(loan.book_id), source.get_patron(loan.patron_id))
+        for loan in source.get_overdue_loans()
+    ]
+
+
+def status_view(view: str, source: Any) -> Tuple[List[Any], Dict[str, Callable[[Any], Any]], Tuple[str, ...]]:
+    """
+    Get the records of a status view with its column getters and searchable columns.
+    Records are read from source, a snapshot of the library (or the library itself).
+    Overdue records are (loan, book, patron) triples.
+    """
+    if view == "Books":
+        columns = {
+            "ID": lambda b: b.id,
+            "Title": lambda b: b.title,
+            "Author": lambda b: b.author,
+            "ISBN": lambda b: b.isbn,
+            "Status": lambda b: "Available" if b.available else f"Borrowed by Patron #{b.borrowed_by}",
+        }
+        return source.books, columns, ("Title", "Author", "ISBN")
+    if view == "Patrons":
+        columns = {
+            "ID": lambda p: p.id,
+            "Name": lambda p: p.name,
+            "Email": lambda p: p.email,
+            "Phone": lambda p: p.phone,
+        }
+        return source.patrons, columns, ("Name", "Email", "Phone")
+    if view == "Overdue":
+        columns = {
+            "Book ID": lambda r: r[1].id,
+            "Title": lambda r: r[1].title,
+            "Patron ID": lambda r: r[2].id,
+            "Patron": lambda r: r[2].name,
+            "Due Date": lambda r: r[0].due_date.strftime('%Y-%m-%d'),
+        }
+        return overdue_details(source), columns, ("Title", "Patron")
+    raise ValueError(f"Unknown view: {view}")
+
+
+def status_page(source: Any, view: str, query: str = "", sort_by: str = "", descending: bool = False,
+                page: int = 1, page_size: int = 25) -> Dict[str, Any]:
+    """
+    Compute one page of a status view; only the rows of that page are formatted.
+
+    Args:
+        source: Library, snapshot or API client to read from.
+        view: One of the STATUS_COLUMNS views.
+        query: Case-insensitive text matched against the view's text columns.
+        sort_by: Column to sort on; the view's natural order when empty or unknown.
+        descending: Sort in descending order.
+        page: 1-based page number, clamped to the available pages.
+        page_size: Rows per page.
+
+    Returns:
+        {"headers", "data", "page", "pages", "total"}: the page's rows, the page
+        actually shown, the page count and the number of matching rows.
+    """
+    records, columns, searchable = status_view(view, source)
+    query = (query or "").strip().lower()
+    if query:
+        getters = [columns[name] for name in searchable]
+        records = [r for r in records if any(query in g(r).lower() for g in getters)]
+    if sort_by in columns:
+        records = sorted(records, key=columns[sort_by], reverse=descending)
+    elif descending:
+        records = records[::-1]
+    page_size = max(int(page_size), 1)
+    pages = max(math.ceil(len(records) / page_size), 1)
+    page = min(max(int(page or 1), 1), pages)
+    start = (page - 1) * page_size
+    getters = list(columns.values())
+    return {
+        "headers": list(columns),
+        "data": [[g(r) for g in getters] for r in records[start:start + page_size]],
+        "page": page,
+        "pages": pages,
+        "total": len(records),
+    }
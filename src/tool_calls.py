@@ -0,0 +1,148 @@
+"""
+tool_calls.py
+-------------
+Recovery of tool calls that an LLM wrote into its reply text instead of using
+the native tool_calls field, e.g. '[{"name": "list_books", "arguments": {}}]'.
+The reply is scanned once for balanced JSON arrays and objects (brackets inside
+strings are ignored), and each candidate is decoded at most once per enclosing
+candidate that failed to decode, so the cost stays linear in the reply length.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Characters that can change the scanner state; everything else is skipped in C
+_STRUCTURAL = re.compile(r'[\[\]{}"\\]')
+_CLOSERS = {"]": "[", "}": "{"}
+# What may follow an opening bracket in valid JSON; cheaply rejects "[sic]" and the like
+_JSON_START = re.compile(r'\[\s*(?:[\]\[{"\-0-9]|true|false|null)|\{\s*["}]')
+
+
+def _decode(text: str, span: Tuple[int, int]) -> Tuple[bool, Any]:
+    """Decode text[start:end] as JSON. Returns (ok, value)."""
+    if not _JSON_START.match(text, span[0]):
+        return False, None
+    try:
+        return True, json.loads(text[span[0]:span[1]])
+    except ValueError:
+        return False, None
+
+
+def _resolve(text: str, span: Tuple[int, int], children: List[Tuple[int, int]]) -> Iterator[Any]:
+    """
+    Decode a closed candidate, falling back to its directly nested candidates
+    when it is not valid JSON (e.g. prose in brackets around a JSON value).
+    """
+    ok, value = _decode(text, span)
+    if ok:
+        yield value
+        return
+    for child in children:
+        ok, value = _decode(text, child)
+        if ok:
+            yield value
+
+
+def iter_json_values(text: str) -> Iterator[Any]:
+    """
+    Yield the outermost JSON arrays and objects embedded in free text, in order.
+    Unbalanced or invalid brackets in the surrounding prose are skipped.
+    """
+    # Each open bracket: (opener, start offset, closed direct children spans)
+    stack: List[Tuple[str, int, List[Tuple[int, int]]]] = []
+    in_string = False
+    escaped_at = -1
+    for match in _STRUCTURAL.finditer(text):
+        ch = match.group()
+        pos = match.start()
+        if in_string:
+            if ch == "\\":
+                if escaped_at != pos:
+                    escaped_at = pos + 1
+            elif ch == '"' and escaped_at != pos:
+                in_string = False
+            continue
+        if ch == '"':
+            # Quotes only delimit strings inside a candidate; in prose they are text
+            in_string = bool(stack)
+        elif ch in "[{":
+            stack.append((ch, pos, []))
+        elif ch in _CLOSERS and stack:
+            opener, start, children = stack.pop()
+            if opener != _CLOSERS[ch]:
+                # Mismatched bracket: the open candidates were prose, start over
+                for _, _, closed in stack + [(opener, start, children)]:
+                    for child in closed:
+                        yield from _resolve(text, child, [])
+                stack.clear()
+                continue
+            span = (start, pos + 1)
+            if stack:
+                stack[-1][2].append(span)
+            else:
+                yield from _resolve(text, span, children)
+    # Candidates still open at the end of the text were prose; keep their closed contents
+    for _, _, children in stack:
+        for child in children:
+            yield from _resolve(text, child, [])
+
+
+def _as_call(item: Any) -> Optional[Dict[str, Any]]:
+    """Normalize one tool call dict ({"name", "arguments"} or OpenAI-style {"function": ...})."""
+    if not isinstance(item, dict):
+        return None
+    if isinstance(item.get("function"), dict):
+        item = item["function"]
+    name = item.get("name")
+    if not isinstance(name, str):
+        return None
+    arguments = item.get("arguments", item.get("parameters", {}))
+    if isinstance(arguments, str):
+        try:
+            arguments = json.loads(arguments) if arguments.strip() else {}
+        except ValueError:
+            return None
+    if not isinstance(arguments, dict):
+        return None
+    return {"name": name, "arguments": arguments}
+
+
+def parse_tool_calls(text: str, valid_names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Extract tool calls written as JSON in an LLM reply.
+    Accepts a list of calls or a single call object, each {"name", "arguments"}.
+
+    Args:
+        text: The reply text.
+        valid_names: Tool names to accept; calls to other names are ignored.
+
+    Returns:
+        A list of {"name", "arguments"} dicts, in the order they appear.
+    """
+    names = set(valid_names) if valid_names is not None else None
+    calls: List[Dict[str, Any]] = []
+    for value in iter_json_values(text):
+        items = value if isinstance(value, list) else [value]
+        parsed = [_as_call(item) for item in items]
+        found = [call for call in parsed if call is not None]
+        # A value with any malformed item is not a tool call list
+        if not found or len(found) < len(parsed):
+            continue
+        calls.extend(c for c in found if names is None or c["name"] in names)
+    return calls
+
+
+def as_openai_tool_calls(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Convert parsed calls to the OpenAI tool_calls format, so recovered calls
+    follow the same path as native ones.
+    """
+    return [
+        {
+            "id": f"call_{i}_{call['name']}",
+            "type": "function",
+            "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])},
+        }
+        for i, call in enumerate(calls)
+    ]
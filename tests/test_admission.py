@@ -0,0 +1,83 @@
+import threading
+import time
+import pytest
+from src.admission import AdmissionController, AdmissionRejected, TokenBucket
+
+def test_token_bucket_refills():
+    now = [0.0]
+    bucket = TokenBucket(rate=1.0, capacity=2, clock=lambda: now[0])
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    now[0] = 1.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+def test_session_rate_limit_is_per_session():
+    controller = AdmissionController(session_rate=0, session_burst=2)
+    for _ in range(2):
+        with controller.admit("alice"):
+            pass
+    with pytest.raises(AdmissionRejected) as rejected:
+        with controller.admit("alice"):
+            pass
+    assert rejected.value.reason == "rate_limited"
+    with controller.admit("bob"):
+        pass
+    assert controller.metrics()["rejected_rate_limited"] == 1
+
+def test_bounded_queue_and_fast_rejection():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5, session_burst=10)
+    release = threading.Event()
+    admitted = []
+
+    def worker(name):
+        with controller.admit(name):
+            admitted.append(name)
+            release.wait(5)
+
+    running = threading.Thread(target=worker, args=("a",))
+    running.start()
+    while controller.metrics()["in_flight"] == 0:
+        time.sleep(0.01)
+    queued = threading.Thread(target=worker, args=("b",))
+    queued.start()
+    while controller.metrics()["queue_depth"] == 0:
+        time.sleep(0.01)
+
+    start = time.perf_counter()
+    with pytest.raises(AdmissionRejected) as rejected:
+        with controller.admit("c"):
+            pass
+    assert rejected.value.reason == "saturated"
+    assert time.perf_counter() - start < 0.5
+
+    release.set()
+    running.join(5)
+    queued.join(5)
+    metrics = controller.metrics()
+    assert admitted == ["a", "b"]
+    assert (metrics["admitted"], metrics["in_flight"], metrics["queue_depth"]) == (2, 0, 0)
+    assert metrics["max_wait_ms"] > 0
+
+def test_queue_timeout():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05, session_burst=10)
+    with controller.admit("a"):
+        with pytest.raises(AdmissionRejected) as rejected:
+            with controller.admit("b"):
+                pass
+    assert rejected.value.reason == "timeout"
+    assert controller.metrics()["rejected_timeout"] == 1
+
+def test_rejected_request_keeps_its_rate_token():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05,
+                                     session_rate=0, session_burst=1)
+    with controller.admit("a"):
+        with pytest.raises(AdmissionRejected):
+            with controller.admit("b"):
+                pass
+    with controller.admit("b"):
+        pass
+    with pytest.raises(AdmissionRejected) as rejected:
+        with controller.admit("b"):
+            pass
+    assert rejected.value.reason == "rate_limited"
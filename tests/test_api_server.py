@@ -0,0 +1,98 @@
+import threading
+import time
+import pytest
+from src.api_client import LibraryAPIClient, LibraryAPIError
+from src.api_server import create_api_server
+from src.changefeed import CursorExpired
+from src.interface import LibraryInterface
+from src.library import LibrarySystem
+
+@pytest.fixture
+def client():
+    library = LibrarySystem()
+    server = create_api_server(library, port=0, workers=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield LibraryAPIClient(f"http://127.0.0.1:{server.server_port}")
+    server.shutdown()
+    server.server_close()
+
+def test_client_round_trip(client):
+    book = client.add_book("Test Book", "Test Author", "123-456-789")
+    patron = client.add_patron("John Doe", "john@example.com", "123-456-7890")
+    loan = client.borrow_book(book.id, patron.id, 7)
+    assert loan is not None
+    assert (loan.due_date - loan.loan_date).days == 7
+    assert client.borrow_book(book.id, patron.id) is None
+    assert client.get_book(book.id).borrowed_by == patron.id
+    assert [l.id for l in client.get_patron_loans(patron.id)] == [loan.id]
+    assert client.return_book(book.id) is True
+    assert client.return_book(book.id) is False
+    assert client.get_book(999) is None
+
+def test_client_tools(client):
+    client.add_book("Test Book", "Test Author", "123-456-789")
+    assert "Test Book" in client.execute_tool("list_books", {})
+    assert "borrow_book" in [t["name"] for t in client.get_tools()]
+
+def test_client_find_books(client):
+    book = client.add_book("The Great Gatsby", "F. Scott Fitzgerald", "978-0743273565")
+    [(found, score)] = client.find_books("great gatsbi", limit=1)
+    assert found.id == book.id and score > 0.5
+
+def test_unreachable_service():
+    with pytest.raises(LibraryAPIError):
+        LibraryAPIClient("http://127.0.0.1:9", timeout=1).books
+
+def test_client_patron_search(client):
+    jane = client.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
+    assert client.find_patron_by_email("JANE@example.com").id == jane.id
+    assert client.find_patron_by_phone("0987654321").id == jane.id
+    assert [p.id for p in client.find_patrons_by_name("smi")] == [jane.id]
+    assert client.find_patron_by_email("nobody@example.com") is None
+    with pytest.raises(LibraryAPIError):
+        client.add_patron("Jane Again", "jane@example.com", "555")
+
+def test_client_change_feed(client):
+    feed = client.get_changes()
+    start, stream = feed["latest_seq"], feed["stream_id"]
+    book = client.add_book("Dune", "Frank Herbert", "111")
+    patron = client.add_patron("Ann Lee", "ann@example.com", "555-0001")
+    client.borrow_book(book.id, patron.id)
+    feed = client.get_changes(after=start, stream_id=stream)
+    events = [c["event"] for c in feed["changes"]]
+    assert events == ["title_added", "book_added", "patron_added", "book_borrowed"]
+    assert [c["seq"] for c in feed["changes"]] == list(range(start + 1, start + 5))
+    assert feed["changes"][-1]["record"]["book_id"] == book.id
+    with pytest.raises(CursorExpired):
+        client.get_changes(after=feed["latest_seq"], stream_id="other")
+
+def test_client_status_page_and_overdue_details(client):
+    for i in range(5):
+        client.add_book(f"Book {i}", "Jane Austen" if i % 2 else "George Orwell", f"isbn-{i}")
+    patron = client.add_patron("John Doe", "john@example.com", "123-456-7890")
+    client.borrow_book(2, patron.id, days=-1)
+    page = client.status_page("Books", query="austen", sort_by="Title", descending=True, page_size=1)
+    assert page["data"] == [[4, "Book 3", "Jane Austen", "isbn-3", "Available"]]
+    assert (page["page"], page["pages"], page["total"]) == (1, 2, 2)
+    [(loan, book, owner)] = client.get_overdue_details()
+    assert (loan.book_id, book.title, owner.name) == (2, "Book 1", "John Doe")
+    assert client.status_page("Overdue")["data"][0][:4] == [2, "Book 1", patron.id, "John Doe"]
+    with pytest.raises(ValueError):
+        client.status_page("Nope")
+    interface = LibraryInterface(client)
+    assert interface.status_page("Books", page=2, page_size=3)[1] == "Page 2 of 2 (5 rows)"
+    assert "John Doe" in interface.list_overdue()
+
+def test_waiting_change_reads_are_capped(client):
+    # 4 workers: one change feed read may wait at a time
+    waiting = threading.Thread(target=client.get_changes, kwargs={"wait": 2})
+    waiting.start()
+    try:
+        time.sleep(0.5)
+        with pytest.raises(LibraryAPIError):
+            client.get_changes(wait=1)
+        assert client.get_changes()["changes"] == []
+        assert client.add_book("Dune", "Frank Herbert", "111").id == 1
+    finally:
+        waiting.join()
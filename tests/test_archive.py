@@ -0,0 +1,51 @@
+import pytest
+from src.archive import MAGIC, load_library, read_header, save_library
+from src.library import LibrarySystem
+
+def make_library():
+    library = LibrarySystem()
+    dune = library.add_book("Dune", "Frank Herbert", "111")
+    library.add_copies(dune.title_id, 1)
+    library.add_book("Émile", "Jean-Jacques Rousseau", "222")
+    ann = library.add_patron("Ann Lee", "ann@example.com", "555-0001")
+    bo = library.add_patron("Bo Chen", "bo@example.com", "555-0002")
+    library.borrow_book(1, ann.id)
+    library.borrow_book(2, ann.id)
+    library.return_book(1)
+    library.borrow_book(3, bo.id)
+    library.place_hold(3, ann.id)
+    return library
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_round_trip(tmp_path, compress):
+    library = make_library()
+    path = str(tmp_path / "library.arch")
+    save_library(library, path, compress=compress)
+    loaded = load_library(path)
+    assert loaded.titles == library.titles
+    assert loaded.books == library.books
+    assert loaded.patrons == library.patrons
+    assert loaded.loans == library.loans
+    assert loaded.get_stats() == library.get_stats()
+    assert loaded.get_hold_queue(3) == library.get_hold_queue(3)
+    assert loaded.find_patrons_by_name("bo") == library.find_patrons_by_name("bo")
+    # Loaded libraries keep working: IDs continue and returns hand off to holds
+    assert loaded.add_patron("Cy Diaz", "cy@example.com", "555-0003").id == 3
+    assert loaded.return_book(3)
+    assert loaded.get_book(3).borrowed_by == 1
+
+def test_header_and_invalid_files(tmp_path):
+    path = str(tmp_path / "library.arch")
+    save_library(make_library(), path)
+    header = read_header(path)
+    assert header["tables"]["loans"]["rows"] == 3
+    assert header["next_ids"]["book"] == 4
+    bad = tmp_path / "bad.arch"
+    bad.write_bytes(b"not an archive at all")
+    with pytest.raises(ValueError):
+        load_library(str(bad))
+    data = bytearray(open(path, "rb").read())
+    data[len(MAGIC) + 4:len(MAGIC) + 16] = b'{"version":9'
+    bad.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        load_library(str(bad))
@@ -0,0 +1,74 @@
+import threading
+import pytest
+from src.changefeed import ChangeFeed, CursorExpired
+from src.library import LibrarySystem
+
+def make_library():
+    library = LibrarySystem()
+    book = library.add_book("Dune", "Frank Herbert", "111")
+    patron = library.add_patron("Ann Lee", "ann@example.com", "555-0001")
+    return library, book, patron
+
+def test_changes_are_ordered_and_resumable():
+    library, book, patron = make_library()
+    feed = ChangeFeed(library)
+    library.borrow_book(book.id, patron.id)
+    library.return_book(book.id)
+    first = feed.read(0, limit=1)
+    assert [(c.seq, c.event, c.kind) for c in first] == [(1, "book_borrowed", "loan")]
+    rest = feed.read(first[-1].seq)
+    assert [c.event for c in rest] == ["book_returned"]
+    assert rest[0].record["return_date"] is not None
+    assert feed.read(rest[-1].seq) == []
+    feed.close()
+
+def test_expired_cursor_and_resync():
+    library, book, patron = make_library()
+    feed = ChangeFeed(library, capacity=2)
+    for i in range(4):
+        library.add_book(f"Book {i}", "Author", f"isbn-{i}")
+    with pytest.raises(CursorExpired) as error:
+        feed.read(0)
+    assert error.value.oldest == feed.latest_seq - 1
+    with pytest.raises(CursorExpired):
+        feed.read(feed.latest_seq + 1)
+    snapshot, seq = feed.resync()
+    assert seq == feed.latest_seq and len(snapshot.books) == 5
+    library.add_patron("Bo Chen", "bo@example.com", "555-0002")
+    assert [c.event for c in feed.read(seq)] == ["patron_added"]
+    snapshot.close()
+    feed.close()
+
+def test_read_waits_for_new_changes():
+    library, book, patron = make_library()
+    feed = ChangeFeed(library)
+    timer = threading.Timer(0.05, library.borrow_book, (book.id, patron.id))
+    timer.start()
+    assert [c.event for c in feed.read(0, timeout=5)] == ["book_borrowed"]
+    feed.close()
+
+def test_subscription_delivers_batches_and_retries():
+    library, book, patron = make_library()
+    feed = ChangeFeed(library)
+    received, failed = [], []
+    done = threading.Event()
+
+    def consume(batch):
+        if not failed:
+            failed.append(batch)
+            raise RuntimeError("index unavailable")
+        received.extend(batch)
+        if received[-1].seq == 3:
+            done.set()
+
+    subscription = feed.subscribe(consume, after=0, name="search-index")
+    subscription.RETRY_DELAY = 0.01
+    library.borrow_book(book.id, patron.id)
+    library.return_book(book.id)
+    library.add_patron("Bo Chen", "bo@example.com", "555-0002")
+    assert done.wait(5)
+    assert [c.seq for c in received] == [1, 2, 3]
+    assert subscription.lag == 0
+    assert feed.metrics()["subscriptions"] == {"search-index": 0}
+    feed.close()
+    assert subscription.closed
@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from src.clock import ManualClock
+from src.fines import FineEngine, FinePolicy, format_amount
+from src.library import LibrarySystem
+from src.mcp_server import LibraryMCPServer
+
+
+def make_library():
+    clock = ManualClock()
+    library = LibrarySystem(clock=clock)
+    library.add_book("Dune", "Frank Herbert", "978-0441172719")
+    library.add_book("Alien", "Ridley Scott", "DVD-0001")
+    library.add_book("Emma", "Jane Austen", "978-0141439587")
+    library.add_patron("John Doe", "john@example.com", "555-0001")
+    library.add_patron("Jane Smith", "jane@example.com", "555-0002")
+    return library, clock
+
+
+def dvd_or_book(book):
+    return "dvd" if book.isbn.startswith("DVD") else "book"
+
+
+def test_policy_grace_days_and_caps():
+    policy = FinePolicy(daily_rate=25, grace_days=2, max_fine=1000, caps={"dvd": 100})
+    day = 86400 * 10 ** 6
+    assert policy.fine(0, 2 * day, policy.cap_for("book")) == 0
+    assert policy.fine(0, 2 * day + 1, policy.cap_for("book")) == 25
+    assert policy.fine(0, 10 * day, policy.cap_for("book")) == 200
+    assert policy.fine(0, 100 * day, policy.cap_for("book")) == 1000
+    assert policy.fine(0, 10 * day, policy.cap_for("dvd")) == 100
+    assert format_amount(1205) == "$12.05"
+
+
+def test_policy_from_env(monkeypatch):
+    monkeypatch.setenv("FINE_DAILY_RATE", "50")
+    monkeypatch.setenv("FINE_CAPS", "book=1000, dvd=500")
+    policy = FinePolicy.from_env()
+    assert (policy.daily_rate, policy.grace_days, policy.max_fine) == (50, 0, None)
+    assert policy.caps == {"book": 1000, "dvd": 500}
+
+
+def test_bulk_pass_matches_incremental_balances():
+    library, clock = make_library()
+    library.borrow_book(1, 1, days=7)           # returned 3 days late
+    library.borrow_book(3, 2, days=14)          # returned on time
+    engine = FineEngine(library, FinePolicy(daily_rate=25, caps={"dvd": 100}), item_type=dvd_or_book)
+    library.borrow_book(2, 1, days=1)           # dvd, still out
+    clock.advance(days=10)
+    library.return_book(1)
+    library.return_book(3)
+    assert engine.patron_balance(1) == 75 + 100
+    assert engine.patron_balance(2) == 0
+    assert engine.loan_fines() == {1: 75, 3: 100}
+    assert engine.balances() == {1: 175}
+    assert engine.patron_fines(1) == [(1, 75), (3, 100)]
+    # Returned fines stay fixed while open loans keep accruing
+    clock.advance(days=30)
+    assert engine.balances() == {1: 175}
+    library.borrow_book(1, 2, days=1)
+    clock.advance(days=3)
+    assert engine.balances(clock() - timedelta(days=3)) == {1: 175}
+    assert engine.balances() == {1: 175, 2: 50}
+    assert engine.patron_balance(2) == 50
+
+
+def test_set_policy_and_seeding_from_history():
+    library, clock = make_library()
+    library.borrow_book(1, 1, days=1)
+    clock.advance(days=5)
+    library.return_book(1)
+    engine = FineEngine(library)
+    assert engine.patron_balance(1) == 4 * 25
+    engine.set_policy(FinePolicy(daily_rate=10, grace_days=1))
+    assert engine.patron_balance(1) == 3 * 10
+    engine.close()
+    library.borrow_book(1, 2, days=1)
+    clock.advance(days=5)
+    assert engine.balances() == {1: 30}
+
+
+def test_fine_tools():
+    library, clock = make_library()
+    server = LibraryMCPServer(library, fines=FineEngine(library, FinePolicy(daily_rate=25)))
+    assert server.execute_tool("get_fines", {}) == "No outstanding fines"
+    library.borrow_book(1, 1, days=1)
+    library.borrow_book(3, 2, days=1)
+    clock.advance(days=3)
+    library.return_book(1)
+    clock.advance(days=1)
+    assert server.execute_tool("get_fines", {}) == \
+        "Patron #2 Jane Smith | Fines: $0.75\nPatron #1 John Doe | Fines: $0.50"
+    assert server.execute_tool("get_patron_fines", {"patron_id": 1}) == \
+        "ID: 1 | Name: John Doe | Outstanding Fines: $0.50\nLoan #1 | Fine: $0.50"
+    assert server.execute_tool_structured("get_patron_fines", {"patron_id": 2}) == {
+        "patron_id": 2,
+        "name": "Jane Smith",
+        "balance_cents": 75,
+        "loans": {"fields": ["loan_id", "fine_cents"], "rows": [[2, 75]]},
+    }
+    assert server.execute_tool_structured("get_fines", {"limit": 1})["rows"] == [[2, "Jane Smith", 75]]
+    assert "error" in server.execute_tool_structured("get_patron_fines", {"patron_id": 99})
@@ -0,0 +1,36 @@
+import random
+
+from src.fuzzy import TrigramIndex, edit_distance, normalize_words
+
+
+def reference_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def test_edit_distance_matches_dynamic_programming():
+    rng = random.Random(0)
+    for _ in range(2000):
+        a = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 12)))
+        b = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 12)))
+        assert edit_distance(a, b) == reference_distance(a, b)
+    assert edit_distance("gatsbi", "gatsby") == 1
+
+
+def test_index_tolerates_typos_and_word_order():
+    index = TrigramIndex()
+    index.add(1, "The Great Gatsby F. Scott Fitzgerald")
+    index.add(2, "1984 George Orwell")
+    index.add(3, "To Kill a Mockingbird Harper Lee")
+    assert normalize_words("F. Scott-Fitzgerald") == ["f", "scott", "fitzgerald"]
+    assert index.search("Great Gatsbi")[0][0] == 1
+    assert index.search("orwell 1984") == [(2, index.search("1984 orwell")[0][1])]
+    assert index.search("mokingbird", limit=1)[0][0] == 3
+    assert index.search("xyzzy") == []
+    assert index.search("") == []
+    assert len(index) == 3
@@ -0,0 +1,11 @@
+import subprocess
+import sys
+
+def imported_modules(statement):
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(out.stdout.split())
+
+def test_core_imports_without_heavy_dependencies():
+    modules = imported_modules("import src.library, src.mcp_server, src.interface")
+    assert not {"gradio", "requests", "langsmith"} & modules
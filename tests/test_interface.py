@@ -0,0 +1,56 @@
+from src.interface import STATUS_COLUMNS, LibraryInterface
+from src.clock import ManualClock
+from src.library import LibrarySystem
+
+def make_interface(clock=None):
+    library = LibrarySystem(clock=clock or ManualClock())
+    for i in range(30):
+        library.add_book(f"Book {i:02d}", "Jane Austen" if i % 3 == 0 else "George Orwell", f"isbn-{i}")
+    library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    library.borrow_book(1, 1)
+    return LibraryInterface(library)
+
+def test_status_page_only_returns_visible_rows():
+    interface = make_interface()
+    table, summary, page = interface.status_page("Books", page=2, page_size=25)
+    assert table["headers"] == list(STATUS_COLUMNS["Books"])
+    assert [row[0] for row in table["data"]] == list(range(26, 31))
+    assert summary == "Page 2 of 2 (30 rows)"
+    assert page == 2
+
+def test_status_page_filters_and_sorts_in_backend():
+    interface = make_interface()
+    table, _, _ = interface.status_page("Books", query="austen", sort_by="Title", descending=True, page_size=3)
+    assert [row[1] for row in table["data"]] == ["Book 27", "Book 24", "Book 21"]
+    table, summary, page = interface.status_page("Books", query="austen", page=99, page_size=3)
+    assert page == 4 and summary.startswith("Page 4 of 4")
+    table, _, _ = interface.status_page("Books", query="no such book")
+    assert table["data"] == []
+
+def test_status_page_views():
+    interface = make_interface()
+    table, _, _ = interface.status_page("Patrons")
+    assert table["data"] == [[1, "John Doe", "john@example.com", "123-456-7890"]]
+    table, _, _ = interface.status_page("Books", page_size=1)
+    assert table["data"][0][4] == "Borrowed by Patron #1"
+    table, _, _ = interface.status_page("Overdue")
+    assert table["headers"] == list(STATUS_COLUMNS["Overdue"]) and table["data"] == []
+
+def test_cached_rows_follow_status_changes():
+    interface = make_interface()
+    assert interface.list_books().split("\n")[0].endswith("Borrowed by Patron #1")
+    book = interface.library.get_book(2)
+    assert interface.rows.book_row(book) is interface.rows.book_row(book)
+    interface.library.return_book(1)
+    assert interface.list_books().split("\n")[0] == "ID: 1 | Book 00 by Jane Austen | ISBN: isbn-0 | Available"
+
+def test_list_overdue_rows():
+    clock = ManualClock()
+    interface = make_interface(clock)
+    loan = interface.library.get_patron_loans(1)[0]
+    assert interface.list_overdue() == "No overdue books"
+    clock.advance(days=15)
+    assert interface.list_overdue() == "Book: Book 00 (ID: 1) | Patron: John Doe (ID: 1) | Due date: " + loan.due_date.strftime('%Y-%m-%d')
+    interface.library.return_book(1)
+    assert interface.list_overdue() == "No overdue books"
+    assert interface.rows._overdue_rows == {}
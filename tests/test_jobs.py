@@ -0,0 +1,115 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.jobs import JobManager
+from src.library import LibrarySystem
+from src.mcp_server import LibraryMCPServer
+from src.reporting import LoanColumns, circulation_report
+
+def make_library():
+    library = LibrarySystem()
+    for i in range(5):
+        library.add_book(f"Book {i}", "Author", f"isbn-{i}")
+    library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    library.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
+    for i in range(1, 6):
+        library.borrow_book(i, 1 + i % 2)
+    library.return_book(2)
+    return library
+
+def test_chunked_report_matches_in_process_report():
+    library = make_library()
+    jobs = JobManager(library, max_workers=2, chunk_size=2)
+    try:
+        job = jobs.submit("circulation_report")
+        assert jobs.wait(job.id, timeout=60).status == "done"
+        assert job.total_steps == 3 and job.progress == 1.0
+        expected = circulation_report(LoanColumns.from_library(library))
+        assert job.result["top_titles"] == expected["top_titles"]
+        assert job.result["loans_per_day"] == expected["loans_per_day"]
+        assert job.result["total_loans"] == 5
+    finally:
+        jobs.shutdown()
+
+def test_import_job_adds_valid_rows():
+    library = LibrarySystem()
+    jobs = JobManager(library, max_workers=1, chunk_size=2)
+    rows = [
+        ["  Dune ", "Frank Herbert", "978-0-441-17271-9"],
+        ["Emma", "Jane Austen", "0141439580"],
+        ["", "Nobody", "0141439580"],
+        ["Bad ISBN", "Author", "12345"],
+        ["too", "short"],
+    ]
+    try:
+        job = jobs.submit("import_books", {"rows": rows})
+        assert jobs.wait(job.id, timeout=60).status == "done"
+        assert job.result["added"] == 2
+        assert len(job.result["rejected"]) == 3
+        assert sorted(b.title for b in library.books) == ["Dune", "Emma"]
+    finally:
+        jobs.shutdown()
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.futures = []
+        self.calls = []
+        # Keeps the only worker busy until every chunk was submitted
+        self.gate = threading.Event()
+        super().submit(self.gate.wait)
+
+    def submit(self, fn, *args):
+        future = super().submit(fn, *args)
+        self.futures.append(future)
+        self.calls.append((fn, args))
+        return future
+
+class FailingLibrary(LibrarySystem):
+    def add_book(self, title, author, isbn):
+        raise RuntimeError("disk full")
+
+def test_failed_chunk_cancels_the_rest():
+    executor = RecordingExecutor()
+    jobs = JobManager(FailingLibrary(), chunk_size=1, executor=executor)
+    rows = [["Emma", "Jane Austen", "0141439580"]] * 20
+    try:
+        job = jobs.submit("import_books", {"rows": rows})
+        assert len(executor.futures) == 20
+        executor.gate.set()
+        assert jobs.wait(job.id, timeout=60).status == "failed"
+        assert job.error == "RuntimeError: disk full"
+        executor.shutdown(wait=True)
+        assert job.completed_steps == 0
+        assert all(f.cancelled() for f in executor.futures[1:])
+    finally:
+        jobs.shutdown()
+
+def test_report_chunks_are_exported_in_the_workers():
+    library = make_library()
+    executor = RecordingExecutor()
+    jobs = JobManager(library, chunk_size=2, executor=executor)
+    try:
+        job = jobs.submit("circulation_report")
+        executor.gate.set()
+        assert jobs.wait(job.id, timeout=60).status == "done"
+        # Workers get raw loan rows, not columns built in this process
+        assert [len(args[0]) for fn, args in executor.calls] == [2, 2, 1]
+        assert all(isinstance(args[0][0], tuple) for fn, args in executor.calls)
+        assert job.result["total_loans"] == 5
+    finally:
+        jobs.shutdown()
+
+def test_job_tools():
+    library = make_library()
+    server = LibraryMCPServer(library, jobs=JobManager(library, max_workers=1))
+    try:
+        assert server.execute_tool("submit_job", {"kind": "circulation_report"}).startswith("Job submitted! Job ID: 1")
+        server.jobs.wait(1, timeout=60)
+        status = server.execute_tool_structured("get_job_status", {"job_id": 1})
+        assert status["status"] == "done"
+        assert status["result"]["total_loans"] == 5
+        assert "Status: done" in server.execute_tool("get_job_status", {"job_id": 1})
+        assert "not found" in server.execute_tool("get_job_status", {"job_id": 9})
+        assert "error" in server.execute_tool_structured("submit_job", {"kind": "nope"})
+    finally:
+        server.jobs.shutdown()
@@ -1,6 +1,7 @@
 from datetime import datetime
 import pytest
 from src.models import Book, Patron, Loan
+from src.clock import ManualClock
 from src.library import LibrarySystem
 
 def test_add_book():
@@ -29,6 +30,14 @@ def test_borrow_book():
     assert loan.patron_id == patron.id
     assert loan.return_date is None
 
+def test_borrow_requires_registered_patron():
+    library = LibrarySystem()
+    book = library.add_book("Test Book", "Test Author", "123-456-789")
+    for patron_id in (0, -3, 42):
+        assert library.borrow_book(book.id, patron_id) is None
+        assert library.place_hold(book.id, patron_id) is None
+    assert book.available and not library.loans
+
 def test_return_book():
     library = LibrarySystem()
     book = library.add_book("Test Book", "Test Author", "123-456-789")
@@ -37,4 +46,157 @@ def test_return_book():
     loan = library.borrow_book(book.id, patron.id)
     assert library.return_book(book.id) == True
     assert book.available == True
-    assert book.borrowed_by is None
\ No newline at end of file
+    assert book.borrowed_by is None
+
+def test_failing_listener_does_not_skip_hand_off():
+    library = LibrarySystem()
+    book = library.add_book("Test Book", "Test Author", "123-456-789")
+    john = library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    jane = library.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
+    library.borrow_book(book.id, john.id)
+    hold = library.place_hold(book.id, jane.id)
+
+    def failing(event, record):
+        raise RuntimeError("listener down")
+    library.add_listener(failing)
+    assert library.return_book(book.id) == True
+    assert book.borrowed_by == jane.id
+    assert hold.loan_id == library.loans[-1].id
+    assert library.borrow_book(book.id, john.id) is None
+
+def test_hold_hand_off_on_return():
+    library = LibrarySystem()
+    book = library.add_book("Test Book", "Test Author", "123-456-789")
+    john = library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    jane = library.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
+    bob = library.add_patron("Bob Brown", "bob@example.com", "555-555-5555")
+
+    assert library.place_hold(book.id, john.id) is None  # available: borrow instead
+    library.borrow_book(book.id, john.id)
+    assert library.place_hold(book.id, john.id) is None  # already has it
+    jane_hold = library.place_hold(book.id, jane.id, days=7)
+    bob_hold = library.place_hold(book.id, bob.id)
+    assert library.place_hold(book.id, jane.id) is None  # already waiting
+    assert library.get_hold_queue(book.id) == [jane_hold, bob_hold]
+
+    assert library.cancel_hold(jane_hold.id) == True
+    assert library.cancel_hold(jane_hold.id) == False
+    assert library.return_book(book.id) == True
+    assert book.borrowed_by == bob.id
+    assert bob_hold.loan_id == library.loans[-1].id
+    assert library.get_hold_queue(book.id) == []
+
+    assert library.return_book(book.id) == True
+    assert book.available == True
+
+def test_copies_share_a_title():
+    library = LibrarySystem()
+    first = library.add_book("Test Book", "Test Author", "123-456-789")
+    copies = library.add_copies(first.title_id, 2)
+    other = library.add_book("Other Book", "Other Author", "987-654-321")
+    title = library.get_title(first.title_id)
+    assert [c.title_id for c in copies] == [title.id, title.id]
+    assert other.title_id != title.id
+    assert (title.total_copies, title.available_copies) == (3, 3)
+    assert library.get_title_by_isbn("123-456-789") is title
+
+def test_borrow_picks_any_free_copy():
+    library = LibrarySystem()
+    first = library.add_book("Test Book", "Test Author", "123-456-789")
+    second = library.add_book("Test Book", "Test Author", "123-456-789")
+    john = library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    jane = library.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
+    title = library.get_title(first.title_id)
+
+    assert library.borrow_book(first.id, john.id).book_id == first.id
+    assert library.borrow_book(first.id, jane.id).book_id == second.id
+    assert library.is_title_available(title.id) == False
+    assert library.borrow_book(second.id, jane.id) is None
+
+    bob = library.add_patron("Bob Brown", "bob@example.com", "555-555-5555")
+    hold = library.place_hold(first.id, bob.id)
+    assert library.return_book(second.id) == True
+    assert second.borrowed_by == bob.id
+    assert hold.loan_id is not None
+    library.return_book(first.id)
+    assert title.available_copies == 1
+
+def test_stats_counters():
+    library = LibrarySystem()
+    book = library.add_book("Test Book", "Test Author", "123-456-789")
+    library.add_copies(book.title_id, 2)
+    other = library.add_book("Other Book", "Other Author", "987-654-321")
+    john = library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    jane = library.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
+
+    library.borrow_book(book.id, john.id, days=-1)
+    library.borrow_book(book.id, john.id)
+    library.borrow_book(other.id, jane.id, days=-1)
+    stats = library.get_stats()
+    assert stats == {
+        "titles": 2, "books": 4, "available": 1, "on_loan": 3, "overdue": 2,
+        "patrons": 2, "active_patrons": 2, "holds_waiting": 0,
+    }
+    library.return_book(other.id)
+    library.return_book(book.id)
+    stats = library.get_stats()
+    assert (stats["available"], stats["overdue"], stats["active_patrons"]) == (3, 0, 1)
+
+def test_patron_lookup_indexes():
+    library = LibrarySystem()
+    john = library.add_patron("John Doe", "John@Example.com", "123-456-7890")
+    jane = library.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
+    janet = library.add_patron("Janet Jackson", "janet@example.com", "+1 555 0100")
+    assert library.find_patron_by_email("  JOHN@example.COM ") is john
+    assert library.find_patron_by_phone("(098) 765 4321") is jane
+    assert library.find_patron_by_email("nobody@example.com") is None
+    assert library.find_patron_by_phone("") is None
+    assert library.find_patrons_by_name("jan") == [jane, janet]
+    assert library.find_patrons_by_name("SMI") == [jane]
+    assert library.find_patrons_by_name("jane sm") == [jane]
+    assert library.find_patrons_by_name("jan", limit=1) == [jane]
+    assert library.find_patrons_by_name("x") == []
+    with pytest.raises(ValueError):
+        library.add_patron("Johnny", "john@example.com ", "111")
+    with pytest.raises(ValueError):
+        library.add_patron("Johnny", "johnny@example.com", "1234567890")
+    assert len(library.patrons) == 3
+
+def test_time_travel_with_manual_clock():
+    clock = ManualClock(datetime(2026, 3, 1, 12))
+    library = LibrarySystem(clock=clock)
+    short = library.add_book("Short Loan", "Author", "111")
+    long = library.add_book("Long Loan", "Author", "222")
+    john = library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    first = library.borrow_book(short.id, john.id, days=7)
+    second = library.borrow_book(long.id, john.id, days=21)
+    assert first.loan_date == datetime(2026, 3, 1, 12)
+    assert first.due_date == datetime(2026, 3, 8, 12)
+
+    clock.advance(days=5)
+    assert library.get_due_soon_loans(days=3) == [first]
+    assert library.get_overdue_loans() == []
+    clock.advance(days=3)
+    assert library.get_overdue_loans() == [first]
+    assert library.get_stats()["overdue"] == 1
+    assert library.get_due_soon_loans(days=14) == [second]
+
+    library.return_book(short.id)
+    assert first.return_date == datetime(2026, 3, 9, 12)
+    assert library.get_overdue_loans() == []
+    clock.set(datetime(2026, 4, 1))
+    assert library.get_overdue_loans() == [second]
+
+
+def test_find_books_fuzzy():
+    library = LibrarySystem()
+    gatsby = library.add_book("The Great Gatsby", "F. Scott Fitzgerald", "978-0743273565")
+    second = library.add_book("The Great Gatsby", "F. Scott Fitzgerald", "978-0743273565")
+    library.add_book("1984", "George Orwell", "978-0451524935")
+    patron = library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    [(book, score)] = library.find_books("great gatsbi", limit=1)
+    assert book is gatsby and 0 < score < 1
+    # One result per title, pointing at a free copy while there is one
+    library.borrow_book(gatsby.id, patron.id)
+    assert [b for b, _ in library.find_books("fitzgerald")] == [second]
+    assert library.find_books("Orwell 1984")[0][0].title == "1984"
@@ -0,0 +1,120 @@
+import threading
+import time
+import pytest
+from src.http_pool import JSONRequestHandler, PooledHTTPServer
+from src.llm_pool import (CircuitBreaker, Endpoint, LLMEndpointPool, LLMHTTPError,
+                          LLMUnavailableError)
+
+class MockLLMHandler(JSONRequestHandler):
+    """Answers chat completions, first playing back the server's scripted faults."""
+    def do_POST(self):
+        self.read_json()
+        server = self.server
+        with server.lock:
+            server.calls += 1
+            fault = server.faults.pop(0) if server.faults else None
+        if isinstance(fault, float):
+            time.sleep(fault)
+        elif isinstance(fault, int):
+            self.send_json(fault, {"error": "injected"})
+            return
+        try:
+            self.send_json(200, {"choices": [{"message": {"role": "assistant", "content": server.name}}]})
+        except OSError:
+            pass  # the client gave up waiting
+
+@pytest.fixture
+def mock_llm():
+    servers = []
+
+    def start(name, faults=()):
+        server = PooledHTTPServer(("127.0.0.1", 0), MockLLMHandler, max_workers=4)
+        server.name, server.faults, server.calls, server.lock = name, list(faults), 0, threading.Lock()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def reply(data):
+    return data["choices"][0]["message"]["content"]
+
+def make_pool(urls, **kwargs):
+    kwargs.setdefault("sleep", lambda seconds: None)
+    return LLMEndpointPool([Endpoint(url) for url in urls], timeout=2, **kwargs)
+
+def test_failover_to_healthy_endpoint(mock_llm):
+    _, bad = mock_llm("bad", faults=[503] * 10)
+    _, good = mock_llm("good")
+    pool = make_pool([bad, good])
+    assert reply(pool.post({"messages": []})) == "good"
+    health = {h["url"]: h for h in pool.health()}
+    assert health[bad]["failures"] == 1 and health[good]["successes"] == 1
+
+def test_retries_with_backoff_then_gives_up(mock_llm):
+    server, flaky = mock_llm("flaky", faults=[500, 500])
+    delays = []
+    pool = make_pool([flaky], retries=2, backoff=0.1, sleep=delays.append, rng=lambda: 0.5)
+    assert reply(pool.post({})) == "flaky"
+    assert delays == [0.05, 0.1]
+    server.faults = [500] * 3
+    with pytest.raises(LLMUnavailableError):
+        make_pool([flaky], retries=2).post({})
+
+def test_client_errors_are_not_retried(mock_llm):
+    server, url = mock_llm("strict", faults=[400])
+    with pytest.raises(LLMHTTPError) as error:
+        make_pool([url], retries=3).post({})
+    assert error.value.status == 400 and server.calls == 1
+
+def test_misconfigured_endpoint_counts_as_failure(mock_llm):
+    server, url = mock_llm("locked", faults=[401, 401])
+    pool = LLMEndpointPool([Endpoint(url, breaker=CircuitBreaker(2, 30))], timeout=2, retries=3)
+    for _ in range(2):
+        with pytest.raises(LLMHTTPError):
+            pool.post({})
+    assert server.calls == 2
+    [health] = pool.health()
+    assert health["failures"] == 2 and health["state"] == CircuitBreaker.OPEN
+
+def test_circuit_breaker_skips_failing_endpoint(mock_llm):
+    bad_server, bad = mock_llm("bad", faults=[500] * 10)
+    good_server, good = mock_llm("good")
+    now = [0.0]
+    pool = LLMEndpointPool(
+        [Endpoint(bad, breaker=CircuitBreaker(2, 30, clock=lambda: now[0])), Endpoint(good)],
+        timeout=2, retries=0,
+    )
+    pool.endpoints[1].latency = 10.0  # rank the bad endpoint first while its breaker is closed
+    for _ in range(4):
+        assert reply(pool.post({})) == "good"
+    assert bad_server.calls == 2 and pool.health()[0]["state"] == "open"
+    now[0] = 31.0
+    bad_server.faults = []
+    good_server.faults = [500]
+    # The open breaker lets one trial through once the reset timeout has passed
+    assert reply(pool.post({})) == "bad"
+    assert pool.health()[0]["state"] == "closed"
+
+def test_hedged_request_beats_slow_endpoint(mock_llm):
+    _, slow = mock_llm("slow", faults=[1.5])
+    _, fast = mock_llm("fast")
+    pool = make_pool([slow, fast], hedge_after=0.1)
+    start = time.perf_counter()
+    assert reply(pool.post({})) == "fast"
+    assert time.perf_counter() - start < 1.0
+
+def test_timeout_fails_over(mock_llm):
+    _, hung = mock_llm("hung", faults=[3.0])
+    _, good = mock_llm("good")
+    pool = LLMEndpointPool([Endpoint(hung), Endpoint(good)], timeout=0.3, retries=0)
+    assert reply(pool.post({})) == "good"
+
+def test_from_config(monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE_AFTER", "2.5")
+    pool = LLMEndpointPool.from_config("http://a/v1, http://b/v1", "key")
+    assert [e.url for e in pool.endpoints] == ["http://a/v1", "http://b/v1"]
+    assert pool.hedge_after == 2.5 and pool.endpoints[1].api_key == "key"
@@ -0,0 +1,86 @@
+import json
+import pytest
+from src.library import LibrarySystem
+from src.mcp_server import LibraryMCPServer
+
+def make_server(output_format="text"):
+    library = LibrarySystem()
+    library.add_book("Test Book", "Test Author", "123-456-789")
+    library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    return LibraryMCPServer(library, output_format=output_format)
+
+def test_text_output_unchanged():
+    server = make_server()
+    assert server.execute_tool("list_books", {}) == \
+        "ID: 1 | Test Book by Test Author | ISBN: 123-456-789 | Available"
+
+def test_json_list_books_is_compact_table():
+    server = make_server("json")
+    result = server.execute_tool("list_books", {})
+    assert " " not in result.replace("Test Book", "").replace("Test Author", "")
+    data = json.loads(result)
+    assert data["fields"] == ["id", "title", "author", "isbn", "available", "borrowed_by"]
+    assert data["rows"] == [[1, "Test Book", "Test Author", "123-456-789", True, None]]
+
+def test_json_field_selection():
+    server = make_server("json")
+    data = json.loads(server.execute_tool("get_all_books", {"fields": ["title", "id"]}))
+    assert data == {"fields": ["id", "title"], "rows": [[1, "Test Book"]]}
+    tool = next(t for t in server.get_tools() if t["name"] == "list_books")
+    assert "fields" in tool["inputSchema"]["properties"]
+
+def test_structured_borrow_and_patron_info():
+    server = make_server()
+    loan = server.execute_tool_structured("borrow_book", {"book_id": 1, "patron_id": 1})
+    assert loan["loan"]["book_id"] == 1
+    assert "return_date" not in loan["loan"]
+    info = server.execute_tool_structured("get_patron_info", {"patron_id": 1})
+    assert info["active_loans"] == 1
+    assert "error" in server.execute_tool_structured("borrow_book", {"book_id": 1, "patron_id": 1})
+
+def test_unknown_output_format():
+    with pytest.raises(ValueError):
+        LibraryMCPServer(LibrarySystem(), output_format="xml")
+
+def test_hold_tools():
+    server = make_server()
+    server.library.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
+    server.execute_tool("borrow_book", {"book_id": 1, "patron_id": 1})
+    assert server.execute_tool("place_hold", {"book_id": 1, "patron_id": 2}) == \
+        "Hold placed! Hold ID: 1, position in line: 1"
+    assert server.execute_tool_structured("cancel_hold", {"hold_id": 1}) == {"cancelled": 1}
+    assert "error" in server.execute_tool_structured("cancel_hold", {"hold_id": 1})
+
+def test_add_book_copies():
+    server = make_server()
+    assert server.execute_tool("add_book", {"title": "Hot", "author": "A", "isbn": "1", "copies": 3}) == \
+        "Book added successfully! ID: 2, Title: Hot, Copies: 3"
+    info = server.execute_tool_structured("get_book_info", {"book_id": 2})
+    assert (info["copies_available"], info["copies_total"]) == (3, 3)
+    assert server.execute_tool("get_book_info", {"book_id": 2}).endswith("Copies available: 3/3")
+
+def test_patron_lookup_tools():
+    server = make_server()
+    assert server.execute_tool("find_patron", {"email": "JOHN@example.com"}).startswith("ID: 1 | John Doe")
+    assert server.execute_tool("find_patron", {"phone": "1234567890"}).startswith("ID: 1 | John Doe")
+    assert server.execute_tool("find_patron", {"email": "x@example.com"}) == "No patron found with that email or phone"
+    assert server.execute_tool("search_patrons", {"name": "do"}).startswith("ID: 1 | John Doe")
+    result = server.execute_tool_structured("search_patrons", {"name": "john", "fields": ["id", "name"]})
+    assert result == {"fields": ["id", "name"], "rows": [(1, "John Doe")]}
+    assert "error" in server.execute_tool_structured("find_patron", {})
+
+def test_find_book_tool():
+    server = make_server()
+    assert server.execute_tool("find_book", {"query": "test bok"}) == \
+        "ID: 1 | Test Book by Test Author | ISBN: 123-456-789 | Available | Match: 0.83"
+    assert server.execute_tool("find_book", {"query": "xyzzy"}) == "No books matching 'xyzzy'"
+    data = server.execute_tool_structured("find_book", {"query": "author test book", "fields": ["id"]})
+    assert data == {"fields": ["id", "score"], "rows": [[1, 1.0]]}
+
+def test_text_output_is_rendered_from_structured_result():
+    server = make_server()
+    text, data, is_error = server.call_tool("get_book_info", {"book_id": 1, "fields": ["id"]})
+    assert text == "ID: 1 | Title: Test Book | Author: Test Author | ISBN: 123-456-789 | Status: Available"
+    assert data["title"] == "Test Book" and is_error is False
+    assert server.call_tool("nope", {}) == ("Unknown tool: nope", {"error": "Unknown tool: nope"}, True)
+    assert server.call_tool("borrow_book", {"book_id": 9, "patron_id": 1})[2] is True
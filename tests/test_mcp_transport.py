@@ -0,0 +1,90 @@
+import io
+import json
+import socket
+import threading
+import urllib.request
+from src.http_pool import JSONRequestHandler
+from src.library import LibrarySystem
+from src.mcp_server import LibraryMCPServer
+from src.mcp_transport import PROTOCOL_VERSION, MCPProtocolHandler, create_http_server, serve_stdio
+
+def make_handler(output_format="text"):
+    library = LibrarySystem()
+    library.add_book("Test Book", "Test Author", "123-456-789")
+    return MCPProtocolHandler(LibraryMCPServer(library, output_format=output_format))
+
+def request(method, params=None, msg_id=1):
+    return {"jsonrpc": "2.0", "id": msg_id, "method": method, "params": params or {}}
+
+def test_initialize_and_list_tools():
+    handler = make_handler()
+    init = handler.handle_message(request("initialize", {"protocolVersion": "2025-03-26"}))
+    assert init["result"]["capabilities"]["tools"] == {"listChanged": False}
+    assert init["result"]["protocolVersion"] == "2025-03-26"
+    unknown = handler.handle_message(request("initialize", {"protocolVersion": "1999-01-01"}))
+    assert unknown["result"]["protocolVersion"] == PROTOCOL_VERSION
+    assert handler.handle_message({"jsonrpc": "2.0", "method": "notifications/initialized"}) is None
+    tools = handler.handle_message(request("tools/list", msg_id=2))["result"]["tools"]
+    assert "borrow_book" in [t["name"] for t in tools]
+
+def test_tools_call_structured_content():
+    handler = make_handler("json")
+    result = handler.handle_message(request("tools/call", {"name": "get_book_info", "arguments": {"book_id": 1}}))
+    assert result["result"]["structuredContent"]["title"] == "Test Book"
+    assert result["result"]["isError"] is False
+
+def test_errors_and_batches():
+    handler = make_handler()
+    assert handler.handle_message(request("nope"))["error"]["code"] == -32601
+    assert json.loads(handler.handle_line("{not json"))["error"]["code"] == -32700
+    assert handler.handle_message(request("tools/call", ["list_books"]))["error"]["code"] == -32602
+    assert handler.handle_message(
+        request("tools/call", {"name": "list_books", "arguments": [1]})
+    )["error"]["code"] == -32602
+    batch = handler.handle_message([request("ping", msg_id=1), request("ping", msg_id=2)])
+    assert [r["id"] for r in batch] == [1, 2]
+    failed = handler.handle_message(request("tools/call", {"name": "get_book_info", "arguments": {"book_id": 99}}))
+    assert failed["result"]["isError"] is True
+
+def test_stdio_transport():
+    handler = make_handler()
+    stdin = io.StringIO("\n".join(json.dumps(request("ping", msg_id=i)) for i in range(5)) + "\n")
+    stdout = io.StringIO()
+    serve_stdio(handler, stdin, stdout, workers=2)
+    ids = sorted(json.loads(line)["id"] for line in stdout.getvalue().splitlines())
+    assert ids == [0, 1, 2, 3, 4]
+
+def test_http_transport():
+    server = create_http_server(make_handler(), port=0, workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        body = json.dumps(request("tools/call", {"name": "list_books", "arguments": {}})).encode()
+        req = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_port}/mcp", data=body,
+            headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            data = json.loads(resp.read())
+        assert "Test Book" in data["result"]["content"][0]["text"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_idle_connection_releases_its_worker(monkeypatch):
+    monkeypatch.setattr(JSONRequestHandler, "timeout", 0.2)
+    server = create_http_server(make_handler(), port=0, workers=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    idle = socket.create_connection(("127.0.0.1", server.server_port))
+    try:
+        body = json.dumps(request("ping")).encode()
+        req = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_port}/mcp", data=body,
+            headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            assert json.loads(resp.read())["result"] == {}
+    finally:
+        idle.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,49 @@
+import time
+from src.library import LibrarySystem
+from src.overdue import OverdueScanner, QueueSink, WebhookSink
+
+def make_library():
+    library = LibrarySystem()
+    for i in range(3):
+        library.add_book(f"Book {i}", "Author", f"isbn-{i}")
+    library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    return library
+
+def test_scanner_reports_new_overdue_loans_once():
+    library = make_library()
+    sink = QueueSink()
+    scanner = OverdueScanner(library, sink)
+    scanner.start()
+    try:
+        loan = library.borrow_book(1, 1, days=0.5 / 86400)
+        library.borrow_book(2, 1, days=14)
+        assert sink.queue.get(timeout=5) is loan
+        time.sleep(0.1)
+        assert sink.queue.empty()
+    finally:
+        scanner.stop(timeout=5)
+
+def test_returned_loans_are_not_reported():
+    library = make_library()
+    sink = QueueSink()
+    scanner = OverdueScanner(library, sink)
+    scanner.start()
+    try:
+        library.borrow_book(1, 1, days=0.2 / 86400)
+        library.return_book(1)
+        late = library.borrow_book(2, 1, days=0.3 / 86400)
+        assert sink.queue.get(timeout=5) is late
+        time.sleep(0.1)
+        assert sink.queue.empty()
+    finally:
+        scanner.stop(timeout=5)
+
+def test_existing_loans_are_seeded_on_start():
+    library = make_library()
+    loan = library.borrow_book(3, 1, days=-1)
+    sink = WebhookSink("http://example.invalid/hook")
+    scanner = OverdueScanner(library, sink)
+    scanner.start()
+    scanner.stop(timeout=5)
+    assert len(sink.sent) == 1
+    assert f'"id": {loan.id}' in sink.sent[0]
@@ -0,0 +1,96 @@
+import os
+import pstats
+import threading
+import time
+import urllib.request
+import json
+from src.api_server import create_api_server
+from src.library import LibrarySystem
+from src.mcp_server import LibraryMCPServer
+from src.profiling import MethodStats, SamplingProfiler
+
+def test_method_stats_install_and_uninstall(tmp_path):
+    original = LibrarySystem.borrow_book
+    stats = MethodStats()
+    stats.install([LibrarySystem, LibraryMCPServer])
+    try:
+        library = LibrarySystem()
+        server = LibraryMCPServer(library)
+        server.execute_tool("add_book", {"title": "T", "author": "A", "isbn": "1"})
+        server.execute_tool("list_books", {})
+        server.execute_tool("list_books", {})
+    finally:
+        stats.uninstall()
+    assert LibrarySystem.borrow_book is original
+    rows = {row["name"]: row for row in stats.snapshot()}
+    assert rows["LibraryMCPServer.execute_tool"]["calls"] == 3
+    assert rows["LibraryMCPServer.execute_tool[list_books]"]["calls"] == 2
+    assert rows["LibrarySystem.add_book"]["calls"] == 1
+    top = rows["LibraryMCPServer.execute_tool"]
+    assert top["own_ms"] <= top["cumulative_ms"]
+
+    path = str(tmp_path / "methods.pstats")
+    stats.dump_pstats(path)
+    names = {func[2] for func in pstats.Stats(path).stats}
+    assert "LibrarySystem.add_book" in names
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_sampling_profiler_dumps(tmp_path):
+    sampler = SamplingProfiler(interval=0.001)
+    sampler.start()
+    worker = threading.Thread(target=busy_wait, args=(0.2,))
+    worker.start()
+    worker.join()
+    sampler.stop()
+    assert any("busy_wait" in line for line in sampler.collapsed())
+    collapsed = str(tmp_path / "samples.collapsed")
+    sampler.dump_collapsed(collapsed)
+    assert open(collapsed).read().split("\n")[0].rsplit(" ", 1)[1].isdigit()
+    path = str(tmp_path / "samples.pstats")
+    sampler.dump_pstats(path)
+    assert any(func[2] == "busy_wait" for func in pstats.Stats(path).stats)
+
+def test_admin_endpoint_requires_token(monkeypatch, tmp_path):
+    server = create_api_server(LibrarySystem(), port=0, workers=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    def call(method, path, body=None, token=None):
+        request = urllib.request.Request(base + path, method=method, data=json.dumps(body or {}).encode(),
+                                         headers={"X-Admin-Token": token} if token else {})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+    try:
+        monkeypatch.delenv("LIBRARY_ADMIN_TOKEN", raising=False)
+        assert call("GET", "/admin/profile")[0] == 404
+        monkeypatch.setenv("LIBRARY_ADMIN_TOKEN", "secret")
+        assert call("GET", "/admin/profile", token="wrong")[0] == 403
+        status, data = call("POST", "/admin/profile/start", {"modes": ["stats"]}, token="secret")
+        assert status == 200 and data["stats"] is True
+        call("POST", "/books", {"title": "T", "author": "A", "isbn": "1"})
+        monkeypatch.setenv("LIBRARY_PROFILE_DIR", str(tmp_path / "profiles"))
+        assert call("POST", "/admin/profile/stop", {"dump_dir": "../elsewhere"}, token="secret")[0] == 400
+        status, data = call("POST", "/admin/profile/stop", {"dump_dir": "run"}, token="secret")
+        assert status == 200 and data["stats"] is False
+        assert any(row["name"] == "LibrarySystem.add_book" for row in data["methods"])
+        assert data["files"] and all(os.path.exists(path) for path in data["files"])
+        assert all(path.startswith(os.path.realpath(tmp_path / "profiles" / "run")) for path in data["files"])
+        monkeypatch.setenv("LIBRARY_ARCHIVE_DIR", str(tmp_path / "archives"))
+        assert call("POST", "/admin/archive", {"path": str(tmp_path / "out.arch")}, token="secret")[0] == 400
+        status, data = call("POST", "/admin/archive", {"path": "library.arch"}, token="secret")
+        assert status == 200 and data["path"] == os.path.realpath(tmp_path / "archives" / "library.arch")
+        assert os.path.exists(data["path"])
+    finally:
+        from src.profiling import PROFILER
+        PROFILER.stop()
+        PROFILER.reset()
+        server.shutdown()
+        server.server_close()
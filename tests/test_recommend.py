@@ -0,0 +1,60 @@
+from src.library import LibrarySystem
+from src.mcp_server import LibraryMCPServer
+from src.recommend import CoBorrowIndex
+
+
+def make_library(titles=5, patrons=4):
+    library = LibrarySystem()
+    for i in range(titles):
+        library.add_book(f"Book {i + 1}", "Author", f"isbn-{i + 1}")
+    for i in range(patrons):
+        library.add_patron(f"Patron {i + 1}", f"p{i + 1}@example.com", f"555-000{i + 1}")
+    return library
+
+
+def lend(library, patron_id, *book_ids):
+    for book_id in book_ids:
+        library.borrow_book(book_id, patron_id)
+        library.return_book(book_id)
+
+
+def test_counts_patrons_who_borrowed_both():
+    library = make_library()
+    lend(library, 1, 1, 2, 3)
+    index = CoBorrowIndex(library)     # seeded from the history so far
+    lend(library, 2, 1, 2)
+    lend(library, 3, 1, 4, 1)          # borrowing a title again adds nothing
+    assert [(b.id, n) for b, n in index.recommend(1)] == [(2, 2), (3, 1), (4, 1)]
+    assert [(b.id, n) for b, n in index.recommend(4)] == [(1, 1)]
+    assert [(b.id, n) for b, n in index.recommend(2, limit=1)] == [(1, 2)]
+    assert index.recommend(5) == [] and index.recommend(99) == []
+
+
+def test_memory_is_bounded():
+    library = make_library(titles=30, patrons=6)
+    index = CoBorrowIndex(library, top_k=2, max_neighbors=3, history=4, max_patrons=3)
+    for patron_id in range(1, 7):
+        lend(library, patron_id, *range(1, 31))
+    metrics = index.metrics()
+    assert metrics["patrons"] == 3
+    assert all(len(counts) <= 6 for counts in index._counts.values())
+    assert all(len(top) <= 2 for top in index._top.values())
+    assert [(b.id, n) for b, n in index.recommend(30)] == [(26, 6), (27, 6)]
+
+
+def test_recommend_books_tool():
+    library = make_library()
+    server = LibraryMCPServer(library)
+    assert server.execute_tool("recommend_books", {"book_id": 1}) == "No recommendations yet for 'Book 1'"
+    lend(library, 1, 1, 2)
+    lend(library, 2, 1, 2, 3)
+    assert server.execute_tool("recommend_books", {"book_id": 1}) == (
+        "ID: 2 | Book 2 by Author | ISBN: isbn-2 | Available | Also borrowed by 2 patrons\n"
+        "ID: 3 | Book 3 by Author | ISBN: isbn-3 | Available | Also borrowed by 1 patron"
+    )
+    data = server.execute_tool_structured("recommend_books", {"book_id": 3, "limit": 1})
+    assert data == {"fields": ["id", "title", "author", "isbn", "available", "borrowed_by", "patrons"],
+                    "rows": [[1, "Book 1", "Author", "isbn-1", True, None, 1]]}
+    assert "error" in server.execute_tool_structured("recommend_books", {"book_id": 99})
+    server.close()
+    assert not library._listeners
@@ -0,0 +1,38 @@
+from datetime import date, datetime
+from src.library import LibrarySystem
+from src.reporting import LoanColumns, circulation_report, top_titles
+
+def test_circulation_report():
+    library = LibrarySystem()
+    hot = library.add_book("Hot", "A", "1")
+    library.add_copies(hot.title_id, 1)
+    cold = library.add_book("Cold", "B", "2")
+    john = library.add_patron("John Doe", "john@example.com", "123-456-7890")
+    jane = library.add_patron("Jane Smith", "jane@example.com", "098-765-4321")
+
+    first = library.borrow_book(hot.id, john.id)
+    second = library.borrow_book(hot.id, jane.id)
+    third = library.borrow_book(cold.id, jane.id)
+    first.loan_date = datetime(2026, 1, 1, 10)
+    first.due_date = datetime(2026, 1, 15, 10)
+    second.loan_date = datetime(2026, 1, 1, 12)
+    second.due_date = datetime(2026, 1, 15, 12)
+    third.loan_date = datetime(2026, 1, 2, 9)
+    third.due_date = datetime(2026, 1, 16, 9)
+    library.return_book(hot.id)
+    first.return_date = datetime(2026, 1, 5, 10)
+    library.return_book(cold.id)
+    third.return_date = datetime(2026, 1, 20, 9)
+
+    cols = LoanColumns.from_library(library)
+    report = circulation_report(cols, now=datetime(2026, 2, 1))
+    assert report["total_loans"] == 3
+    assert report["loans_per_day"] == {date(2026, 1, 1): 2, date(2026, 1, 2): 1}
+    assert report["top_titles"] == [(hot.title_id, 2), (cold.title_id, 1)]
+    assert report["average_loan_days"] == 11
+    assert report["overdue_rate_by_patron"] == {john.id: 0.0, jane.id: 1.0}
+
+def test_empty_history():
+    cols = LoanColumns()
+    assert top_titles(cols) == []
+    assert circulation_report(cols)["average_loan_days"] is None
@@ -0,0 +1,139 @@
+import threading
+import time
+import pytest
+from src.api_client import LibraryAPIClient
+from src.api_server import create_api_server
+from src.library import LibrarySystem
+from src.mcp_server import LibraryMCPServer
+from src.sharding import ShardedLibrary
+
+def test_ids_are_globally_unique_and_routed():
+    library = ShardedLibrary(["north", "south", "east"])
+    books = [library.add_book(f"Book {i}", "Author", f"isbn-{i}", branch=b)
+             for i, b in enumerate(["north", "south", "east", "south"])]
+    assert len({b.id for b in books}) == 4
+    assert [library.branch_for_id(b.id) for b in books] == ["north", "south", "east", "south"]
+    assert all(library.get_book(b.id) is b for b in books)
+    with pytest.raises(ValueError):
+        library.add_book("Book", "Author", "isbn", branch="west")
+
+def test_cross_branch_borrow_and_stats():
+    library = ShardedLibrary(["north", "south"])
+    book = library.add_book("Test Book", "Test Author", "123-456-789", branch="south")
+    patron = library.add_patron("John Doe", "john@example.com", "123-456-7890", branch="north")
+    assert library.borrow_book(book.id, patron.id + 2) is None  # unknown patron of north
+    loan = library.borrow_book(book.id, patron.id)
+    assert loan.book_id == book.id
+    assert library.shard_for_id(book.id).loans == [loan]
+    assert library.get_patron_loans(patron.id) == [loan]
+    assert library.get_stats()["on_loan"] == 1
+    assert library.get_branch_stats()["north"]["on_loan"] == 0
+    assert library.return_book(book.id) is True
+
+def test_patron_lookup_across_branches():
+    library = ShardedLibrary(["north", "south"])
+    john = library.add_patron("John Doe", "john@example.com", "123-456-7890", branch="north")
+    jane = library.add_patron("Jane Doe", "jane@example.com", "098-765-4321", branch="south")
+    assert library.find_patron_by_email("JANE@example.com") is jane
+    assert library.find_patron_by_phone("1234567890") is john
+    assert library.find_patrons_by_name("doe") == [john, jane]
+    with pytest.raises(ValueError):
+        library.add_patron("John Again", "john@example.com", "555", branch="south")
+
+def test_concurrent_registrations_keep_email_unique():
+    library = ShardedLibrary(["north", "south", "east", "west"])
+    find = library.find_patron_by_email
+
+    def slow_find(email):
+        # Widen the window between the uniqueness check and the insert
+        found = find(email)
+        time.sleep(0.01)
+        return found
+
+    library.find_patron_by_email = slow_find
+    barrier = threading.Barrier(4)
+    results = []
+
+    def register(branch):
+        barrier.wait()
+        try:
+            results.append(library.add_patron("Ann Lee", "ann@example.com", "", branch=branch))
+        except ValueError:
+            results.append(None)
+
+    threads = [threading.Thread(target=register, args=(b,)) for b in library.branches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(r is not None for r in results) == 1
+
+def test_registration_does_not_hold_other_shard_locks():
+    library = ShardedLibrary(["north", "south"])
+    done = threading.Event()
+
+    def register():
+        library.add_patron("Ann Lee", "ann@example.com", "555-0100", branch="north")
+        done.set()
+
+    with library.shard_for_branch("south")._lock:
+        threading.Thread(target=register).start()
+        assert done.wait(5)
+    with pytest.raises(ValueError):
+        library.add_patron("Ann Again", "ANN@example.com ", "", branch="south")
+    with pytest.raises(ValueError):
+        library.add_patron("Ann Again", "other@example.com", "(555) 0100", branch="south")
+    # A rejected registration releases its reservations
+    assert library.add_patron("Bo Chen", "other@example.com", "", branch="south") is not None
+
+def test_standalone_library_owns_every_id():
+    library = LibrarySystem()
+    assert library.borrow_book(library.add_book("B", "A", "1").id, 99) is None
+
+def test_shard_only_trusts_sibling_patron_ids():
+    shard = LibrarySystem(id_start=1, id_step=2, sibling_patrons=True)
+    book = shard.add_book("B", "A", "1")
+    for patron_id in (0, -3, 3):
+        assert shard.borrow_book(book.id, patron_id) is None
+        assert shard.place_hold(book.id, patron_id) is None
+    assert shard.borrow_book(book.id, 2).patron_id == 2
+
+def test_mcp_server_over_sharded_library():
+    library = ShardedLibrary(["north", "south"])
+    server = LibraryMCPServer(library)
+    assert server.execute_tool("add_book", {"title": "T", "author": "A", "isbn": "1"}).startswith("Book added")
+    library.add_patron("John Doe", "john@example.com", "123-456-7890", branch="south")
+    assert "Due date" in server.execute_tool("borrow_book", {"book_id": 1, "patron_id": 2})
+
+def test_mcp_server_over_remote_shards_without_listeners():
+    # Nothing is listening on the shard URLs: building the server must not call them
+    clients = [LibraryAPIClient(f"http://127.0.0.1:9/{i}") for i in range(2)]
+    server = LibraryMCPServer(ShardedLibrary(["north", "south"], clients))
+    assert server.execute_tool("get_fines", {}) == "Fines are not available for this library"
+    assert server.execute_tool_structured("recommend_books", {"book_id": 1}) == \
+        {"error": "Recommendations are not available for this library"}
+
+def test_remote_shards():
+    servers = [create_api_server(LibrarySystem(id_start=i + 1, id_step=2, sibling_patrons=True), port=0, workers=2) for i in range(2)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        clients = [LibraryAPIClient(f"http://127.0.0.1:{s.server_port}") for s in servers]
+        library = ShardedLibrary(["north", "south"], clients)
+        book = library.add_book("Test Book", "Test Author", "123-456-789", branch="south")
+        patron = library.add_patron("John Doe", "john@example.com", "123-456-7890", branch="north")
+        assert (book.id, patron.id) == (2, 1)
+        assert library.borrow_book(book.id, patron.id).patron_id == patron.id
+        assert library.get_stats()["on_loan"] == 1
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+def test_find_books_across_branches():
+    library = ShardedLibrary(["north", "south"])
+    gatsby = library.add_book("The Great Gatsby", "F. Scott Fitzgerald", "1", branch="south")
+    library.add_book("The Great Escape", "Paul Brickhill", "2", branch="north")
+    matches = library.find_books("great gatsbi", limit=2)
+    assert matches[0][0] is gatsby
+    assert len(matches) == 2 and matches[0][1] > matches[1][1]
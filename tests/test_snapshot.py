@@ -0,0 +1,85 @@
+import threading
+from src.clock import ManualClock
+from src.library import LibrarySystem
+from src.sharding import ShardedLibrary
+
+def make_library():
+    library = LibrarySystem()
+    book = library.add_book("Dune", "Frank Herbert", "111")
+    library.add_book("Emma", "Jane Austen", "222")
+    patron = library.add_patron("Ann Lee", "ann@example.com", "555-0001")
+    return library, book, patron
+
+def test_snapshot_is_point_in_time():
+    library, book, patron = make_library()
+    loan = library.borrow_book(book.id, patron.id)
+    with library.snapshot() as snap:
+        library.return_book(book.id)
+        library.borrow_book(book.id, patron.id)
+        new_book = library.add_book("Dune", "Frank Herbert", "111")
+        library.add_patron("Bo Chen", "bo@example.com", "555-0002")
+
+        assert [b.id for b in snap.books] == [1, 2]
+        assert snap.books[0].available is False
+        assert len(snap.loans) == 1 and snap.loans[0].return_date is None
+        assert len(snap.patrons) == 1
+        assert snap.get_book(new_book.id) is None
+        assert snap.get_title(book.title_id).total_copies == 1
+        assert snap.get_title(book.title_id).available_copies == 0
+        assert snap.get_patron_loans(patron.id)[0].id == loan.id
+    # Live records are untouched by reads and the snapshot is released
+    assert loan.return_date is not None
+    assert library.get_title(book.title_id).total_copies == 2
+    assert not library._snapshots
+
+def test_snapshots_of_different_epochs():
+    library, book, patron = make_library()
+    first = library.snapshot()
+    library.borrow_book(book.id, patron.id)
+    second = library.snapshot()
+    library.return_book(book.id)
+    assert first.get_book(book.id).available is True
+    assert second.get_book(book.id).available is False
+    assert library.get_book(book.id).available is True
+    first.close()
+    second.close()
+
+def test_reading_a_snapshot_does_not_block_writers():
+    library, book, patron = make_library()
+    with library.snapshot() as snap:
+        records = iter(snap.books)
+        next(records)
+        worker = threading.Thread(target=library.borrow_book, args=(book.id, patron.id))
+        worker.start()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+        assert library.get_book(book.id).available is False
+        assert snap.books[0].available is True
+
+def test_sharded_snapshot():
+    library = ShardedLibrary(["north", "south"])
+    north = library.add_book("Dune", "Frank Herbert", "111", branch="north")
+    south = library.add_book("Emma", "Jane Austen", "222", branch="south")
+    patron = library.add_patron("Ann Lee", "ann@example.com", "555-0001")
+    with library.snapshot() as snap:
+        library.borrow_book(south.id, patron.id)
+        assert {b.id for b in snap.books} == {north.id, south.id}
+        assert snap.get_book(south.id).available is True
+        assert snap.loans == []
+
+def test_overdue_loans_as_of_snapshot():
+    clock = ManualClock()
+    library = LibrarySystem(clock=clock)
+    patron = library.add_patron("Ann Lee", "ann@example.com", "555-0001")
+    books = [library.add_book(f"Book {i}", "Author", f"isbn-{i}") for i in range(6)]
+    for i, book in enumerate(books[:4]):
+        library.borrow_book(book.id, patron.id, days=1 + 2 * (i % 2))   # due in 1 or 3 days
+    library.return_book(books[0].id)
+    clock.advance(days=2)
+    with library.snapshot() as snap:
+        library.return_book(books[2].id)          # overdue at the snapshot, returned since
+        library.borrow_book(books[4].id, patron.id, days=-1)
+        clock.advance(days=2)
+        assert [l.book_id for l in snap.get_overdue_loans()] == [books[2].id]
+        assert snap.get_overdue_loans()[0].return_date is None
+    assert [l.book_id for l in library.get_overdue_loans()] == [books[1].id, books[3].id, books[4].id]
@@ -0,0 +1,33 @@
+import json
+import time
+from src.tool_calls import as_openai_tool_calls, iter_json_values, parse_tool_calls
+
+def test_calls_embedded_in_prose():
+    text = 'Sure [checking now]: [{"name": "borrow_book", "arguments": {"book_id": 1, "patron_id": 2}}, {"name": "get_stats"}]'
+    assert parse_tool_calls(text) == [
+        {"name": "borrow_book", "arguments": {"book_id": 1, "patron_id": 2}},
+        {"name": "get_stats", "arguments": {}},
+    ]
+
+def test_nested_arrays_and_brackets_in_strings():
+    text = 'Call {"name": "add_book", "arguments": {"title": "A [b] {c}", "isbn": "\\"]", "tags": [[1, 2], [3]]}} done'
+    assert parse_tool_calls(text, {"add_book"}) == [
+        {"name": "add_book", "arguments": {"title": "A [b] {c}", "isbn": '"]', "tags": [[1, 2], [3]]}}
+    ]
+
+def test_unbalanced_prose_and_unknown_tools():
+    text = 'Well (see [1 and {x) [{"name": "list_books", "arguments": "{}"}] [{"name": "rm_rf"}]'
+    assert parse_tool_calls(text, {"list_books"}) == [{"name": "list_books", "arguments": {}}]
+    assert list(iter_json_values("no json here [at all")) == []
+    assert parse_tool_calls("[1, 2, 3]") == []
+
+def test_openai_format():
+    calls = as_openai_tool_calls([{"name": "list_books", "arguments": {"fields": ["id"]}}])
+    assert calls[0]["type"] == "function"
+    assert json.loads(calls[0]["function"]["arguments"]) == {"fields": ["id"]}
+
+def test_long_reply_is_linear():
+    text = 'lorem [ipsum] {dolor} "sit" ' * 20000 + '[{"name": "get_stats", "arguments": {}}]'
+    start = time.perf_counter()
+    assert parse_tool_calls(text) == [{"name": "get_stats", "arguments": {}}]
+    assert time.perf_counter() - start < 2